@@ -0,0 +1,282 @@
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+
+def make_synthetic_audio(seconds: float, sample_rate: int = 44100, seed: int = 0) -> np.ndarray:
+    """
+    Generate a deterministic speech-like test signal
+
+    The signal is a sum of harmonics with a slowly varying pitch, gated into
+    syllable-sized bursts and mixed with low level noise, so that resampling,
+    log-mel extraction and decoding see realistic spectral content.
+
+    Args:
+        seconds: Length of the signal in seconds
+        sample_rate: Sample rate in Hz
+        seed: Seed for the noise generator
+
+    Returns:
+        Mono float32 waveform in [-1, 1]
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+
+    # Syllable envelope: ~4 bursts per second
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 2
+    signal = 0.3 * voiced * envelope + 0.01 * rng.standard_normal(t.shape)
+
+    return np.clip(signal, -1, 1).astype(np.float32)
+
+
+def write_synthetic_audio(path: str | Path, seconds: float, sample_rate: int = 44100) -> str:
+    """
+    Write a synthetic audio file
+
+    Args:
+        path: Output path (format inferred from the extension, e.g. .wav or .flac)
+        seconds: Length of the signal in seconds
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        str: Path to the written file
+    """
+    sf.write(str(path), make_synthetic_audio(seconds, sample_rate), sample_rate)
+    return str(path)
+
+
+def write_synthetic_video(path: str | Path, seconds: float, sample_rate: int = 44100) -> str:
+    """
+    Write a small synthetic video with a synthetic audio track
+
+    The video stream is a tiny solid colour clip so that the benchmark is
+    dominated by audio handling, as it is for real talk videos.
+
+    Args:
+        path: Output .mp4 path
+        seconds: Length of the clip in seconds
+        sample_rate: Sample rate of the audio track
+
+    Returns:
+        str: Path to the written file
+    """
+    from moviepy import ColorClip
+    from moviepy.audio.AudioClip import AudioArrayClip
+
+    audio = make_synthetic_audio(seconds, sample_rate)
+    audio_clip = AudioArrayClip(np.stack([audio, audio], axis=1), fps=sample_rate)
+    clip = ColorClip(size=(64, 64), color=(0, 0, 0), duration=seconds).with_audio(audio_clip)
+    clip.write_videofile(str(path), fps=5, codec="libx264", audio_codec="aac", logger=None)
+    clip.close()
+    return str(path)
+
+
+def build_tiny_whisper(seed: int = 0):
+    """
+    Build a randomly initialised, very small Whisper model
+
+    The model has the real Whisper architecture and vocabulary size but only
+    a few narrow layers, so decoder step cost can be measured without
+    downloading a checkpoint.
+
+    Args:
+        seed: Seed used for weight initialisation
+
+    Returns:
+        WhisperForConditionalGeneration in eval mode
+    """
+    import torch
+    from transformers import WhisperConfig, WhisperForConditionalGeneration
+
+    torch.manual_seed(seed)
+    config = WhisperConfig(
+        d_model=64,
+        encoder_layers=2,
+        decoder_layers=2,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=128,
+        decoder_ffn_dim=128,
+    )
+    return WhisperForConditionalGeneration(config).eval()
+
+
+def save_tiny_whisper(directory: str | Path, num_mel_bins: int = 80, seed: int = 0) -> str:
+    """
+    Save a randomly initialised, very small Whisper model with its processor
+
+    Unlike build_tiny_whisper, the result can be loaded by name with
+    from_pretrained (e.g. by WhisperTranscriber). The tokenizer only knows
+    the 256 byte-level symbols and a few special tokens. Transcripts are not
+    meaningful.
+
+    Args:
+        directory: Directory to save the model and processor in
+        num_mel_bins: Number of mel bins of the features (80, or 128 as in large-v3)
+        seed: Seed used for weight initialisation
+
+    Returns:
+        str: The directory, usable as a model name with from_pretrained
+    """
+    import torch
+    from transformers import (
+        GenerationConfig,
+        WhisperConfig,
+        WhisperFeatureExtractor,
+        WhisperForConditionalGeneration,
+        WhisperProcessor,
+        WhisperTokenizer,
+    )
+    from transformers.convert_slow_tokenizer import bytes_to_unicode
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    special_tokens = ["<|endoftext|>", "<|startoftranscript|>", "<|notimestamps|>"]
+    vocab = {symbol: index for index, symbol in enumerate(bytes_to_unicode().values())}
+    for token in special_tokens:
+        vocab[token] = len(vocab)
+    (directory / "vocab.json").write_text(json.dumps(vocab))
+    (directory / "merges.txt").write_text("#version: 0.2\n")
+
+    tokenizer = WhisperTokenizer(
+        str(directory / "vocab.json"), str(directory / "merges.txt"),
+        unk_token="<|endoftext|>", bos_token="<|endoftext|>", eos_token="<|endoftext|>", pad_token="<|endoftext|>"
+    )
+    tokenizer.add_special_tokens({"additional_special_tokens": special_tokens[1:]})
+    WhisperProcessor(WhisperFeatureExtractor(feature_size=num_mel_bins), tokenizer).save_pretrained(directory)
+
+    end, start, no_timestamps = (vocab[token] for token in special_tokens)
+    torch.manual_seed(seed)
+    config = WhisperConfig(
+        vocab_size=len(vocab),
+        num_mel_bins=num_mel_bins,
+        d_model=16,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=32,
+        decoder_ffn_dim=32,
+        max_target_positions=64,
+        pad_token_id=end,
+        bos_token_id=end,
+        eos_token_id=end,
+        decoder_start_token_id=start,
+        begin_suppress_tokens=[],
+    )
+    model = WhisperForConditionalGeneration(config)
+    model.generation_config = GenerationConfig(
+        decoder_start_token_id=start,
+        eos_token_id=end,
+        pad_token_id=end,
+        no_timestamps_token_id=no_timestamps,
+        is_multilingual=False,
+        max_length=16,
+    )
+    model.save_pretrained(directory)
+    return str(directory)
+
+
+def build_tiny_m2m100(directory: str | Path, seed: int = 0) -> str:
+    """
+    Save a randomly initialised, very small M2M100 translation model
+
+    The tokenizer is a 64 piece SentencePiece model trained on a few English
+    sentences, plus the usual M2M100 language tokens, so the multilingual
+    code paths run without downloading a checkpoint. Translations are not
+    meaningful.
+
+    Args:
+        directory: Directory to save the model and tokenizer in
+        seed: Seed used for weight initialisation
+
+    Returns:
+        str: The directory, usable as a model name with from_pretrained
+    """
+    import sentencepiece as spm
+    import torch
+    from transformers import M2M100Config, M2M100ForConditionalGeneration, M2M100Tokenizer
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    corpus = ["Hello there. How are you? Fine, thanks! Good morning. This is a longer sentence. Bye."] * 20
+    spm.SentencePieceTrainer.train(
+        sentence_iterator=iter(corpus), model_prefix=str(directory / "sentencepiece.bpe"), vocab_size=64,
+        model_type="bpe", character_coverage=1.0, bos_id=0, pad_id=1, eos_id=2, unk_id=3, minloglevel=2
+    )
+    pieces = spm.SentencePieceProcessor(model_file=str(directory / "sentencepiece.bpe.model"))
+    vocab = {pieces.id_to_piece(i): i for i in range(pieces.get_piece_size())}
+    (directory / "vocab.json").write_text(json.dumps(vocab))
+
+    tokenizer = M2M100Tokenizer(str(directory / "vocab.json"), str(directory / "sentencepiece.bpe.model"))
+    tokenizer.save_pretrained(directory)
+
+    torch.manual_seed(seed)
+    config = M2M100Config(
+        # Language tokens and made-up words follow the SentencePiece vocabulary
+        vocab_size=max(tokenizer.lang_token_to_id.values()) + tokenizer.num_madeup_words + 1,
+        d_model=16,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=32,
+        decoder_ffn_dim=32,
+        max_position_embeddings=64,
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        decoder_start_token_id=tokenizer.eos_token_id,
+    )
+    M2M100ForConditionalGeneration(config).save_pretrained(directory)
+    return str(directory)
+
+
+class StubChatClient:
+    """Offline stand-in for ChatOpenAI that answers instantly with fixed content"""
+
+    def __init__(self, content: str = "Stub response.", latency: float = 0.0):
+        """
+        Initialize the stub client
+
+        Args:
+            content: Content returned for every prompt
+            latency: Optional artificial delay in seconds per call
+        """
+        self.content = content
+        self.latency = latency
+        self.calls = 0
+
+    def invoke(self, prompt):
+        """Return a response shaped like a LangChain AIMessage"""
+        import time
+
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        prompt_tokens = len(str(prompt)) // 4
+        completion_tokens = len(self.content) // 4
+        return SimpleNamespace(
+            content=self.content,
+            response_metadata={
+                "token_usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                }
+            },
+        )
+
+
+def ensure_dummy_openai_key(key: Optional[str] = "sk-benchmark") -> None:
+    """Set a placeholder API key so OpenAI components can be constructed offline"""
+    os.environ.setdefault("OPENAI_API_KEY", key)
@@ -0,0 +1,496 @@
+"""
+Offline benchmark suite for the transcription and extraction hot paths.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run_benchmarks --lengths 30 120 600
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<previous>.json
+
+Every benchmark runs on synthetic data and needs no network access. The
+full WhisperTranscriber path additionally needs a locally cached checkpoint
+(see --whisper-model) and is skipped otherwise; the decoding benchmark also
+needs the draft checkpoint (see --draft-model).
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fixtures import (  # noqa: E402
+    StubChatClient,
+    build_tiny_whisper,
+    ensure_dummy_openai_key,
+    make_synthetic_audio,
+    write_synthetic_audio,
+    write_synthetic_video,
+)
+from src.instrumentation import RSSSampler  # noqa: E402
+
+RESULTS_PATH = Path(__file__).resolve().parent / "results"
+
+
+def measure(fn: Callable[[], Any], repeats: int, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Time a callable
+
+    Args:
+        fn: Callable to benchmark
+        repeats: Number of timed runs
+        warmup: Number of untimed runs executed first
+
+    Returns:
+        Dictionary containing median/min wall seconds, median CPU seconds,
+        peak RSS and the return value of the last run
+    """
+    for _ in range(warmup):
+        fn()
+
+    wall_times, cpu_times = [], []
+    result = None
+    with RSSSampler() as sampler:
+        for _ in range(repeats):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            result = fn()
+            wall_times.append(time.perf_counter() - wall_start)
+            cpu_times.append(time.process_time() - cpu_start)
+
+    return {
+        "wall_seconds": statistics.median(wall_times),
+        "wall_seconds_min": min(wall_times),
+        "cpu_seconds": statistics.median(cpu_times),
+        "peak_rss_mb": sampler.peak_mb,
+        "result": result,
+    }
+
+
+def _record(name: str, params: Dict[str, Any], timing: Dict[str, Any],
+            audio_seconds: Optional[float] = None, units: Optional[float] = None,
+            unit_name: Optional[str] = None) -> Dict[str, Any]:
+    """Build a result entry with derived throughput and real-time factor"""
+    record = {
+        "name": name,
+        "params": params,
+        "wall_seconds": timing["wall_seconds"],
+        "wall_seconds_min": timing["wall_seconds_min"],
+        "cpu_seconds": timing["cpu_seconds"],
+        "peak_rss_mb": timing["peak_rss_mb"],
+    }
+    if audio_seconds:
+        record["real_time_factor"] = timing["wall_seconds"] / audio_seconds
+        record["audio_seconds_per_second"] = audio_seconds / timing["wall_seconds"]
+    if units is not None and unit_name:
+        record[f"{unit_name}_per_second"] = units / timing["wall_seconds"]
+    return record
+
+
+def bench_extract_audio(lengths: List[float], repeats: int, workdir: Path) -> List[Dict[str, Any]]:
+    """Benchmark AudioExtractor.extract_audio on synthetic videos"""
+    from src.audio_extractor import AudioExtractor
+
+    extractor = AudioExtractor()
+    results = []
+    for seconds in lengths:
+        video_path = write_synthetic_video(workdir / f"video_{seconds:g}s.mp4", seconds)
+        timing = measure(
+            lambda: extractor.extract_audio(video_path, output_path=str(workdir / "audio")),
+            repeats=repeats,
+        )
+        results.append(_record("extract_audio", {"audio_seconds": seconds}, timing, audio_seconds=seconds))
+    return results
+
+
+def bench_resample(lengths: List[float], repeats: int) -> List[Dict[str, Any]]:
+    """Benchmark the 44.1 kHz -> 16 kHz resampling step used by WhisperTranscriber"""
+    import torch
+    from torchaudio.transforms import Resample
+
+    results = []
+    for seconds in lengths:
+        waveform = torch.from_numpy(make_synthetic_audio(seconds, 44100)).unsqueeze(0)
+        timing = measure(lambda: Resample(orig_freq=44100, new_freq=16000)(waveform), repeats=repeats)
+        results.append(_record("resample", {"audio_seconds": seconds}, timing, audio_seconds=seconds))
+    return results
+
+
+def bench_feature_extraction(lengths: List[float], repeats: int) -> List[Dict[str, Any]]:
+    """Benchmark Whisper log-mel feature extraction over the whole waveform and in batched 30-second windows"""
+    import torch
+    from transformers import WhisperFeatureExtractor
+    from src.transcriber.log_mel import LogMelFrontend
+
+    feature_extractor = WhisperFeatureExtractor()
+    frontend = LogMelFrontend(feature_extractor)
+    results = []
+    for seconds in lengths:
+        waveform = make_synthetic_audio(seconds, 16000)
+        timing = measure(
+            lambda: feature_extractor(
+                waveform,
+                return_tensors="pt",
+                truncation=False,
+                padding="longest",
+                return_attention_mask=True,
+                sampling_rate=16_000,
+            ),
+            repeats=repeats,
+        )
+        results.append(_record("feature_extraction", {"audio_seconds": seconds}, timing, audio_seconds=seconds))
+
+        samples = torch.from_numpy(waveform)
+        segments = [samples[start:start + 30 * 16000] for start in range(0, len(samples), 30 * 16000)]
+        timing = measure(lambda: frontend(segments), repeats=repeats)
+        results.append(_record("log_mel_frontend", {"audio_seconds": seconds}, timing, audio_seconds=seconds))
+    return results
+
+
+def bench_generate(repeats: int, new_tokens: int, beams: List[int]) -> List[Dict[str, Any]]:
+    """Benchmark decoder steps of model.generate on a tiny random Whisper model"""
+    import torch
+    from transformers import GenerationMixin, WhisperFeatureExtractor
+
+    model = build_tiny_whisper()
+    features = WhisperFeatureExtractor()(
+        make_synthetic_audio(30, 16000), sampling_rate=16_000, return_tensors="pt"
+    ).input_features
+    decoder_input_ids = torch.tensor([[model.config.decoder_start_token_id]])
+
+    results = []
+    for num_beams in beams:
+        def run():
+            with torch.inference_mode():
+                # Bypass Whisper's task/language handling: the random model has no
+                # generation config, only the decoder loop is of interest here
+                return GenerationMixin.generate(
+                    model,
+                    input_features=features,
+                    decoder_input_ids=decoder_input_ids,
+                    max_new_tokens=new_tokens,
+                    min_new_tokens=new_tokens,
+                    num_beams=num_beams,
+                    do_sample=False,
+                )
+
+        timing = measure(run, repeats=repeats)
+        results.append(_record(
+            "generate",
+            {"num_beams": num_beams, "new_tokens": new_tokens, "model": "tiny-random"},
+            timing,
+            units=new_tokens,
+            unit_name="tokens",
+        ))
+    return results
+
+
+def bench_transcribe(model_name: str, lengths: List[float], repeats: int, workdir: Path) -> List[Dict[str, Any]]:
+    """Benchmark the full WhisperTranscriber path with a locally cached checkpoint"""
+    from src.transcriber.whisper_transcriber import WhisperTranscriber
+
+    try:
+        transcriber = WhisperTranscriber(model_name=model_name)
+    except (OSError, ValueError) as e:
+        print(f"Skipping transcribe benchmark, checkpoint '{model_name}' is not available: {e}")
+        return []
+
+    results = []
+    for seconds in lengths:
+        audio_path = write_synthetic_audio(workdir / f"audio_{seconds:g}s.wav", seconds)
+        timing = measure(lambda: transcriber.transcribe_with_metadata(audio_path), repeats=repeats, warmup=0)
+        results.append(_record(
+            "transcribe", {"audio_seconds": seconds, "model": model_name}, timing, audio_seconds=seconds
+        ))
+    return results
+
+
+def bench_transcribe_batch(model_name: str, num_clips: int, clip_seconds: float, repeats: int,
+                           workdir: Path) -> List[Dict[str, Any]]:
+    """Compare transcribing many short clips one by one with WhisperTranscriber.transcribe_batch"""
+    from src.transcriber.whisper_transcriber import WhisperTranscriber
+
+    try:
+        transcriber = WhisperTranscriber(model_name=model_name)
+    except (OSError, ValueError) as e:
+        print(f"Skipping transcribe_batch benchmark, checkpoint '{model_name}' is not available: {e}")
+        return []
+
+    # Vary the lengths so the duration sorting has something to do
+    paths = [
+        write_synthetic_audio(workdir / f"clip_{index}.wav", clip_seconds * (0.5 + (index % 4) / 4))
+        for index in range(num_clips)
+    ]
+    audio_seconds = sum(clip_seconds * (0.5 + (index % 4) / 4) for index in range(num_clips))
+
+    results = []
+    for mode, run in (
+        ("sequential", lambda: [transcriber.transcribe_with_metadata(path) for path in paths]),
+        ("batched", lambda: transcriber.transcribe_batch(paths)),
+    ):
+        timing = measure(run, repeats=repeats, warmup=0)
+        results.append(_record(
+            "transcribe_batch",
+            {"mode": mode, "clips": num_clips, "batch_size": transcriber.batch_size, "model": model_name},
+            timing,
+            audio_seconds=audio_seconds,
+            units=num_clips,
+            unit_name="clips",
+        ))
+    return results
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the number of reference words"""
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    if not ref:
+        return float(bool(hyp))
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def bench_decoding(model_name: str, draft_model_name: str, beams: List[int], lengths: List[float],
+                   repeats: int, workdir: Path, audio_paths: Optional[List[str]] = None,
+                   reference_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Compare beam search, greedy and draft-assisted greedy decoding of WhisperTranscriber
+
+    Accuracy is reported as word error rate against the reference transcript
+    when one is given, otherwise against the output of the widest beam search.
+    Synthetic audio is only meaningful for speed; pass real speech with
+    --decoding-audio to measure accuracy.
+    """
+    from src.transcriber.whisper_transcriber import WhisperTranscriber
+
+    try:
+        transcriber = WhisperTranscriber(model_name=model_name, decoding="greedy", draft_model_name=draft_model_name)
+    except (OSError, ValueError) as e:
+        print(f"Skipping decoding benchmark, checkpoints '{model_name}'/'{draft_model_name}' are not usable: {e}")
+        return []
+    draft_model = transcriber.draft_model
+
+    reference = None
+    if reference_path:
+        with open(reference_path, encoding="utf-8") as f:
+            reference = f.read()
+    if not audio_paths:
+        audio_paths = [write_synthetic_audio(workdir / f"audio_{seconds:g}s.wav", seconds) for seconds in lengths]
+
+    strategies = [("beam", num_beams, None) for num_beams in sorted(beams, reverse=True)]
+    strategies += [("greedy", 1, None), ("greedy", 1, draft_model)]
+
+    results = []
+    for audio_path in audio_paths:
+        baseline = reference
+        for decoding, num_beams, draft in strategies:
+            transcriber.decoding, transcriber.num_beams, transcriber.draft_model = decoding, num_beams, draft
+            timing = measure(lambda: transcriber.transcribe_with_metadata(audio_path), repeats=repeats, warmup=0)
+            output = timing["result"]
+            if baseline is None:
+                baseline = output["text"]
+
+            record = _record(
+                "decoding",
+                {
+                    "audio": Path(audio_path).name,
+                    "decoding": decoding,
+                    "num_beams": num_beams,
+                    "model": model_name,
+                    "draft_model": draft_model_name if draft is not None else None,
+                },
+                timing,
+                audio_seconds=output["audio_seconds"],
+            )
+            record["word_error_rate"] = word_error_rate(baseline, output["text"])
+            record["accuracy_baseline"] = "reference" if reference is not None else "widest_beam"
+            results.append(record)
+    return results
+
+
+def bench_llm_overhead(repeats: int) -> List[Dict[str, Any]]:
+    """Benchmark client-side overhead of the LLM components against a stubbed client"""
+    from src.language.openai_language_detector import OpenAILanguageDetector
+    from src.summarizer.openai_summarizer import OpenAISummarizer
+    from src.translator.openai_translator import OpenAITranslator
+
+    ensure_dummy_openai_key()
+    text = "This is a synthetic transcript sentence about methodology. " * 2000
+
+    components = {
+        "summarize": (OpenAISummarizer(), lambda c: c.summarize(text, focus_points="methodology")),
+        "detect_language": (OpenAILanguageDetector(), lambda c: c.detect_language(text)),
+        "translate": (OpenAITranslator(), lambda c: c.translate(text, "es")),
+    }
+
+    results = []
+    for name, (component, call) in components.items():
+        component.client = StubChatClient()
+        timing = measure(lambda: call(component), repeats=repeats)
+        results.append(_record(f"llm_{name}", {"text_chars": len(text)}, timing))
+    return results
+
+
+def bench_local_llm(repeats: int) -> List[Dict[str, Any]]:
+    """Benchmark the full HTTP path of the local backend against the deterministic stub server"""
+    from src.llm.client_factory import close_clients
+    from src.llm.stub_server import StubLLMServer
+    from src.summarizer.local_summarizer import LocalSummarizer
+    from src.translator.local_translator import LocalTranslator
+
+    text = "This is a synthetic transcript sentence about methodology. " * 2000
+    results = []
+    with StubLLMServer() as server:
+        summarizer = LocalSummarizer(base_url=server.base_url)
+        translator = LocalTranslator(base_url=server.base_url)
+        calls = {
+            "summarize": lambda: summarizer.summarize(text, focus_points="methodology"),
+            "analyze": lambda: summarizer.analyze(text, focus_points="methodology"),
+            "translate": lambda: translator.translate(text[:2000], "es"),
+        }
+        for name, call in calls.items():
+            timing = measure(call, repeats=repeats)
+            results.append(_record(f"local_llm_{name}", {"text_chars": len(text)}, timing))
+    close_clients()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    """Get the current git commit hash, if available"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment() -> Dict[str, Any]:
+    """Describe the machine and library versions the benchmark ran on"""
+    import torch
+    import transformers
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "torch": torch.__version__,
+        "torch_threads": torch.get_num_threads(),
+        "transformers": transformers.__version__,
+    }
+
+
+def compare(current: Dict[str, Any], baseline_path: str) -> None:
+    """Print the wall time ratio of each benchmark against a previous result file"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def key(record):
+        return record["name"], json.dumps(record["params"], sort_keys=True)
+
+    previous = {key(record): record for record in baseline["results"]}
+    print(f"\nComparison against {baseline.get('commit')} ({baseline_path}):")
+    for record in current["results"]:
+        old = previous.get(key(record))
+        if old is None:
+            continue
+        ratio = record["wall_seconds"] / old["wall_seconds"]
+        print(f"  {record['name']:<20} {json.dumps(record['params']):<50} x{ratio:.2f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run offline benchmarks for the textrizer hot paths.')
+    parser.add_argument('--lengths', type=float, nargs='+', default=[30, 120, 600],
+                        help='Synthetic audio lengths in seconds (default: 30 120 600)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark (default: 3)')
+    parser.add_argument('--only', type=str, nargs='+', default=None,
+                        choices=['extract_audio', 'resample', 'feature_extraction', 'generate', 'transcribe',
+                                 'transcribe_batch', 'decoding', 'llm', 'local_llm'],
+                        help='Run only the given benchmarks')
+    parser.add_argument('--whisper-model', type=str, default='openai/whisper-tiny',
+                        help='Locally cached checkpoint for the full transcribe benchmark (default: openai/whisper-tiny)')
+    parser.add_argument('--clips', type=int, default=32,
+                        help='Number of short clips for the transcribe_batch benchmark (default: 32)')
+    parser.add_argument('--draft-model', type=str, default='openai/whisper-tiny',
+                        help='Draft checkpoint for the assisted decoding benchmark (default: openai/whisper-tiny)')
+    parser.add_argument('--decoding-audio', type=str, nargs='+', default=None,
+                        help='Speech recordings for the decoding benchmark (default: synthetic audio)')
+    parser.add_argument('--reference', type=str, default=None,
+                        help='Reference transcript of --decoding-audio used to compute word error rates')
+    parser.add_argument('--new-tokens', type=int, default=64, help='Tokens generated per generate run (default: 64)')
+    parser.add_argument('--beams', type=int, nargs='+', default=[1, 2], help='Beam sizes to benchmark (default: 1 2)')
+    parser.add_argument('--output', '-o', type=str, default=None,
+                        help='Result JSON path (default: benchmarks/results/<commit>_<timestamp>.json)')
+    parser.add_argument('--compare', type=str, default=None, help='Previous result JSON to compare against')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    selected = set(args.only or [
+        'extract_audio', 'resample', 'feature_extraction', 'generate', 'transcribe', 'transcribe_batch', 'decoding',
+        'llm', 'local_llm'
+    ])
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        if 'extract_audio' in selected:
+            results += bench_extract_audio(args.lengths, args.repeats, workdir)
+        if 'resample' in selected:
+            results += bench_resample(args.lengths, args.repeats)
+        if 'feature_extraction' in selected:
+            results += bench_feature_extraction(args.lengths, args.repeats)
+        if 'generate' in selected:
+            results += bench_generate(args.repeats, args.new_tokens, args.beams)
+        if 'transcribe' in selected:
+            results += bench_transcribe(args.whisper_model, args.lengths, args.repeats, workdir)
+        if 'transcribe_batch' in selected:
+            results += bench_transcribe_batch(args.whisper_model, args.clips, 10.0, args.repeats, workdir)
+        if 'decoding' in selected:
+            results += bench_decoding(args.whisper_model, args.draft_model, args.beams, args.lengths,
+                                      args.repeats, workdir, args.decoding_audio, args.reference)
+        if 'llm' in selected:
+            results += bench_llm_overhead(args.repeats)
+        if 'local_llm' in selected:
+            results += bench_local_llm(args.repeats)
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "results": results,
+    }
+
+    output = Path(args.output) if args.output else (
+        RESULTS_PATH / f"{commit or 'unknown'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for record in results:
+        extra = record.get("real_time_factor")
+        extra = f"RTF {extra:.3f}" if extra is not None else ""
+        if "word_error_rate" in record:
+            extra += f"  WER {record['word_error_rate']:.3f}"
+        print(f"{record['name']:<20} {json.dumps(record['params']):<50} "
+              f"{record['wall_seconds']:.4f}s  {extra}")
+    print(f"\nResults saved to: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
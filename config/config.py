@@ -1,7 +1,15 @@
-VIDEO_DOWNLOAD_PATH = "../data/video"
-AUDIO_DOWNLOAD_PATH = "../data/audio"
-TEXT_PATH = "../data/text"
+from config.settings import PROJECT_ROOT, get_settings
 
-VIDEO_DOWNLOAD_TEST_PATH = "./tests/data/video"
-AUDIO_DOWNLOAD_TEST_PATH = "./tests/data/audio"
-TEXT_TEST_PATH = "./tests/data/text"
\ No newline at end of file
+# Paths are derived from the runtime settings (see config/settings.py), read once at startup
+_settings = get_settings()
+
+VIDEO_DOWNLOAD_PATH = str(_settings.video_dir)
+AUDIO_DOWNLOAD_PATH = str(_settings.audio_dir)
+TEXT_PATH = str(_settings.text_dir)
+TRANSLATION_MEMORY_PATH = str(_settings.cache_dir / "translation_memory.sqlite3")
+FINGERPRINT_INDEX_PATH = str(_settings.cache_dir / "fingerprints.sqlite3")
+NOTES_CACHE_PATH = str(_settings.cache_dir / "summary_notes.sqlite3")
+
+VIDEO_DOWNLOAD_TEST_PATH = str(PROJECT_ROOT / "tests" / "data" / "video")
+AUDIO_DOWNLOAD_TEST_PATH = str(PROJECT_ROOT / "tests" / "data" / "audio")
+TEXT_TEST_PATH = str(PROJECT_ROOT / "tests" / "data" / "text")
\ No newline at end of file
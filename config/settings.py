@@ -0,0 +1,153 @@
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Literal, Mapping, Optional
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# Same location as the former "../data" paths when run from the project root
+DEFAULT_DATA_DIR = PROJECT_ROOT.parent / "data"
+DEFAULT_SETTINGS_FILE = PROJECT_ROOT / "textrizer.toml"
+ENV_PREFIX = "TEXTRIZER_"
+SETTINGS_FILE_ENV = "TEXTRIZER_SETTINGS_FILE"
+
+DIRECTORIES = {"video_dir": "video", "audio_dir": "audio", "text_dir": "text", "cache_dir": "cache"}
+
+
+class Settings(BaseModel):
+    """Runtime settings of a textrizer node"""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    # Directories; the per-kind ones default to subdirectories of data_dir
+    data_dir: Path = DEFAULT_DATA_DIR
+    video_dir: Path
+    audio_dir: Path
+    text_dir: Path
+    cache_dir: Path
+
+    # Compute
+    torch_threads: Optional[int] = Field(default=None, ge=1)
+    whisper_model: str = "openai/whisper-small"
+    whisper_decoding: Literal["beam", "greedy"] = "beam"
+    whisper_num_beams: int = Field(default=2, ge=1)
+    whisper_batch_size: int = Field(default=8, ge=1)
+    mt_model: str = "facebook/m2m100_418M"
+    mt_batch_size: int = Field(default=16, ge=1)
+
+    # Concurrency
+    max_processes: Optional[int] = Field(default=None, ge=1)
+    memory_reserve_mb: float = Field(default=1024.0, ge=0)
+    download_workers: int = Field(default=4, ge=1)
+    extraction_workers: int = Field(default=4, ge=1)
+    llm_max_connections: int = Field(default=20, ge=1)
+    llm_max_concurrency: Optional[int] = Field(default=None, ge=1)
+    llm_timeout: float = Field(default=60.0, gt=0)
+
+    # Backends
+    llm_backend: Literal["openai", "local"] = "openai"
+    llm_model: Optional[str] = None
+    llm_base_url: str = "http://localhost:8080/v1"
+    llm_temperature: float = Field(default=0.1, ge=0.0, le=2.0)
+    translator: Literal["llm", "local_mt"] = "llm"
+
+    @model_validator(mode="before")
+    @classmethod
+    def _default_directories(cls, values: Any) -> Any:
+        """Place directories that are not set explicitly under data_dir"""
+        if isinstance(values, dict):
+            values = dict(values)
+            data_dir = Path(values.get("data_dir") or DEFAULT_DATA_DIR)
+            for name, subdirectory in DIRECTORIES.items():
+                if not values.get(name):
+                    values[name] = data_dir / subdirectory
+        return values
+
+    @field_validator("data_dir", *DIRECTORIES)
+    @classmethod
+    def _absolute_path(cls, path: Path) -> Path:
+        """Resolve paths once so they no longer depend on the working directory"""
+        return path.expanduser().resolve()
+
+
+def _read_settings_file(path: Path) -> Dict[str, Any]:
+    """
+    Read settings from a TOML or JSON file
+
+    Relative directories in the file are resolved against the file's location.
+
+    Args:
+        path: Path of the settings file
+
+    Returns:
+        Dictionary of the settings in the file
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ValueError: If the file format is not supported
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Settings file not found: {path}")
+
+    if path.suffix == ".toml":
+        with open(path, "rb") as f:
+            values = tomllib.load(f)
+    elif path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            values = json.load(f)
+    else:
+        raise ValueError(f"Unsupported settings file format: {path}")
+
+    for name in ("data_dir", *DIRECTORIES):
+        if values.get(name) and not Path(values[name]).expanduser().is_absolute():
+            values[name] = path.parent / values[name]
+    return values
+
+
+def load_settings(path: Optional[str | Path] = None, environ: Optional[Mapping[str, str]] = None) -> Settings:
+    """
+    Load settings from defaults, a settings file and environment variables
+
+    Later sources override earlier ones. The settings file is `path`, else
+    the file named by TEXTRIZER_SETTINGS_FILE, else textrizer.toml in the
+    project root if it exists. Every setting can be overridden by an
+    environment variable named TEXTRIZER_<SETTING> (e.g. TEXTRIZER_CACHE_DIR).
+
+    Args:
+        path: Optional settings file (TOML or JSON)
+        environ: Environment variables (defaults to os.environ)
+
+    Returns:
+        Validated settings
+
+    Raises:
+        FileNotFoundError: If an explicitly given settings file doesn't exist
+        ValueError: If a setting is unknown or invalid
+    """
+    environ = os.environ if environ is None else environ
+    path = path or environ.get(SETTINGS_FILE_ENV)
+
+    values: Dict[str, Any] = {}
+    if path:
+        values.update(_read_settings_file(Path(path)))
+    elif DEFAULT_SETTINGS_FILE.exists():
+        values.update(_read_settings_file(DEFAULT_SETTINGS_FILE))
+
+    for name in Settings.model_fields:
+        value = environ.get(ENV_PREFIX + name.upper())
+        if value:
+            values[name] = value
+
+    return Settings(**values)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the settings of this process, loaded once on first use"""
+    return load_settings()
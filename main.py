@@ -1,15 +1,32 @@
 import argparse
+import logging
 import os
 from pathlib import Path
 from datetime import datetime
+import torch
+from config.settings import get_settings
 from src.video_downloader import YouTubeDLDownloader
 from src.audio_extractor import AudioExtractor
 from src.transcriber.whisper_transcriber import WhisperTranscriber
+from src.transcriber.audio_fingerprint import DeduplicatingTranscriber, FingerprintIndex
+from src.transcriber.transcript_artifact import TranscriptArtifact, write_transcript_artifact
 from src.translator.openai_translator import OpenAITranslator
 from src.summarizer.openai_summarizer import OpenAISummarizer
-from src.language.openai_language_detector import OpenAILanguageDetector
+from src.summarizer.local_summarizer import LocalSummarizer
+from src.summarizer.notes_cache import NotesCache
+from src.translator.local_translator import LocalTranslator
+from src.translator.translation_memory import MemoryTranslator, TranslationMemory
+from src.translator.huggingface_translator import HuggingFaceTranslator
+from src.instrumentation import Instrumentation, peak_rss_mb, render_prometheus
+from src.scheduler import ResourceScheduler
+from src.llm.client_factory import close_clients, configure_pool
+from src.llm.usage import UsageTracker
+
+logger = logging.getLogger(__name__)
 
 def parse_args():
+    # Defaults come from the runtime settings so they can be tuned per node
+    settings = get_settings()
     parser = argparse.ArgumentParser(
         description='Download YouTube video, transcribe, summarize, and translate it.'
     )
@@ -18,7 +35,7 @@ def parse_args():
         '-v',
         type=str,
         required=True,
-        help='YouTube video URL to process'
+        help='YouTube video, playlist or channel URL to process'
     )
     parser.add_argument(
         '--language',
@@ -41,48 +58,210 @@ def parse_args():
         default="methodology, problems and solutions",
         help='Aspects to focus on in the summary'
     )
+    parser.add_argument(
+        '--max_workers',
+        '-w',
+        type=int,
+        default=settings.download_workers,
+        help='Maximum number of concurrent downloads for playlists and channels (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--rate_limit',
+        '-r',
+        type=float,
+        default=None,
+        help='Total download bandwidth cap in bytes per second (default: unlimited)'
+    )
+    parser.add_argument(
+        '--token_budget',
+        type=int,
+        default=None,
+        help='Maximum number of LLM tokens to spend per video (default: unlimited)'
+    )
+    parser.add_argument(
+        '--fallback_model',
+        type=str,
+        default=None,
+        help='Cheaper model to switch to when a video is close to its token budget (served by the same backend)'
+    )
+    parser.add_argument(
+        '--backend',
+        type=str,
+        choices=['openai', 'local'],
+        default=settings.llm_backend,
+        help='LLM backend for summarization and translation (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--llm_base_url',
+        type=str,
+        default=settings.llm_base_url,
+        help='Base URL of the OpenAI-compatible server used by the local backend'
+    )
+    parser.add_argument(
+        '--llm_model',
+        type=str,
+        default=settings.llm_model,
+        help='Model name (default: gpt-4o-mini for openai, local-model for local)'
+    )
+    parser.add_argument(
+        '--whisper_model',
+        type=str,
+        default=settings.whisper_model,
+        help='Whisper model used for transcription (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--decoding',
+        type=str,
+        choices=['beam', 'greedy'],
+        default=settings.whisper_decoding,
+        help='Whisper decoding strategy (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--draft_model',
+        type=str,
+        default=None,
+        help='Smaller Whisper model proposing tokens for assisted decoding (requires --decoding greedy)'
+    )
+    parser.add_argument(
+        '--cascade_model',
+        type=str,
+        default=None,
+        help='Larger Whisper model used to re-transcribe low-confidence segments of --whisper_model'
+    )
+    parser.add_argument(
+        '--segmented_extraction',
+        action='store_true',
+        help='Extract audio as 30-second segments in parallel and transcribe them as they are written'
+    )
+    parser.add_argument(
+        '--extraction_workers',
+        type=int,
+        default=settings.extraction_workers,
+        help='Number of audio segments extracted concurrently with --segmented_extraction (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--dedup_transcripts',
+        action='store_true',
+        help='Fingerprint the audio and reuse the transcript of previously transcribed duplicates'
+    )
+    parser.add_argument(
+        '--translator',
+        type=str,
+        choices=['llm', 'local_mt'],
+        default=settings.translator,
+        help='Translate with the LLM backend or with an offline HuggingFace MT model (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--mt_model',
+        type=str,
+        default=settings.mt_model,
+        help='HuggingFace model used by the local_mt translator (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--mt_quantize',
+        action='store_true',
+        help='Quantize the local_mt model to int8 when running on CPU'
+    )
+    parser.add_argument(
+        '--notes_cache',
+        action='store_true',
+        help='Cache focus-independent chunk notes so re-running with new focus points only repeats the final step'
+    )
+    parser.add_argument(
+        '--translation_memory',
+        action='store_true',
+        help='Reuse previously translated sentences and only translate unseen ones'
+    )
+    parser.add_argument(
+        '--refresh_translation_memory',
+        action='store_true',
+        help='With --translation_memory, translate every sentence again and replace the stored translations'
+    )
+    parser.add_argument(
+        '--llm_max_connections',
+        type=int,
+        default=settings.llm_max_connections,
+        help='Size of the HTTP connection pool shared by all LLM components (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--llm_timeout',
+        type=float,
+        default=settings.llm_timeout,
+        help='Timeout in seconds for LLM requests (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--adaptive_workers',
+        action='store_true',
+        help='Process videos in worker processes whose number, threads and LLM concurrency adapt to the machine'
+    )
+    parser.add_argument(
+        '--prometheus_path',
+        type=str,
+        default=None,
+        help='Optional file to write Prometheus-format metrics of all processed jobs to'
+    )
     return parser.parse_args()
 
-def main():
-    # Parse command line arguments
-    args = parse_args()
-    
+def process_video(video_path, args, audio_extractor, transcriber, summarizer, translator):
+    """Run the extraction, transcription, summary and translation stages for one downloaded video"""
     output_path = Path(args.output_path)
+    metrics = Instrumentation(job_id=Path(video_path).stem)
     
-    # Initialize components
-    downloader = YouTubeDLDownloader()
-    audio_extractor = AudioExtractor()
-    transcriber = WhisperTranscriber(model_name="openai/whisper-small")
-    summarizer = OpenAISummarizer()
-    lang_detector = OpenAILanguageDetector()
-    translator = OpenAITranslator()
-    
-    # Process the video
-    print(f"Downloading video from: {args.video_url}")
-    video_path = downloader.download(args.video_url)
-    
-    print("Extracting audio...")
-    audio_path = audio_extractor.extract_audio(video_path)
-    
-    print("Transcribing audio...")
-    transcription = transcriber.transcribe(audio_path)
+    # Aggregate LLM usage of this video and enforce its token budget
+    usage_tracker = UsageTracker(token_budget=args.token_budget)
+    for component in (summarizer, translator):
+        component.usage_tracker = usage_tracker
     
-    print("Detecting language...")
-    detected_lang = lang_detector.detect_language(transcription)["language_code"]
+    if args.segmented_extraction:
+        # Segments are transcribed while later ones are still being extracted,
+        # so both steps are measured as one stage
+        print("Extracting and transcribing audio segments...")
+        with metrics.stage("transcription") as stage:
+            segment_paths = audio_extractor.extract_audio_segments(
+                video_path,
+                max_workers=args.extraction_workers
+            )
+            transcription_result = transcriber.transcribe_segment_files(segment_paths)
+            stage["audio_seconds"] = transcription_result.get("audio_seconds")
+            stage["real_time_factor"] = transcription_result.get("real_time_factor")
+            stage["deduplicated"] = False
+    else:
+        print("Extracting audio...")
+        with metrics.stage("audio_extraction"):
+            audio_path = audio_extractor.extract_audio(video_path)
+        
+        print("Transcribing audio...")
+        with metrics.stage("transcription") as stage:
+            transcription_result = transcriber.transcribe_with_metadata(audio_path)
+            stage["audio_seconds"] = transcription_result.get("audio_seconds")
+            stage["real_time_factor"] = transcription_result.get("real_time_factor")
+            stage["deduplicated"] = transcription_result.get("deduplicated", False)
+    transcription = transcription_result["text"]
     
-    print("Generating summary...")
-    transcription_summary = summarizer.summarize(
-        transcription,
-        focus_points=args.focus_points
-    )["summary"]
+    # Summary, bullet points and language come from a single request so the
+    # transcript is only sent once
+    print("Generating summary and detecting language...")
+    with metrics.stage("analysis"):
+        analysis = summarizer.analyze(
+            transcription,
+            focus_points=args.focus_points
+        )
+    metrics.record_llm_call("analysis", analysis)
+    detected_lang = analysis["language_code"]
+    transcription_summary = analysis["summary"]
+    bullet_points = "\n".join(f"- {point}" for point in analysis["bullet_points"])
     
     # Only translate if target language is different from detected language
     if detected_lang != args.language:
         print(f"Translating from {detected_lang} to {args.language}...")
-        translation = translator.translate(
-            transcription_summary,
-            args.language
-        )["translated_text"]
+        with metrics.stage("translation"):
+            translation_result = translator.translate(
+                transcription_summary,
+                args.language,
+                source_language=detected_lang
+            )
+        metrics.record_llm_call("translation", translation_result)
+        translation = translation_result["translated_text"]
     else:
         print(f"Content already in target language ({args.language}), skipping translation.")
         translation = transcription_summary
@@ -94,8 +273,12 @@ def main():
 
     # Save outputs with timestamp
     transcription_path = output_path / "transcription.txt"
+    artifact_path = output_path / "transcription.bin"
+    subtitles_path = output_path / "transcription.srt"
     summary_path = output_path / "summary.txt"
+    bullet_points_path = output_path / "bullet_points.txt"
     translation_path = output_path / f"translation_{args.language}.txt"    
+    metrics_path = output_path / "metrics.json"
     
 
     # Save transcription
@@ -106,14 +289,184 @@ def main():
     with open(summary_path, "w", encoding="utf-8") as f:
         f.write(transcription_summary)
     
+    # Save bullet points
+    with open(bullet_points_path, "w", encoding="utf-8") as f:
+        f.write(bullet_points)
+    
     # Save translation
     with open(translation_path, "w", encoding="utf-8") as f:
         f.write(translation)
     
+    # Save timed segments and token log-probabilities as a memory-mappable artifact.
+    # This comes last: segments that cannot be stored must not cost the text outputs
+    try:
+        write_transcript_artifact(artifact_path, transcription_result, detected_lang)
+        with TranscriptArtifact(artifact_path) as artifact, open(subtitles_path, "w", encoding="utf-8") as f:
+            f.write(artifact.to_srt())
+    except ValueError as e:
+        print(f"Could not write the transcript artifact and subtitles: {e}")
+        artifact_path = subtitles_path = None
+    
+    # Save metrics
+    with open(metrics_path, "w", encoding="utf-8") as f:
+        f.write(metrics.to_json())
+    
     print("\nProcessing complete! Files saved:")
     print(f"- Transcription:", transcription_path)
+    if artifact_path:
+        print(f"- Transcript artifact:", artifact_path)
+        print(f"- Subtitles:", subtitles_path)
     print(f"- Summary:", summary_path)
+    print(f"- Bullet points:", bullet_points_path)
     print(f"- Translation:", translation_path)
+    print(f"- Metrics:", metrics_path)
+    print(f"LLM usage: {usage_tracker.total_tokens} tokens (~${usage_tracker.cost_usd:.4f})")
+    
+    return metrics
+
+def build_components(args):
+    """Create the audio extractor, transcriber, summarizer and translator selected by the arguments"""
+    settings = get_settings()
+    audio_extractor = AudioExtractor()
+    transcriber = WhisperTranscriber(
+        model_name=args.whisper_model,
+        decoding=args.decoding,
+        draft_model_name=args.draft_model,
+        cascade_model_name=args.cascade_model,
+        num_beams=settings.whisper_num_beams,
+        batch_size=settings.whisper_batch_size
+    )
+    if args.dedup_transcripts:
+        transcriber = DeduplicatingTranscriber(transcriber, FingerprintIndex())
+    # Summary chunks are mapped with the summarizer's default concurrency unless the settings cap it
+    concurrency = {"max_concurrency": settings.llm_max_concurrency} if settings.llm_max_concurrency else {}
+    if args.backend == 'local':
+        model = args.llm_model or "local-model"
+        summarizer = LocalSummarizer(model=model, base_url=args.llm_base_url, fallback_model=args.fallback_model,
+                                     temperature=settings.llm_temperature, **concurrency)
+        translator = LocalTranslator(model=model, base_url=args.llm_base_url, fallback_model=args.fallback_model,
+                                     temperature=settings.llm_temperature)
+    else:
+        model = args.llm_model or "gpt-4o-mini"
+        summarizer = OpenAISummarizer(model=model, fallback_model=args.fallback_model,
+                                      temperature=settings.llm_temperature, **concurrency)
+        translator = OpenAITranslator(model=model, fallback_model=args.fallback_model,
+                                      temperature=settings.llm_temperature)
+    if args.notes_cache:
+        summarizer.notes_cache = NotesCache()
+    if args.translator == 'local_mt':
+        translator = HuggingFaceTranslator(model_name=args.mt_model, batch_size=settings.mt_batch_size,
+                                           quantize=args.mt_quantize)
+    
+    if args.translation_memory:
+        translator = MemoryTranslator(translator, TranslationMemory(), refresh=args.refresh_translation_memory)
+    
+    return audio_extractor, transcriber, summarizer, translator
+
+# Per-process state of --adaptive_workers worker processes
+_worker_args = None
+_worker_components = None
+
+def _init_worker(args):
+    """Store the arguments in a worker process; components are built by its first job"""
+    global _worker_args
+    _worker_args = args
+    # Spawned workers do not inherit the parent's logging configuration
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+def _run_scheduled_job(video_path, plan):
+    """
+    Process one video in a worker process with the threads and LLM concurrency of the plan
+    
+    The connection pool is resized for every job and closed when the job
+    ends; components look up their chat client on each call, so they pick up
+    the rebuilt pool. The summarizer and translator both get the job's LLM
+    share, and a concurrency limit set in the settings caps it.
+    """
+    global _worker_components
+    settings = get_settings()
+    llm_concurrency = plan["llm_concurrency"]
+    if settings.llm_max_concurrency:
+        llm_concurrency = min(settings.llm_max_concurrency, llm_concurrency)
+    
+    torch.set_num_threads(plan["threads_per_process"])
+    configure_pool(max_connections=llm_concurrency, timeout=_worker_args.llm_timeout)
+    try:
+        if _worker_components is None:
+            _worker_components = build_components(_worker_args)
+        audio_extractor, transcriber, summarizer, translator = _worker_components
+        summarizer.max_concurrency = llm_concurrency
+        # Local MT models send no LLM requests and have no concurrency to share
+        if getattr(translator, "max_concurrency", None) is not None:
+            translator.max_concurrency = llm_concurrency
+        
+        print(f"\nProcessing: {video_path}")
+        metrics = process_video(video_path, _worker_args, audio_extractor, transcriber, summarizer, translator)
+    finally:
+        close_clients()
+    return metrics, peak_rss_mb(), os.getpid()
+
+def main():
+    # Parse command line arguments
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.segmented_extraction and args.dedup_transcripts:
+        raise ValueError("--dedup_transcripts fingerprints the whole audio file and cannot be combined with --segmented_extraction")
+    settings = get_settings()
+    
+    downloader = YouTubeDLDownloader()
+    # Download the video (or every video of a playlist/channel) and process
+    # each one as soon as its download completes. Failing playlist entries are
+    # skipped; the download raises if no video could be downloaded at all
+    print(f"Downloading video(s) from: {args.video_url}")
+    video_paths = downloader.download_playlist(
+        args.video_url,
+        max_workers=args.max_workers,
+        rate_limit=args.rate_limit,
+        ignore_errors=True
+    )
+    jobs = []
+    
+    if args.adaptive_workers:
+        # Videos are processed by worker processes sized from measured memory,
+        # real-time factor and machine load
+        scheduler = ResourceScheduler(
+            max_processes=settings.max_processes,
+            memory_reserve_mb=settings.memory_reserve_mb,
+            max_llm_concurrency=args.llm_max_connections
+        )
+        try:
+            for metrics in scheduler.run(video_paths, _run_scheduled_job, initializer=_init_worker, initargs=(args,)):
+                jobs.append(metrics)
+                if args.prometheus_path:
+                    with open(args.prometheus_path, "w", encoding="utf-8") as f:
+                        f.write(render_prometheus(jobs))
+        finally:
+            close_clients()
+        return
+    
+    if settings.torch_threads:
+        torch.set_num_threads(settings.torch_threads)
+    
+    # All LLM components share one pooled HTTP client
+    configure_pool(max_connections=args.llm_max_connections, timeout=args.llm_timeout)
+    audio_extractor, transcriber, summarizer, translator = build_components(args)
+    
+    try:
+        for video_path in video_paths:
+            print(f"\nProcessing: {video_path}")
+            try:
+                jobs.append(process_video(video_path, args, audio_extractor, transcriber, summarizer, translator))
+            except Exception:
+                # One failed video should not abort the rest of the playlist, as with --adaptive_workers
+                logger.exception("Skipping failed video: %s", video_path)
+                continue
+            
+            if args.prometheus_path:
+                with open(args.prometheus_path, "w", encoding="utf-8") as f:
+                    f.write(render_prometheus(jobs))
+    finally:
+        close_clients()
 
 if __name__ == "__main__":
     main()
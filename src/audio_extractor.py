@@ -1,7 +1,40 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
+import ffmpeg
 from moviepy import VideoFileClip
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 from config.config import VIDEO_DOWNLOAD_PATH, AUDIO_DOWNLOAD_PATH
 
+def plan_segments(duration: float, segment_seconds: float,
+                  min_segment_seconds: float = 1.0) -> List[Tuple[float, float]]:
+    """Split a duration into fixed-length segments without a near-empty last one
+
+    Whisper hallucinates on a fraction of a second of audio, so a final
+    remainder shorter than min_segment_seconds is merged into the previous
+    segment. The merged span is split into two equal halves so no segment is
+    longer than segment_seconds, which is the 30-second Whisper window by
+    default.
+
+    Args:
+        duration (float): Length of the audio in seconds
+        segment_seconds (float): Length of each segment
+        min_segment_seconds (float, optional): Shortest last segment. Defaults to 1.0.
+
+    Returns:
+        List[Tuple[float, float]]: (start, length) of each segment, in time order
+    """
+    num_segments = int(-(-duration // segment_seconds))
+    segments = [(index * segment_seconds, segment_seconds) for index in range(num_segments)]
+    remainder = duration - (num_segments - 1) * segment_seconds
+    if num_segments > 1 and remainder < min_segment_seconds:
+        start = (num_segments - 2) * segment_seconds
+        half = (segment_seconds + remainder) / 2
+        segments[-2:] = [(start, half), (start + half, half)]
+    return segments
+
+
 class AudioExtractor:
     """Class to handle audio extraction from video files"""
     
@@ -58,4 +91,66 @@ class AudioExtractor:
         except Exception as e:
             raise ValueError(f"Failed to extract audio: {str(e)}")
             
-        return output_file 
\ No newline at end of file
+        return output_file
+    
+    def extract_audio_segments(self, video_path: str, segment_seconds: float = 30.0, max_workers: int = 4,
+                               output_path: str = None, sample_rate: int = 16000,
+                               min_segment_seconds: float = 1.0) -> Iterator[str]:
+        """Extract audio as fixed-length PCM segments in parallel
+
+        Each worker runs its own ffmpeg process that seeks directly to the start
+        of its time range, so long videos are decoded on several cores at once.
+        Segments are 16-bit mono WAV files at the transcription sample rate and
+        line up with 30-second transcription windows by default. A near-empty
+        last segment is merged into the previous one (see plan_segments).
+
+        Args:
+            video_path (str): Path to the video file
+            segment_seconds (float, optional): Length of each segment. Defaults to 30.0.
+            max_workers (int, optional): Number of segments extracted concurrently. Defaults to 4.
+            output_path (str, optional): Path to save the segments. Defaults to None.
+            sample_rate (int, optional): Sample rate of the segments. Defaults to 16000.
+            min_segment_seconds (float, optional): Shortest last segment. Defaults to 1.0.
+
+        Yields:
+            str: Path of each segment, in time order, as soon as it (and every
+            segment before it) has been written
+
+        Raises:
+            FileNotFoundError: If video file doesn't exist
+            ValueError: If the video has no duration or a segment fails to extract
+        """
+        if not video_path or not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+
+        duration = ffmpeg_parse_infos(video_path).get("duration")
+        if not duration:
+            raise ValueError(f"Failed to read duration of: {video_path}")
+
+        base_name = os.path.splitext(os.path.basename(video_path))[0]
+        output_path = os.path.join(output_path or self.default_audio_path, f"{base_name}_segments")
+        os.makedirs(output_path, exist_ok=True)
+
+        def extract(index: int, start: float, length: float) -> str:
+            output_file = os.path.join(output_path, f"{base_name}_audio_{index:05d}.wav")
+            try:
+                (
+                    ffmpeg
+                    .input(video_path, ss=start, t=length)
+                    .output(output_file, vn=None, ac=1, ar=sample_rate, acodec="pcm_s16le")
+                    .overwrite_output()
+                    .run(cmd=FFMPEG_BINARY, quiet=True)
+                )
+            except ffmpeg.Error as e:
+                raise ValueError(f"Failed to extract audio segment {index}: {e.stderr.decode(errors='ignore')}")
+            return output_file
+
+        segments = plan_segments(duration, segment_seconds, min_segment_seconds)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(extract, index, start, length) for index, (start, length) in enumerate(segments)]
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
\ No newline at end of file
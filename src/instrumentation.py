@@ -0,0 +1,254 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Get the peak resident set size of the current process
+
+    Returns:
+        Peak RSS in megabytes, or None if the platform does not report it
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Get the current resident set size of the process
+
+    Returns:
+        Current RSS in megabytes, or None if the platform does not report it
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class RSSSampler:
+    """Samples the process RSS in a background thread to capture the peak of a code block"""
+
+    def __init__(self, interval: float = 0.01):
+        """
+        Initialize the sampler
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.peak_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "RSSSampler":
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        if self.peak_mb is None:
+            # Platforms without /proc only expose the lifetime peak
+            self.peak_mb = peak_rss_mb()
+
+
+class Instrumentation:
+    """Collects stage timings, resource usage and LLM call statistics for one pipeline job"""
+
+    def __init__(self, job_id: str, rss_interval: float = 0.1):
+        """
+        Initialize instrumentation for a job
+
+        Args:
+            job_id: Identifier of the job (e.g. the video name)
+            rss_interval: Seconds between RSS samples taken during each stage
+        """
+        self.job_id = job_id
+        self.rss_interval = rss_interval
+        self.stages: List[Dict[str, Any]] = []
+        self.llm_calls: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Measure a pipeline stage
+
+        The yielded dictionary can be updated by the caller with stage specific
+        values (e.g. audio_seconds) which are stored alongside the timings.
+
+        Args:
+            name: Stage name
+
+        Yields:
+            Dictionary holding the stage record
+        """
+        record: Dict[str, Any] = {"name": name}
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        # Sampled during the stage; ru_maxrss would only repeat the lifetime peak of earlier stages
+        sampler = RSSSampler(interval=self.rss_interval)
+        try:
+            with sampler:
+                yield record
+        finally:
+            record["wall_seconds"] = time.perf_counter() - wall_start
+            record["cpu_seconds"] = time.process_time() - cpu_start
+            record["peak_rss_mb"] = sampler.peak_mb
+            self.stages.append(record)
+
+    def record_llm_call(self, stage: str, result: Dict[str, Any]) -> None:
+        """
+        Record token counts and latency of an LLM component call
+
+        Args:
+            stage: Stage the call belongs to
+            result: Result dictionary returned by an LLM component (must contain
+                    'usage' and 'model')
+        """
+        usage = result.get("usage") or {}
+        self.llm_calls.append({
+            "stage": stage,
+            "model": result.get("model"),
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+            "latency_seconds": usage.get("latency_seconds", 0.0),
+            "cost_usd": usage.get("cost_usd"),
+        })
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get all collected metrics
+
+        Returns:
+            Dictionary containing job_id, stages, llm_calls and totals. Each
+            stage has the peak RSS sampled while it ran; the totals have the
+            lifetime peak of the process
+        """
+        return {
+            "job_id": self.job_id,
+            "stages": self.stages,
+            "llm_calls": self.llm_calls,
+            "totals": {
+                "wall_seconds": sum(stage["wall_seconds"] for stage in self.stages),
+                "cpu_seconds": sum(stage["cpu_seconds"] for stage in self.stages),
+                "process_peak_rss_mb": peak_rss_mb(),
+                "prompt_tokens": sum(call["prompt_tokens"] for call in self.llm_calls),
+                "completion_tokens": sum(call["completion_tokens"] for call in self.llm_calls),
+                "cost_usd": sum(call["cost_usd"] or 0.0 for call in self.llm_calls),
+            },
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Serialize the collected metrics as JSON"""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """
+        Render the collected metrics in the Prometheus text exposition format
+
+        Returns:
+            Metrics text
+        """
+        return render_prometheus([self])
+
+
+_STAGE_METRICS = [
+    ("wall_seconds", "textrizer_stage_wall_seconds", "Wall clock time spent in a pipeline stage"),
+    ("cpu_seconds", "textrizer_stage_cpu_seconds", "CPU time spent in a pipeline stage"),
+    ("audio_seconds", "textrizer_stage_audio_seconds", "Seconds of audio processed by a stage"),
+    ("real_time_factor", "textrizer_stage_real_time_factor", "Processing time divided by audio duration"),
+    ("peak_rss_mb", "textrizer_stage_peak_rss_megabytes", "Peak resident set size sampled during a stage"),
+]
+
+_LLM_METRICS = [
+    ("prompt_tokens", "textrizer_llm_prompt_tokens", "Prompt tokens sent to the LLM"),
+    ("completion_tokens", "textrizer_llm_completion_tokens", "Completion tokens returned by the LLM"),
+    ("latency_seconds", "textrizer_llm_latency_seconds", "Total LLM request latency"),
+]
+
+
+def render_prometheus(jobs: List[Instrumentation]) -> str:
+    """
+    Render metrics of several jobs in the Prometheus text exposition format
+
+    Args:
+        jobs: Instrumentation of each job, labelled by job_id
+
+    Returns:
+        Metrics text (suitable for a node_exporter textfile collector or a
+        /metrics endpoint)
+    """
+    lines = []
+
+    for key, metric, help_text in _STAGE_METRICS:
+        samples = [
+            (job.job_id, stage) for job in jobs for stage in job.stages if stage.get(key) is not None
+        ]
+        if not samples:
+            continue
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for job_id, stage in samples:
+            lines.append(
+                f'{metric}{{job="{_escape_label(job_id)}",stage="{_escape_label(stage["name"])}"}} {stage[key]}'
+            )
+
+    for key, metric, help_text in _LLM_METRICS:
+        totals: Dict[tuple, float] = {}
+        for job in jobs:
+            for call in job.llm_calls:
+                label = (job.job_id, call["stage"], call["model"])
+                totals[label] = totals.get(label, 0) + call[key]
+        if not totals:
+            continue
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for (job_id, stage, model), value in totals.items():
+            lines.append(
+                f'{metric}{{job="{_escape_label(job_id)}",stage="{_escape_label(stage)}",'
+                f'model="{_escape_label(model)}"}} {value}'
+            )
+
+    peak = peak_rss_mb()
+    if peak is not None:
+        lines.append("# HELP textrizer_peak_rss_megabytes Peak resident set size of the process")
+        lines.append("# TYPE textrizer_peak_rss_megabytes gauge")
+        lines.append(f"textrizer_peak_rss_megabytes {peak}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: Any) -> str:
+    """Escape a Prometheus label value"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -1,23 +1,30 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from langchain_openai import ChatOpenAI
+from src.llm.tokens import count_tokens
+from src.llm.usage import BudgetedLLMComponent, UsageTracker, invoke_with_usage
 from .base_language_detector import BaseLanguageDetector
 
-class OpenAILanguageDetector(BaseLanguageDetector):
+class OpenAILanguageDetector(BudgetedLLMComponent, BaseLanguageDetector):
     """Language detector using OpenAI's GPT models"""
     
-    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.1):
+    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.1,
+                 fallback_model: Optional[str] = None, usage_tracker: Optional[UsageTracker] = None,
+                 client: Optional[ChatOpenAI] = None):
         """
         Initialize OpenAI language detector
         
         Args:
             model: OpenAI model to use
             temperature: Temperature for the model
+            fallback_model: Optional cheaper model used once the usage tracker's budget runs low
+            usage_tracker: Optional tracker aggregating token usage and enforcing the job's budget
+            client: Optional pre-built chat client (defaults to the shared pooled client for the model)
         """
-        self.client = ChatOpenAI(
-            model_name=model,
-            temperature=temperature,
-        )
+        self.client = client
         self.model = model
+        self.temperature = temperature
+        self.fallback_model = fallback_model
+        self.usage_tracker = usage_tracker
     
     def detect_language(self, text: str) -> Dict[str, Any]:
         """
@@ -31,6 +38,7 @@ class OpenAILanguageDetector(BaseLanguageDetector):
                 - language_code: ISO language code
                 - confidence: Confidence score
                 - model: Model used for detection
+                - usage: Token counts and latency of the LLM call
         """
         if not text:
             raise ValueError("Text cannot be empty")
@@ -41,9 +49,16 @@ class OpenAILanguageDetector(BaseLanguageDetector):
             "For example: 'en' for English, 'es' for Spanish, etc."
         )
         
-        response = self.client.invoke(
-            system_message + "\n\nText to analyze: " + text[:500]  # Use first 500 chars for efficiency
-        )
+        client, model = self._select_client()
+        prompt = system_message + "\n\nText to analyze: "
+        sample = text[:500]  # Use first 500 chars for efficiency
+        if self.usage_tracker:
+            # A shorter sample still identifies the language
+            sample = self.usage_tracker.fit_text(sample, count_tokens(prompt, model), 5, model)
+        prompt += sample
+        
+        response, usage = invoke_with_usage(client, prompt)
+        self._record_usage(model, usage)
         
         # Extract the language code from response
         language_code = response.content.strip().lower()
@@ -51,5 +66,6 @@ class OpenAILanguageDetector(BaseLanguageDetector):
         return {
             "language_code": language_code,
             "confidence": 1.0,  # OpenAI doesn't provide confidence scores
-            "model": self.model
+            "model": model,
+            "usage": usage
         } 
\ No newline at end of file
@@ -0,0 +1,134 @@
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+# Connection pool settings shared by every client created by this module
+_pool_settings: Dict[str, Any] = {
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 60.0,
+    "timeout": 60.0,
+    "connect_timeout": 10.0,
+}
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_chat_clients: Dict[Tuple, ChatOpenAI] = {}
+
+
+def configure_pool(max_connections: Optional[int] = None, max_keepalive_connections: Optional[int] = None,
+                   keepalive_expiry: Optional[float] = None, timeout: Optional[float] = None,
+                   connect_timeout: Optional[float] = None) -> None:
+    """
+    Configure the shared HTTP connection pool
+
+    If the settings change after the pool was created, the old pool is closed
+    and cached chat clients are dropped, so the next client is created with a
+    new pool. Unchanged settings keep the current pool.
+
+    Args:
+        max_connections: Maximum number of concurrent connections
+        max_keepalive_connections: Maximum number of idle connections kept alive
+        keepalive_expiry: Seconds an idle connection is kept alive
+        timeout: Request timeout in seconds
+        connect_timeout: Connection establishment timeout in seconds
+    """
+    updates = {
+        "max_connections": max_connections,
+        "max_keepalive_connections": max_keepalive_connections,
+        "keepalive_expiry": keepalive_expiry,
+        "timeout": timeout,
+        "connect_timeout": connect_timeout,
+    }
+    global _http_client
+    with _lock:
+        updates = {key: value for key, value in updates.items() if value is not None}
+        changed = any(_pool_settings[key] != value for key, value in updates.items())
+        _pool_settings.update(updates)
+        if changed and _http_client is not None:
+            _http_client.close()
+            _http_client = None
+            _chat_clients.clear()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Get the process-wide HTTP client with keep-alive connection pooling
+
+    Returns:
+        Shared httpx.Client
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=_pool_settings["max_connections"],
+                    max_keepalive_connections=_pool_settings["max_keepalive_connections"],
+                    keepalive_expiry=_pool_settings["keepalive_expiry"],
+                ),
+                timeout=httpx.Timeout(_pool_settings["timeout"], connect=_pool_settings["connect_timeout"]),
+            )
+        return _http_client
+
+
+def get_chat_client(model: str, temperature: float = 0.1, base_url: Optional[str] = None,
+                    api_key: Optional[str] = None, max_retries: int = 2) -> ChatOpenAI:
+    """
+    Get a chat client for a model, reusing an existing one when possible
+
+    Clients are cached per (model, temperature, base_url, api_key, max_retries)
+    and all of them share a single pooled HTTP client, so a worker keeps one
+    set of warm TLS connections regardless of how many components it runs.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        base_url: Optional OpenAI-compatible API base URL (defaults to OpenAI)
+        api_key: Optional API key (defaults to the OPENAI_API_KEY environment variable)
+        max_retries: Maximum number of retries per request
+
+    Returns:
+        ChatOpenAI client
+    """
+    key = (model, temperature, base_url, api_key, max_retries)
+    with _lock:
+        client = _chat_clients.get(key)
+    if client is not None:
+        return client
+
+    http_client = get_http_client()
+    kwargs: Dict[str, Any] = {
+        "model_name": model,
+        "temperature": temperature,
+        "http_client": http_client,
+        "timeout": _pool_settings["timeout"],
+        "max_retries": max_retries,
+    }
+    if base_url is not None:
+        kwargs["base_url"] = base_url
+    if api_key is not None:
+        kwargs["api_key"] = api_key
+
+    with _lock:
+        # Another thread may have created the client in the meantime
+        if key not in _chat_clients:
+            _chat_clients[key] = ChatOpenAI(**kwargs)
+        return _chat_clients[key]
+
+
+def close_clients() -> None:
+    """
+    Close the shared HTTP pool and forget all cached chat clients
+
+    Components created without an injected client fetch a new client (and
+    pool) on their next call.
+    """
+    global _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        _chat_clients.clear()
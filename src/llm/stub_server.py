@@ -0,0 +1,239 @@
+"""
+Deterministic OpenAI-compatible chat completions server for tests and benchmarks.
+
+Run standalone with:
+
+    python -m src.llm.stub_server --port 8080
+
+and point a local backend at http://localhost:8080/v1.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+_TEXT_MARKER = re.compile(r"Text to \w+: ", re.IGNORECASE)
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    """Get the text of a chat message whose content may be a list of parts"""
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def _split_prompt(messages: List[Dict[str, Any]]) -> tuple:
+    """Split the last user prompt into the instructions and the text they apply to"""
+    prompt = _message_text(messages[-1]) if messages else ""
+    match = None
+    for match in _TEXT_MARKER.finditer(prompt):
+        pass
+    if match is None:
+        return prompt, prompt
+    return prompt[:match.start()], prompt[match.end():]
+
+
+def _excerpt(text: str, words: int) -> str:
+    return " ".join(text.split()[:words])
+
+
+def _fill_schema(schema: Dict[str, Any], text: str, name: str = "") -> Any:
+    """Build a deterministic value matching a JSON schema"""
+    if "anyOf" in schema:
+        return _fill_schema(schema["anyOf"][0], text, name)
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {
+            key: _fill_schema(value, text, key)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        sentences = [s for s in _SENTENCE_BOUNDARY.split(text) if s.strip()][:3] or [text]
+        return [_fill_schema(schema.get("items", {}), sentence, name) for sentence in sentences]
+    if schema_type == "integer":
+        return 0
+    if schema_type == "number":
+        return 0.0
+    if schema_type == "boolean":
+        return False
+    if "language" in name:
+        return "en"
+    return _excerpt(text, 30)
+
+
+def complete(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a deterministic chat completion response for a request
+
+    Language detection prompts are answered with 'en', translation prompts
+    echo the text, other prompts return the first words of the text. Requests
+    with a JSON schema response format or tools get schema-conforming JSON.
+
+    Args:
+        request: Chat completions request body
+
+    Returns:
+        Chat completions response body
+    """
+    messages = request.get("messages", [])
+    instructions, text = _split_prompt(messages)
+    prompt_tokens = sum(len(_message_text(message).split()) for message in messages)
+
+    message: Dict[str, Any] = {"role": "assistant", "content": None}
+    finish_reason = "stop"
+
+    response_format = request.get("response_format") or {}
+    tools = request.get("tools") or []
+    if response_format.get("type") == "json_schema":
+        schema = response_format["json_schema"].get("schema", {})
+        message["content"] = json.dumps(_fill_schema(schema, text))
+    elif response_format.get("type") == "json_object":
+        message["content"] = json.dumps({"text": _excerpt(text, 30)})
+    elif tools:
+        function = tools[0]["function"]
+        message["tool_calls"] = [{
+            "id": "call_0",
+            "type": "function",
+            "function": {
+                "name": function["name"],
+                "arguments": json.dumps(_fill_schema(function.get("parameters", {}), text)),
+            },
+        }]
+        finish_reason = "tool_calls"
+    elif "language" in instructions.lower() and "detect" in instructions.lower():
+        message["content"] = "en"
+    elif "translat" in instructions.lower():
+        message["content"] = text
+    else:
+        message["content"] = _excerpt(text, 50)
+
+    completion_text = message["content"] or message["tool_calls"][0]["function"]["arguments"]
+    completion_tokens = len(completion_text.split())
+
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": 0,
+        "model": request.get("model", "stub"),
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+class StubLLMServer:
+    """OpenAI-compatible stub server running in a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, seconds_per_token: float = 0.0):
+        """
+        Initialize the stub server
+
+        Args:
+            host: Interface to bind to
+            port: Port to bind to (0 picks a free port)
+            seconds_per_token: Optional artificial delay per completion token, to
+                               mimic a real backend in benchmarks
+        """
+        self.seconds_per_token = seconds_per_token
+        self.requests: List[Dict[str, Any]] = []
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI-compatible base URL of the server"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON"}})
+                    return
+
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+
+                server.requests.append(request)
+                response = complete(request)
+                if server.seconds_per_token:
+                    time.sleep(server.seconds_per_token * response["usage"]["completion_tokens"])
+                self._send_json(200, response)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubLLMServer":
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a deterministic OpenAI-compatible stub server.')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to bind to (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--seconds_per_token', type=float, default=0.0,
+                        help='Artificial delay per completion token (default: 0)')
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.host, args.port, args.seconds_per_token)
+    print(f"Stub LLM server listening on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
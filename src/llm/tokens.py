@@ -0,0 +1,197 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List
+
+import tiktoken
+
+from src.llm.usage import estimate_cost
+
+# Context window (in tokens) of the models used by the summarizer
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o-mini": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4.1": 1_047_576,
+    "gpt-4.1-mini": 1_047_576,
+    "gpt-4.1-nano": 1_047_576,
+    "gpt-3.5-turbo": 16_385,
+}
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+# Rough throughput figures used to estimate request latency
+PROMPT_TOKENS_PER_SECOND = 5_000
+COMPLETION_TOKENS_PER_SECOND = 80
+REQUEST_OVERHEAD_SECONDS = 0.3
+
+_TIMESTAMP_PATTERNS = [
+    re.compile(r"<\|\d+(?:\.\d+)?\|>"),                                    # Whisper timestamp tokens
+    re.compile(r"\d{1,2}:\d{2}(?::\d{2})?[.,]\d{3}\s*-->\s*\d{1,2}:\d{2}(?::\d{2})?[.,]\d{3}"),  # SRT/VTT cues
+    re.compile(r"[\[(]\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d+)?[\])]"),         # [00:01:02] / (01:02)
+]
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """
+    Get the (cached) tiktoken encoding for a model
+
+    Args:
+        model: Model name
+
+    Returns:
+        tiktoken encoding, falling back to o200k_base for unknown models
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Count the tokens of a text locally
+
+    Args:
+        text: Text to count
+        model: Model whose tokenizer should be used
+
+    Returns:
+        Number of tokens
+    """
+    return len(get_encoding(model).encode(text, disallowed_special=()))
+
+
+def context_window(model: str) -> int:
+    """Get the context window of a model in tokens"""
+    if model in MODEL_CONTEXT_WINDOWS:
+        return MODEL_CONTEXT_WINDOWS[model]
+    matches = [name for name in MODEL_CONTEXT_WINDOWS if model.startswith(name + "-")]
+    if matches:
+        return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def estimate_latency(prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the latency of a request in seconds
+
+    Args:
+        prompt_tokens: Number of prompt tokens
+        completion_tokens: Expected number of completion tokens
+
+    Returns:
+        Estimated latency in seconds
+    """
+    return (
+        REQUEST_OVERHEAD_SECONDS
+        + prompt_tokens / PROMPT_TOKENS_PER_SECOND
+        + completion_tokens / COMPLETION_TOKENS_PER_SECOND
+    )
+
+
+def preflight(prompt: str, model: str, completion_tokens: int) -> Dict[str, Any]:
+    """
+    Estimate the size, cost and latency of a request before sending it
+
+    Args:
+        prompt: Full prompt text
+        model: Model the prompt will be sent to
+        completion_tokens: Expected number of completion tokens
+
+    Returns:
+        Dictionary containing prompt_tokens, completion_tokens, context_window,
+        fits (whether the request fits in the context window),
+        estimated_cost_usd and estimated_latency_seconds
+    """
+    prompt_tokens = count_tokens(prompt, model)
+    window = context_window(model)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "context_window": window,
+        "fits": prompt_tokens + completion_tokens <= window,
+        "estimated_cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+        "estimated_latency_seconds": estimate_latency(prompt_tokens, completion_tokens),
+    }
+
+
+def trim_filler(text: str, max_ngram: int = 8, max_repeats: int = 2) -> str:
+    """
+    Remove content that costs tokens without carrying information
+
+    Strips timestamps and collapses immediately repeated word n-grams (e.g.
+    "thank you thank you thank you", a common Whisper hallucination loop).
+
+    Args:
+        text: Text to trim
+        max_ngram: Longest n-gram (in words) checked for repetition
+        max_repeats: Number of consecutive copies of an n-gram to keep
+
+    Returns:
+        Trimmed text
+    """
+    for pattern in _TIMESTAMP_PATTERNS:
+        text = pattern.sub(" ", text)
+
+    words = text.split()
+    result: List[str] = []
+    for word in words:
+        result.append(word)
+        # Drop the trailing n-gram while it repeats the one right before it too often
+        for n in range(1, max_ngram + 1):
+            copies = max_repeats + 1
+            if len(result) < n * copies:
+                break
+            tail = [w.lower() for w in result[-n:]]
+            if all(
+                [w.lower() for w in result[-n * (k + 1):len(result) - n * k]] == tail
+                for k in range(1, copies)
+            ):
+                del result[-n:]
+                break
+
+    return " ".join(result)
+
+
+def split_into_chunks(text: str, model: str, chunk_tokens: int) -> List[str]:
+    """
+    Split a text into chunks of at most ``chunk_tokens`` tokens at sentence boundaries
+
+    Sentences longer than a chunk are split on token boundaries.
+
+    Args:
+        text: Text to split
+        model: Model whose tokenizer should be used
+        chunk_tokens: Maximum tokens per chunk
+
+    Returns:
+        List of chunks in order
+    """
+    if chunk_tokens <= 0:
+        raise ValueError("chunk_tokens must be positive")
+
+    encoding = get_encoding(model)
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        if not sentence:
+            continue
+        tokens = encoding.encode(sentence, disallowed_special=())
+        if len(tokens) > chunk_tokens:
+            if current:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            for start in range(0, len(tokens), chunk_tokens):
+                chunks.append(encoding.decode(tokens[start:start + chunk_tokens]))
+            continue
+        if current_tokens + len(tokens) > chunk_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += len(tokens) + 1
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
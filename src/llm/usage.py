@@ -0,0 +1,375 @@
+import threading
+import time
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+from src.llm.client_factory import get_chat_client
+
+
+def extract_usage(response: Any) -> Dict[str, int]:
+    """
+    Extract token counts from a LangChain chat model response
+    
+    Args:
+        response: Message returned by ``ChatOpenAI.invoke``
+        
+    Returns:
+        Dictionary containing prompt_tokens, completion_tokens and total_tokens
+        (zero when the backend does not report usage)
+    """
+    if isinstance(response, dict) and "raw" in response:
+        # Structured output invoked with include_raw=True
+        response = response["raw"]
+    
+    metadata = getattr(response, "response_metadata", None)
+    token_usage = metadata.get("token_usage") if isinstance(metadata, dict) else None
+    if isinstance(token_usage, dict):
+        prompt_tokens = token_usage.get("prompt_tokens") or 0
+        completion_tokens = token_usage.get("completion_tokens") or 0
+    else:
+        # Newer langchain-core versions expose usage_metadata on the message itself
+        usage_metadata = getattr(response, "usage_metadata", None)
+        if not isinstance(usage_metadata, dict):
+            usage_metadata = {}
+        prompt_tokens = usage_metadata.get("input_tokens") or 0
+        completion_tokens = usage_metadata.get("output_tokens") or 0
+    
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def invoke_with_usage(client: Any, prompt: Any) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Invoke a chat model and measure the call
+    
+    Args:
+        client: LangChain chat model (or runnable) to invoke
+        prompt: Prompt passed to ``client.invoke``
+        
+    Returns:
+        Tuple of the raw response and a usage dictionary with token counts
+        and latency_seconds
+    """
+    start = time.perf_counter()
+    response = client.invoke(prompt)
+    latency = time.perf_counter() - start
+    
+    usage = extract_usage(response)
+    usage["latency_seconds"] = latency
+    return response, usage
+
+
+def combine_usage(usages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sum the usage of several calls made for one result
+    
+    Args:
+        usages: Usage dictionaries returned by invoke_with_usage
+        
+    Returns:
+        Usage dictionary with summed token counts, latency and cost, plus the number of calls
+    """
+    combined: Dict[str, Any] = {
+        "prompt_tokens": sum(usage["prompt_tokens"] for usage in usages),
+        "completion_tokens": sum(usage["completion_tokens"] for usage in usages),
+        "total_tokens": sum(usage["total_tokens"] for usage in usages),
+        "latency_seconds": sum(usage["latency_seconds"] for usage in usages),
+        # Usages may already combine several calls
+        "calls": sum(usage.get("calls", 1) for usage in usages),
+    }
+    costs = [usage.get("cost_usd") for usage in usages]
+    if any(cost is not None for cost in costs):
+        combined["cost_usd"] = sum(cost or 0.0 for cost in costs)
+    return combined
+
+
+# USD per 1M tokens (prompt, completion)
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when an LLM call cannot be made without exceeding the job's token budget"""
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """
+    Estimate the cost of a call in USD
+    
+    Args:
+        model: Model name
+        prompt_tokens: Number of prompt tokens
+        completion_tokens: Number of completion tokens
+        
+    Returns:
+        Cost in USD, or None if the model's pricing is unknown
+    """
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        # Dated snapshots (e.g. gpt-4o-mini-2024-07-18) share the base model's price
+        matches = [name for name in MODEL_PRICING if model.startswith(name + "-")]
+        if not matches:
+            return None
+        pricing = MODEL_PRICING[max(matches, key=len)]
+    prompt_price, completion_price = pricing
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class UsageTracker:
+    """
+    Aggregates token usage and cost of all LLM calls of one job and enforces an optional token budget
+    
+    The tracker is shared by calls running on several threads; calls made
+    concurrently reserve their share of the budget up front (see
+    split_remaining) so they cannot each spend the whole remainder.
+    """
+    
+    def __init__(self, token_budget: Optional[int] = None, downgrade_ratio: float = 0.2):
+        """
+        Initialize usage tracker
+        
+        Args:
+            token_budget: Optional maximum number of tokens (prompt + completion) for the job
+            downgrade_ratio: Fraction of the budget below which components switch to their
+                             cheaper fallback model
+        """
+        if token_budget is not None and token_budget <= 0:
+            raise ValueError("Token budget must be positive")
+        
+        self.token_budget = token_budget
+        self.downgrade_ratio = downgrade_ratio
+        self.calls: List[Dict[str, Any]] = []
+        self.reserved_tokens = 0
+        self._prompt_tokens = 0
+        self._completion_tokens = 0
+        self._lock = threading.Lock()
+    
+    def record(self, component: str, model: str, usage: Dict[str, Any]) -> None:
+        """
+        Record a completed LLM call
+        
+        Args:
+            component: Name of the component that made the call
+            model: Model used for the call
+            usage: Usage dictionary returned by invoke_with_usage (cost_usd is added to it)
+        """
+        usage["cost_usd"] = estimate_cost(model, usage["prompt_tokens"], usage["completion_tokens"])
+        with self._lock:
+            self.calls.append({"component": component, "model": model, **usage})
+            self._prompt_tokens += usage["prompt_tokens"]
+            self._completion_tokens += usage["completion_tokens"]
+    
+    def split_remaining(self, parts: int) -> Optional[int]:
+        """
+        Reserve the remaining budget in equal shares for calls made concurrently
+        
+        Args:
+            parts: Number of calls that will share the budget
+            
+        Returns:
+            Tokens reserved for each call, or None if no budget is set. Each call
+            must release its share with release() once its usage is recorded.
+        """
+        if self.token_budget is None:
+            return None
+        with self._lock:
+            share = max(self.token_budget - self._prompt_tokens - self._completion_tokens - self.reserved_tokens, 0) // parts
+            self.reserved_tokens += share * parts
+        return share
+    
+    def release(self, tokens: int) -> None:
+        """Release tokens reserved with split_remaining"""
+        with self._lock:
+            self.reserved_tokens = max(self.reserved_tokens - tokens, 0)
+    
+    @property
+    def prompt_tokens(self) -> int:
+        return self._prompt_tokens
+    
+    @property
+    def completion_tokens(self) -> int:
+        return self._completion_tokens
+    
+    @property
+    def total_tokens(self) -> int:
+        with self._lock:
+            return self._prompt_tokens + self._completion_tokens
+    
+    @property
+    def cost_usd(self) -> float:
+        with self._lock:
+            return sum(call["cost_usd"] or 0.0 for call in self.calls)
+    
+    @property
+    def remaining_tokens(self) -> Optional[int]:
+        """Tokens left in the budget and not reserved by running calls, or None if no budget is set"""
+        if self.token_budget is None:
+            return None
+        with self._lock:
+            return max(self.token_budget - self._prompt_tokens - self._completion_tokens - self.reserved_tokens, 0)
+    
+    def should_downgrade(self) -> bool:
+        """
+        Whether the unspent budget is low enough to switch to cheaper models
+
+        Only tokens actually spent count here: shares reserved by running
+        calls with split_remaining are not spent yet, and counting them would
+        send every concurrent call to the fallback model.
+        """
+        if self.token_budget is None:
+            return False
+        return self.token_budget - self.total_tokens < self.token_budget * self.downgrade_ratio
+    
+    def check(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """
+        Verify that a call fits in the remaining budget
+        
+        Args:
+            prompt_tokens: Estimated prompt tokens of the call
+            completion_tokens: Estimated completion tokens of the call
+            
+        Raises:
+            BudgetExceededError: If the call would exceed the budget
+        """
+        if self.token_budget is None:
+            return
+        needed = prompt_tokens + completion_tokens
+        if needed > self.remaining_tokens:
+            raise BudgetExceededError(
+                f"Call needs ~{needed} tokens but only {self.remaining_tokens} of "
+                f"{self.token_budget} remain in the budget"
+            )
+    
+    def _call_budget(self, reserved_tokens: Optional[int]) -> int:
+        """Tokens a call may use: its reserved share, or else the shared remainder"""
+        return self.remaining_tokens if reserved_tokens is None else reserved_tokens
+    
+    def fits(self, prompt_tokens: int, completion_tokens: int, reserved_tokens: Optional[int] = None) -> bool:
+        """
+        Whether a call fits in the budget without shortening its input
+        
+        Args:
+            prompt_tokens: Prompt tokens of the call
+            completion_tokens: Estimated completion tokens of the call
+            reserved_tokens: Share reserved for this call with split_remaining
+            
+        Returns:
+            True if no budget is set or the call fits in it
+        """
+        if self.token_budget is None:
+            return True
+        return prompt_tokens + completion_tokens <= self._call_budget(reserved_tokens)
+    
+    def fit_text(self, text: str, overhead_tokens: int, completion_tokens: int, model: str,
+                 reserved_tokens: Optional[int] = None) -> str:
+        """
+        Shorten a text so that a call using it fits in the remaining budget
+        
+        The text is measured and cut with the model's tokenizer, so the call
+        fits exactly and no more is dropped than needed.
+        
+        Args:
+            text: Text that will be sent to the model
+            overhead_tokens: Tokens of the rest of the prompt
+            completion_tokens: Estimated completion tokens of the call
+            model: Model the call is sent to
+            reserved_tokens: Share reserved for this call with split_remaining; the call
+                             is fitted to it instead of the shared remainder
+            
+        Returns:
+            The original text, or a truncated version if the budget requires it
+            (a warning is emitted when the text is truncated)
+            
+        Raises:
+            BudgetExceededError: If not even an empty text would fit
+        """
+        if self.token_budget is None:
+            return text
+        # tokens imports this module for estimate_cost
+        from src.llm.tokens import get_encoding
+        
+        budget = self._call_budget(reserved_tokens)
+        available = budget - overhead_tokens - completion_tokens
+        if available <= 0:
+            raise BudgetExceededError(
+                f"Only {budget} of {self.token_budget} tokens remain in the budget for this call"
+            )
+        encoding = get_encoding(model)
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= available:
+            return text
+        warnings.warn(
+            f"Text of {len(tokens)} tokens truncated to {available} tokens to fit the "
+            f"remaining budget of {budget} tokens",
+            stacklevel=2
+        )
+        return encoding.decode(tokens[:available])
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get aggregated usage of the job
+        
+        Returns:
+            Dictionary containing token totals, cost, budget and per-call details
+        """
+        with self._lock:
+            calls = list(self.calls)
+        return {
+            "prompt_tokens": sum(call["prompt_tokens"] for call in calls),
+            "completion_tokens": sum(call["completion_tokens"] for call in calls),
+            "total_tokens": sum(call["prompt_tokens"] + call["completion_tokens"] for call in calls),
+            "cost_usd": sum(call["cost_usd"] or 0.0 for call in calls),
+            "latency_seconds": sum(call["latency_seconds"] for call in calls),
+            "token_budget": self.token_budget,
+            "remaining_tokens": self.remaining_tokens,
+            "calls": calls,
+        }
+
+
+class BudgetedLLMComponent:
+    """
+    Mixin for LLM components that report usage to a job's UsageTracker
+
+    Classes using it set model, temperature, fallback_model and usage_tracker.
+    Unless a client is injected, the shared client of the model is looked up
+    from the client factory on every call, so components keep working after
+    the pool is reconfigured or closed.
+    """
+    
+    _client: Any = None
+    # Extra arguments of get_chat_client, e.g. base_url and api_key of a local server
+    client_options: Dict[str, Any] = {}
+    
+    @property
+    def client(self) -> Any:
+        """Client of the main model"""
+        if self._client is not None:
+            return self._client
+        return get_chat_client(self.model, self.temperature, **self.client_options)
+    
+    @client.setter
+    def client(self, client: Any) -> None:
+        self._client = client
+    
+    def _fallback_client(self) -> Any:
+        """Client of the fallback model"""
+        return get_chat_client(self.fallback_model, self.temperature, **self.client_options)
+    
+    def _select_client(self) -> Tuple[Any, str]:
+        """Pick the client for the next call, switching to the fallback model when the budget runs low"""
+        if self.fallback_model and self.usage_tracker and self.usage_tracker.should_downgrade():
+            return self._fallback_client(), self.fallback_model
+        return self.client, self.model
+    
+    def _record_usage(self, model: str, usage: Dict[str, Any]) -> None:
+        """Add a completed call to the job's usage tracker"""
+        if self.usage_tracker:
+            self.usage_tracker.record(self.__class__.__name__, model, usage)
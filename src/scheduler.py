@@ -0,0 +1,256 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from src.instrumentation import Instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Stages whose wall time is spent computing locally rather than waiting on the LLM
+COMPUTE_STAGES = ("audio_extraction", "transcription")
+
+
+def available_cores() -> int:
+    """Get the number of cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def available_memory_mb() -> Optional[float]:
+    """
+    Get the memory available to new processes without swapping
+
+    Returns:
+        MemAvailable in megabytes, or None if the platform does not report it
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def system_load() -> Optional[float]:
+    """Get the one-minute load average, or None if the platform does not report it"""
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+
+class ResourceScheduler:
+    """Sizes worker processes, intra-op threads and LLM concurrency from measured job costs"""
+
+    def __init__(self, max_processes: Optional[int] = None, min_threads_per_process: int = 2,
+                 memory_reserve_mb: float = 1024.0, initial_memory_mb: float = 2048.0,
+                 max_llm_concurrency: int = 20, smoothing: float = 0.3):
+        """
+        Initialize scheduler
+
+        Args:
+            max_processes: Upper bound on worker processes (defaults to the number of cores)
+            min_threads_per_process: Fewest intra-op threads a worker gets, so cores are
+                                     not split into slices too small to run a model well
+            memory_reserve_mb: Memory left free for the OS and the main process
+            initial_memory_mb: Estimated peak memory of a worker until one has been measured
+            max_llm_concurrency: LLM requests allowed in flight across all workers
+            smoothing: Weight of the newest observation in the moving averages
+        """
+        self.min_threads_per_process = min_threads_per_process
+        self.max_processes = max_processes or available_cores()
+        self.memory_reserve_mb = memory_reserve_mb
+        self.memory_per_process_mb = initial_memory_mb
+        self.max_llm_concurrency = max_llm_concurrency
+        self.smoothing = smoothing
+
+        self.real_time_factor: Optional[float] = None
+        self.compute_seconds: Optional[float] = None
+        self.llm_seconds: Optional[float] = None
+        self.completed_jobs = 0
+        self.failed_jobs = 0
+        self._measured = False
+        self._warm_workers: set = set()
+        self._running: Dict[Future, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _average(self, current: Optional[float], value: Optional[float]) -> Optional[float]:
+        """Exponential moving average that starts at the first value"""
+        if value is None:
+            return current
+        if current is None:
+            return value
+        return (1 - self.smoothing) * current + self.smoothing * value
+
+    def observe(self, metrics: Instrumentation, peak_memory_mb: Optional[float] = None,
+                worker_id: Optional[int] = None) -> None:
+        """
+        Update the cost model with a finished job
+
+        Args:
+            metrics: Instrumentation of the job
+            peak_memory_mb: Peak RSS of the worker process that ran it
+            worker_id: Identifier of the worker (e.g. its pid); workers that have run a
+                       job keep their models loaded and need no additional memory
+        """
+        with self._lock:
+            self.completed_jobs += 1
+            for stage in metrics.stages:
+                if stage["name"] == "transcription":
+                    self.real_time_factor = self._average(self.real_time_factor, stage.get("real_time_factor"))
+            self.compute_seconds = self._average(self.compute_seconds, sum(
+                stage["wall_seconds"] for stage in metrics.stages if stage["name"] in COMPUTE_STAGES
+            ))
+            self.llm_seconds = self._average(self.llm_seconds, sum(
+                stage["wall_seconds"] for stage in metrics.stages if stage["name"] not in COMPUTE_STAGES
+            ))
+            if peak_memory_mb is not None:
+                # The largest footprint seen so far is kept, since averaging could underestimate the next job
+                if self._measured:
+                    self.memory_per_process_mb = max(self.memory_per_process_mb, peak_memory_mb)
+                else:
+                    self.memory_per_process_mb = peak_memory_mb
+                    self._measured = True
+            if worker_id is not None:
+                self._warm_workers.add(worker_id)
+
+    def plan(self, pending_jobs: int = 1) -> Dict[str, Any]:
+        """
+        Decide how many jobs to run at once and with how many threads
+
+        Cores busy with work outside the scheduler (load average minus the
+        threads of running jobs) are left alone. Jobs only use their cores
+        during the compute stages, so when LLM stages take a measurable share
+        of a job more jobs are run than the cores alone would allow. Memory of
+        workers that already hold their models is counted as available to
+        them, and every other worker needs the measured peak footprint. The
+        LLM concurrency budget is split between the workers.
+
+        Args:
+            pending_jobs: Number of jobs waiting to start
+
+        Returns:
+            Dictionary with processes, threads_per_process, llm_concurrency and
+            the measurements the decision was based on
+        """
+        with self._lock:
+            running = len(self._running)
+            busy_threads = sum(job["threads_per_process"] for job in self._running.values())
+
+            cores = available_cores()
+            load = system_load()
+            external_load = max(0.0, load - busy_threads) if load is not None else 0.0
+            free_cores = max(self.min_threads_per_process, cores - round(external_load))
+            compute_fraction = 1.0
+            if self.compute_seconds and self.llm_seconds:
+                compute_fraction = self.compute_seconds / (self.compute_seconds + self.llm_seconds)
+            by_cores = max(1, int(free_cores / (self.min_threads_per_process * compute_fraction)))
+
+            memory = available_memory_mb()
+            if memory is None:
+                by_memory = by_cores
+            else:
+                new_workers = int(max(0.0, memory - self.memory_reserve_mb) // self.memory_per_process_mb)
+                by_memory = max(1, len(self._warm_workers) + new_workers)
+
+            processes = max(1, min(by_cores, by_memory, self.max_processes, running + max(1, pending_jobs)))
+            return {
+                "processes": processes,
+                # Cores are shared by the jobs that are computing at the same time on average
+                "threads_per_process": max(1, min(free_cores, int(free_cores / (processes * compute_fraction)))),
+                "llm_concurrency": max(1, self.max_llm_concurrency // processes),
+                "available_cores": free_cores,
+                "available_memory_mb": memory,
+                "memory_per_process_mb": self.memory_per_process_mb,
+                "real_time_factor": self.real_time_factor,
+                "compute_fraction": compute_fraction
+            }
+
+    def run(self, items: Iterable[Any], job: Callable[[Any, Dict[str, Any]], Tuple[Instrumentation, Optional[float], int]],
+            initializer: Optional[Callable] = None, initargs: Tuple = ()) -> Iterator[Instrumentation]:
+        """
+        Run a job for every item in a pool of worker processes
+
+        Items are consumed in a background thread, so they may be produced
+        lazily (e.g. videos yielded as their downloads complete). Before each
+        job is started the plan is recomputed, so the number of concurrent
+        jobs and their thread counts follow the measured costs and the load
+        of the machine.
+
+        Args:
+            items: Items to process
+            job: Picklable function called in a worker as job(item, plan); returns the
+                 job's Instrumentation, the worker's peak RSS in MB and a worker id
+            initializer: Optional function run once in every worker process
+            initargs: Arguments of the initializer
+
+        Jobs that raise are reported and counted in failed_jobs; the
+        remaining items are still processed.
+
+        Yields:
+            Instrumentation of each successful job, in completion order
+        """
+        incoming: queue.Queue = queue.Queue()
+
+        def produce():
+            try:
+                for item in items:
+                    incoming.put(("item", item))
+            except Exception as e:
+                incoming.put(("error", e))
+            incoming.put(("done", None))
+
+        threading.Thread(target=produce, daemon=True).start()
+
+        pending = []
+        exhausted = False
+        # Workers are started with spawn so they don't inherit torch's thread pools
+        with ProcessPoolExecutor(max_workers=self.max_processes, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=initializer, initargs=initargs) as executor:
+            while not exhausted or pending or self._running:
+                # Block for new items only when nothing is running
+                block = not self._running and not pending
+                while not exhausted:
+                    try:
+                        kind, value = incoming.get(block=block, timeout=None if block else 0)
+                    except queue.Empty:
+                        break
+                    block = False
+                    if kind == "item":
+                        pending.append(value)
+                    elif kind == "error":
+                        raise value
+                    else:
+                        exhausted = True
+
+                while pending:
+                    plan = self.plan(len(pending))
+                    if len(self._running) >= plan["processes"]:
+                        break
+                    future = executor.submit(job, pending.pop(0), plan)
+                    with self._lock:
+                        self._running[future] = plan
+                    logger.info("Scheduled job with %d threads (%d/%d running)",
+                                plan["threads_per_process"], len(self._running), plan["processes"])
+
+                if not self._running:
+                    continue
+                done, _ = wait(list(self._running), timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    with self._lock:
+                        del self._running[future]
+                    try:
+                        metrics, peak_memory_mb, worker_id = future.result()
+                    except Exception as e:
+                        # One failed video should not abort the rest of the run
+                        self.failed_jobs += 1
+                        logger.warning("Skipping failed job: %s", e)
+                        continue
+                    self.observe(metrics, peak_memory_mb, worker_id)
+                    yield metrics
@@ -0,0 +1,40 @@
+from typing import Optional
+from src.llm.usage import UsageTracker
+from .openai_summarizer import OpenAISummarizer
+
+class LocalSummarizer(OpenAISummarizer):
+    """Summarizer using a local OpenAI-compatible server (e.g. llama.cpp, vLLM, Ollama)"""
+    
+    def __init__(self, model: str = "local-model", base_url: str = "http://localhost:8080/v1",
+                 api_key: str = "sk-no-key-required", temperature: float = 0.1, max_length: int = 2000,
+                 fallback_model: Optional[str] = None, usage_tracker: Optional[UsageTracker] = None, max_input_tokens: int = 6000,
+                 chunk_tokens: int = 2000, max_concurrency: int = 2):
+        """
+        Initialize local summarizer
+        
+        Args:
+            model: Model name served by the local endpoint
+            base_url: Base URL of the OpenAI-compatible API
+            api_key: API key expected by the server (most local servers ignore it)
+            temperature: Temperature for the model
+            max_length: Target maximum length for summaries
+            fallback_model: Optional cheaper model on the same server used once the usage
+                            tracker's budget runs low
+            usage_tracker: Optional tracker aggregating token usage and enforcing the job's budget
+            max_input_tokens: Largest prompt sent in a single request; local models usually
+                              have much smaller context windows than hosted ones
+            chunk_tokens: Size of the chunks used when a text is too long for a single request
+            max_concurrency: Maximum number of chunk requests in flight at once
+        """
+        super().__init__(
+            model=model,
+            temperature=temperature,
+            max_length=max_length,
+            fallback_model=fallback_model,
+            usage_tracker=usage_tracker,
+            max_input_tokens=max_input_tokens,
+            chunk_tokens=chunk_tokens,
+            max_concurrency=max_concurrency
+        )
+        self.base_url = base_url
+        self.client_options = {"base_url": base_url, "api_key": api_key}
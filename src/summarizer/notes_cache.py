@@ -0,0 +1,90 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Tuple
+from config.config import NOTES_CACHE_PATH
+
+
+def chunk_key(chunk: str, model: str) -> str:
+    """Key identifying the notes of a chunk produced by a model"""
+    return hashlib.sha256(f"{model}\0{chunk}".encode("utf-8")).hexdigest()
+
+
+class NotesCache:
+    """Local SQLite store of focus-independent notes for transcript chunks"""
+
+    def __init__(self, db_path: str = NOTES_CACHE_PATH):
+        """
+        Initialize notes cache
+
+        Args:
+            db_path: Path of the SQLite database (created if missing)
+        """
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS notes (
+                chunk_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                notes TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def lookup(self, chunks: List[str], model: str) -> Dict[str, str]:
+        """
+        Find cached notes for chunks
+
+        Args:
+            chunks: Transcript chunks
+            model: Model the notes must have been produced by
+
+        Returns:
+            Dictionary mapping each found chunk to its notes
+        """
+        keys = {chunk_key(chunk, model): chunk for chunk in chunks}
+        found: Dict[str, str] = {}
+        with self._lock:
+            hashes = list(keys)
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for key, notes in self._connection.execute(
+                    f"SELECT chunk_key, notes FROM notes WHERE chunk_key IN ({placeholders})", batch
+                ):
+                    found[keys[key]] = notes
+        return found
+
+    def store(self, pairs: List[Tuple[str, str]], model: str) -> None:
+        """
+        Store chunk notes
+
+        Args:
+            pairs: List of (chunk, notes) pairs
+            model: Model that produced the notes
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?)",
+                [(chunk_key(chunk, model), model, notes, now) for chunk, notes in pairs]
+            )
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
@@ -1,11 +1,35 @@
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Type
 from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, Field, field_validator
+from src.llm.tokens import context_window, count_tokens, preflight, split_into_chunks, trim_filler
+from src.llm.usage import BudgetedLLMComponent, UsageTracker, combine_usage, invoke_with_usage
 from .base_summarizer import BaseSummarizer
+from .notes_cache import NotesCache
 
-class OpenAISummarizer(BaseSummarizer):
+class TranscriptAnalysis(BaseModel):
+    """Structured result of a single-pass transcript analysis"""
+    
+    summary: str = Field(description="Concise prose summary of the text")
+    bullet_points: List[str] = Field(description="The most important points of the text, one per item")
+    language_code: str = Field(description="ISO 639-1 code (2 letters) of the language the text is written in")
+    
+    @field_validator("language_code")
+    @classmethod
+    def normalize_language_code(cls, value: str) -> str:
+        value = value.strip().lower()
+        if len(value) != 2 or not value.isalpha():
+            raise ValueError(f"Invalid ISO 639-1 language code: {value}")
+        return value
+
+class OpenAISummarizer(BudgetedLLMComponent, BaseSummarizer):
     """Summarizer using OpenAI's GPT models"""
     
-    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.1, max_length: int = 2000):
+    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.1, max_length: int = 2000,
+                 fallback_model: Optional[str] = None, usage_tracker: Optional[UsageTracker] = None,
+                 max_input_tokens: Optional[int] = None, chunk_tokens: int = 8000, max_concurrency: int = 4,
+                 client: Optional[ChatOpenAI] = None, notes_cache: Optional[NotesCache] = None,
+                 notes_min_tokens: int = 2000):
         """
         Initialize OpenAI summarizer
         
@@ -13,13 +37,250 @@ class OpenAISummarizer(BaseSummarizer):
             model: OpenAI model to use
             temperature: Temperature for the model (lower means more focused/deterministic)
             max_length: Target maximum length for summaries
+            fallback_model: Optional cheaper model used once the usage tracker's budget runs low
+            usage_tracker: Optional tracker aggregating token usage and enforcing the job's budget
+            max_input_tokens: Largest prompt sent in a single request (defaults to the model's
+                              context window minus room for the completion)
+            chunk_tokens: Size of the chunks used when a text is too long for a single request
+            max_concurrency: Maximum number of chunk requests in flight at once
+            client: Optional pre-built chat client (defaults to the shared pooled client for the model)
+            notes_cache: Optional cache of per-chunk notes; when set, texts longer than
+                         notes_min_tokens are summarized from focus-independent chunk notes,
+                         so changing the focus points only re-runs the final reduce step
+            notes_min_tokens: Smallest text (in tokens) summarized through cached notes
         """
-        self.client = ChatOpenAI(
-            model_name=model,
-            temperature=temperature,
-        )
+        self.client = client
         self.model = model
         self.max_length = max_length
+        self.temperature = temperature
+        self.fallback_model = fallback_model
+        self.usage_tracker = usage_tracker
+        self.max_input_tokens = max_input_tokens or context_window(model) - 4096
+        self.chunk_tokens = min(chunk_tokens, self.max_input_tokens)
+        self.max_concurrency = max_concurrency
+        self.notes_cache = notes_cache
+        self.notes_min_tokens = notes_min_tokens
+    
+    def _input_limit(self, model: str) -> int:
+        """Largest prompt that can be sent to a model in a single request"""
+        if model == self.model:
+            return self.max_input_tokens
+        # The fallback model may have a smaller context window than the main one
+        return min(self.max_input_tokens, context_window(model) - 4096)
+    
+    def _invoke(self, prompt: str, text: str, completion_tokens: int,
+                schema: Optional[Type[BaseModel]] = None,
+                reserved_tokens: Optional[int] = None) -> Tuple[Any, Dict[str, Any], str, bool]:
+        """
+        Send a prompt followed by a text, shortening the text if the job's budget requires it
+        
+        A text that does not fit in the budget is first stripped of filler and
+        sent to the cheaper fallback model (if one is set and the text fits in
+        its context window); only what still does not fit is truncated.
+        
+        Args:
+            prompt: Instructions placed before the text
+            text: Text to send
+            completion_tokens: Expected number of completion tokens
+            schema: Optional pydantic model the response must be parsed into
+            reserved_tokens: Budget share reserved for this call with UsageTracker.split_remaining;
+                             the text is fitted to it and it is released after the call
+        
+        Returns:
+            Tuple of the response content (or parsed schema instance), usage, model used
+            and whether the text was truncated
+        
+        Raises:
+            ValueError: If a structured response does not match the schema
+        """
+        client, model = self._select_client()
+        original_length = len(text)
+        try:
+            if self.usage_tracker:
+                client, model, text = self._fit_budget(client, model, prompt, text, completion_tokens,
+                                                       reserved_tokens)
+            
+            if schema is None:
+                response, usage = invoke_with_usage(client, prompt + text)
+                self._record_usage(model, usage)
+                return response.content, usage, model, len(text) < original_length
+            
+            structured_client = client.with_structured_output(schema, include_raw=True)
+            response, usage = invoke_with_usage(structured_client, prompt + text)
+            self._record_usage(model, usage)
+        finally:
+            if reserved_tokens is not None:
+                self.usage_tracker.release(reserved_tokens)
+        if response.get("parsing_error") or response.get("parsed") is None:
+            raise ValueError(f"Failed to parse structured response: {response.get('parsing_error')}")
+        return response["parsed"], usage, model, len(text) < original_length
+    
+    def _fit_budget(self, client: Any, model: str, prompt: str, text: str, completion_tokens: int,
+                    reserved_tokens: Optional[int]) -> Tuple[Any, str, str]:
+        """
+        Make a request fit in the job's budget, truncating the text only as a last resort
+        
+        Returns:
+            Tuple of the client, model and text to send
+        """
+        if self.usage_tracker.fits(count_tokens(prompt + text, model), completion_tokens, reserved_tokens):
+            return client, model, text
+        
+        text = trim_filler(text)
+        if (self.fallback_model and model != self.fallback_model
+                and count_tokens(prompt + text, self.fallback_model) <= self._input_limit(self.fallback_model)):
+            client = self._fallback_client()
+            model = self.fallback_model
+        
+        text = self.usage_tracker.fit_text(text, count_tokens(prompt, model), completion_tokens, model,
+                                           reserved_tokens)
+        return client, model, text
+    
+    def _prepare(self, prompt: str, text: str, completion_tokens: int, model: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Count tokens locally and pick a strategy before anything is sent
+        
+        Texts that do not fit in a single request are first stripped of filler
+        (timestamps, repeated n-grams); if they still do not fit they are
+        summarized in chunks.
+        
+        Args:
+            prompt: Instructions placed before the text
+            text: Text to send
+            completion_tokens: Expected number of completion tokens
+            model: Model the request will be sent to
+        
+        Returns:
+            Tuple of the (possibly trimmed) text and the pre-flight estimate,
+            including the chosen strategy: 'single', 'trimmed' or 'chunked'
+        """
+        estimate = preflight(prompt + text, model, completion_tokens)
+        if estimate["prompt_tokens"] <= self._input_limit(model):
+            estimate["strategy"] = "single"
+            return text, estimate
+        
+        trimmed = trim_filler(text)
+        trimmed_estimate = preflight(prompt + trimmed, model, completion_tokens)
+        if trimmed_estimate["prompt_tokens"] <= self._input_limit(model):
+            trimmed_estimate["strategy"] = "trimmed"
+            return trimmed, trimmed_estimate
+        
+        trimmed_estimate["strategy"] = "chunked"
+        return trimmed, trimmed_estimate
+    
+    def _summarize_chunks(self, text: str, focus_points: Optional[str],
+                          model: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Summarize each chunk of a long text (map step of the chunked strategy)
+        
+        Returns:
+            Tuple of the per-chunk summaries (in order) and the usage of each call
+        """
+        results = self._map_chunks(split_into_chunks(text, model, self.chunk_tokens), focus_points)
+        return [content for content, _, _, _ in results], [usage for _, usage, _, _ in results]
+    
+    def _map_chunks(self, chunks: List[str], focus_points: Optional[str]) -> List[Tuple[str, Dict[str, Any], str, bool]]:
+        """
+        Summarize chunks concurrently
+        
+        With a token budget, the remaining budget is split between the chunks
+        before any is sent, since concurrent calls would otherwise each be
+        fitted to the whole remainder.
+        
+        Returns:
+            Result of _invoke for each chunk, in order: summary, usage, model
+            used and whether the chunk was truncated
+        """
+        prompt = (
+            "You are an expert summarizer. The following text is one part of a longer transcript. "
+            "Summarize it in the same language as the text, keeping every fact, argument and example "
+            "that could matter for the final summary."
+        )
+        if focus_points:
+            prompt += f" Pay particular attention to these aspects: {focus_points}."
+        prompt += "\n\nText to summarize: "
+        
+        share = self.usage_tracker.split_remaining(len(chunks)) if self.usage_tracker else None
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return list(executor.map(
+                lambda chunk: self._invoke(prompt, chunk, self.chunk_tokens // 8, reserved_tokens=share),
+                chunks
+            ))
+    
+    def _cached_notes(self, text: str, model: str) -> Tuple[str, Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Turn a text into focus-independent chunk notes, reusing cached ones
+        
+        Only chunks missing from the notes cache are sent to the model, so a
+        transcript that was summarized before costs no map requests at all.
+        Notes are cached under the model that actually produced them, and
+        notes of truncated chunks are not cached.
+        
+        Args:
+            text: Text to turn into notes
+            model: Model the requests are expected to be served by
+        
+        Returns:
+            Tuple of the joined notes, the notes statistics (number of chunks
+            and cache hits) and the usage of the chunk requests that were needed
+        """
+        chunks = split_into_chunks(trim_filler(text), model, self.chunk_tokens)
+        notes = self.notes_cache.lookup(chunks, model)
+        cache_hits = sum(1 for chunk in chunks if chunk in notes)
+        missing = list(dict.fromkeys(chunk for chunk in chunks if chunk not in notes))
+        
+        usages: List[Dict[str, Any]] = []
+        if missing:
+            results = self._map_chunks(missing, None)
+            usages = [usage for _, usage, _, _ in results]
+            by_model: Dict[str, List[Tuple[str, str]]] = {}
+            for chunk, (content, _, served_by, truncated) in zip(missing, results):
+                notes[chunk] = content
+                if not truncated:
+                    by_model.setdefault(served_by, []).append((chunk, content))
+            for served_by, pairs in by_model.items():
+                self.notes_cache.store(pairs, served_by)
+        
+        stats = {"chunks": len(chunks), "cache_hits": cache_hits}
+        return "\n\n".join(notes[chunk] for chunk in chunks), stats, usages
+    
+    def _condense(self, prompt: str, text: str, focus_points: Optional[str],
+                  completion_tokens: int) -> Tuple[str, Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Reduce a text until it fits in a single request with the given prompt
+        
+        Returns:
+            Tuple of the text to send, the pre-flight estimate and the usage of
+            any chunk summaries that were needed
+        """
+        usages: List[Dict[str, Any]] = []
+        notes_stats = None
+        # Size the request for the model it will actually be sent to
+        _, model = self._select_client()
+        if self.notes_cache is not None and count_tokens(text, model) > self.notes_min_tokens:
+            # Focus points only enter the reduce step, so the notes can be reused for any focus
+            text, notes_stats, usages = self._cached_notes(text, model)
+        
+        text, estimate = self._prepare(prompt, text, completion_tokens, model)
+        estimate["num_chunks"] = 1
+        if notes_stats is not None:
+            estimate["strategy"] = "notes"
+            estimate["notes"] = notes_stats
+            estimate["num_chunks"] = notes_stats["chunks"]
+        
+        tokens = count_tokens(prompt + text, model)
+        while tokens > self._input_limit(model):
+            notes, chunk_usages = self._summarize_chunks(text, focus_points, model)
+            usages.extend(chunk_usages)
+            estimate["num_chunks"] = max(estimate["num_chunks"], len(notes))
+            text = "\n\n".join(notes)
+            
+            reduced_tokens = count_tokens(prompt + text, model)
+            if reduced_tokens >= tokens:
+                raise ValueError("Chunk summaries did not shrink the text; increase max_input_tokens")
+            tokens = reduced_tokens
+        
+        return text, estimate, usages
     
     def summarize(self, text: str, focus_points: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -28,13 +289,14 @@ class OpenAISummarizer(BaseSummarizer):
         Args:
             text: Text to summarize
             focus_points: Optional string indicating specific areas of interest
-            
+        
         Returns:
             Dictionary containing:
                 - summary: Summarized text
                 - focus_points: Areas of focus (if provided)
                 - model: Model used for summarization
-                - metadata: Additional information
+                - metadata: Additional information, including the pre-flight estimate
+                - usage: Token counts and latency of the LLM calls
         """
         if not text:
             raise ValueError("Text to summarize cannot be empty")
@@ -54,26 +316,32 @@ class OpenAISummarizer(BaseSummarizer):
                 "characters while maintaining accuracy and capturing key points."
             )
         
-        # Get the summary from the model
-        response = self.client.invoke(
-            system_message + "\n\nText to summarize: " + text
-        )
+        prompt = system_message + "\n\nText to summarize: "
+        original_length = len(text)
         
-        summary = response.content
+        # Count tokens locally and trim or chunk oversized transcripts before sending
+        text, estimate, usages = self._condense(prompt, text, focus_points, self.max_length // 4)
+        
+        # Get the summary from the model
+        summary, usage, model, truncated = self._invoke(prompt, text, self.max_length // 4)
+        usages.append(usage)
         
         # Prepare metadata about the summarization
         metadata = {
-            "original_length": len(text),
+            "original_length": original_length,
             "summary_length": len(summary),
-            "compression_ratio": len(summary) / len(text),
-            "max_length": self.max_length
+            "compression_ratio": len(summary) / original_length,
+            "max_length": self.max_length,
+            "truncated_for_budget": truncated,
+            "preflight": estimate
         }
         
         return {
             "summary": summary,
             "focus_points": focus_points,
-            "model": self.model,
-            "metadata": metadata
+            "model": model,
+            "metadata": metadata,
+            "usage": combine_usage(usages)
         }
     
     def bullet_point_summary(self, text: str, num_points: int = 5, focus_points: Optional[str] = None) -> Dict[str, Any]:
@@ -84,9 +352,9 @@ class OpenAISummarizer(BaseSummarizer):
             text: Text to summarize
             num_points: Number of bullet points to generate
             focus_points: Optional string indicating specific areas of interest
-            
+        
         Returns:
-            Dictionary containing summary and metadata
+            Dictionary containing summary, metadata and usage (token counts and latency)
         """
         if not text:
             raise ValueError("Text to summarize cannot be empty")
@@ -102,16 +370,87 @@ class OpenAISummarizer(BaseSummarizer):
         if focus_points:
             system_message += f"Focus particularly on these aspects: {focus_points}."
         
-        response = self.client.invoke(
-            system_message + "\n\nText to summarize: " + text
-        )
+        prompt = system_message + "\n\nText to summarize: "
+        text, estimate, usages = self._condense(prompt, text, focus_points, num_points * 50)
         
-        bullet_points = response.content
+        bullet_points, usage, model, truncated = self._invoke(prompt, text, num_points * 50)
+        usages.append(usage)
         
         return {
             "summary": bullet_points,
             "format": "bullet_points",
             "num_points": num_points,
             "focus_points": focus_points,
-            "model": self.model
-        } 
\ No newline at end of file
+            "model": model,
+            "metadata": {
+                "truncated_for_budget": truncated,
+                "preflight": estimate
+            },
+            "usage": combine_usage(usages)
+        }
+    
+    def analyze(self, text: str, focus_points: Optional[str] = None, num_points: int = 5) -> Dict[str, Any]:
+        """
+        Produce a prose summary, bullet points and the language code in a single request
+        
+        The transcript is sent once instead of once per result, which is what
+        makes this cheaper than calling summarize, bullet_point_summary and a
+        language detector separately.
+        
+        Args:
+            text: Text to analyze
+            focus_points: Optional string indicating specific areas of interest
+            num_points: Number of bullet points to generate
+        
+        Returns:
+            Dictionary containing:
+                - summary: Summarized text
+                - bullet_points: List of the most important points
+                - language_code: ISO 639-1 code of the text's language
+                - focus_points: Areas of focus (if provided)
+                - model: Model used for the analysis
+                - metadata: Additional information, including the pre-flight estimate
+                - usage: Token counts and latency of the LLM calls
+        """
+        if not text:
+            raise ValueError("Text to summarize cannot be empty")
+        
+        if num_points <= 0:
+            raise ValueError("Number of points must be positive")
+        
+        system_message = (
+            "You are an expert summarizer. Analyze the following text and return: "
+            f"a concise summary under {self.max_length} characters that maintains accuracy and captures key points; "
+            f"the {num_points} most important points as a list; "
+            "and the ISO 639-1 language code (2 letters) of the language the text is written in. "
+            "Write the summary and the points in the same language as the text. "
+        )
+        
+        if focus_points:
+            system_message += f"Focus particularly on these aspects: {focus_points}."
+        
+        prompt = system_message + "\n\nText to analyze: "
+        original_length = len(text)
+        completion_tokens = self.max_length // 4 + num_points * 50
+        
+        text, estimate, usages = self._condense(prompt, text, focus_points, completion_tokens)
+        
+        analysis, usage, model, truncated = self._invoke(prompt, text, completion_tokens, schema=TranscriptAnalysis)
+        usages.append(usage)
+        
+        return {
+            "summary": analysis.summary,
+            "bullet_points": analysis.bullet_points,
+            "language_code": analysis.language_code,
+            "focus_points": focus_points,
+            "model": model,
+            "metadata": {
+                "original_length": original_length,
+                "summary_length": len(analysis.summary),
+                "compression_ratio": len(analysis.summary) / original_length,
+                "max_length": self.max_length,
+                "truncated_for_budget": truncated,
+                "preflight": estimate
+            },
+            "usage": combine_usage(usages)
+        }
\ No newline at end of file
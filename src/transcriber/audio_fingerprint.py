@@ -0,0 +1,352 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import torch
+import torch.nn.functional as F
+from config.config import FINGERPRINT_INDEX_PATH
+from .audio_utils import SAMPLE_RATE, load_audio
+from .base_transcriber import BaseTranscriber
+
+logger = logging.getLogger(__name__)
+
+# Spectrogram and peak-pairing parameters (32 ms hop at 16 kHz)
+N_FFT = 1024
+HOP_LENGTH = 512
+PEAK_NEIGHBORHOOD = (31, 31)  # (frequency bins, frames)
+PEAK_BLOCK_FRAMES = 31  # about one second
+PEAKS_PER_BLOCK = 5
+PEAK_MIN_LEVEL = 0.2  # fraction of the loudest log-magnitude a peak must reach
+FAN_OUT = 5
+MAX_DELTA_FRAMES = 63
+
+
+def find_peaks(waveform: torch.Tensor) -> torch.Tensor:
+    """
+    Find spectral peaks of a waveform
+
+    A peak is a time-frequency point that is the maximum of its neighborhood
+    in the log-magnitude spectrogram, louder than the median and than
+    PEAK_MIN_LEVEL of the loudest point, so background noise in quiet passages
+    does not produce peaks. Only the PEAKS_PER_BLOCK strongest peaks of each
+    block of frames are kept.
+
+    Args:
+        waveform: 1-D waveform sampled at 16 kHz
+
+    Returns:
+        Tensor of shape (num_peaks, 2) with (frame, frequency bin) rows sorted by frame
+    """
+    spectrogram = torch.stft(
+        waveform.float(),
+        n_fft=N_FFT,
+        hop_length=HOP_LENGTH,
+        window=torch.hann_window(N_FFT),
+        return_complex=True
+    ).abs()
+    log_spectrogram = torch.log1p(spectrogram)
+
+    # A point is a peak when max pooling over its neighborhood leaves it unchanged. The
+    # rectangular pool is separable: pooling along frequency, then along time, gives the
+    # same maxima at a fraction of the cost of a dense 2-D window
+    frequency_size, frame_size = PEAK_NEIGHBORHOOD
+    pooled = F.max_pool2d(
+        log_spectrogram[None, None],
+        kernel_size=(frequency_size, 1),
+        stride=1,
+        padding=(frequency_size // 2, 0)
+    )
+    pooled = F.max_pool2d(pooled, kernel_size=(1, frame_size), stride=1, padding=(0, frame_size // 2))[0, 0]
+    floor = torch.maximum(log_spectrogram.median(), PEAK_MIN_LEVEL * log_spectrogram.max())
+    is_peak = (log_spectrogram == pooled) & (log_spectrogram > floor)
+
+    frequencies, frames = torch.nonzero(is_peak, as_tuple=True)
+
+    # Keep the strongest peaks of every block so noise cannot flood the fingerprint
+    values = log_spectrogram[frequencies, frames]
+    blocks = frames // PEAK_BLOCK_FRAMES
+    order = torch.argsort(values, descending=True)
+    order = order[torch.argsort(blocks[order], stable=True)]
+    counts = torch.bincount(blocks[order])
+    ranks = torch.arange(len(order)) - (torch.cumsum(counts, 0) - counts)[blocks[order]]
+    kept = order[ranks < PEAKS_PER_BLOCK]
+
+    frequencies, frames = frequencies[kept], frames[kept]
+    order = torch.argsort(frames * N_FFT + frequencies)
+    return torch.stack([frames[order], frequencies[order]], dim=1)
+
+
+def compute_fingerprint(waveform: torch.Tensor) -> List[Tuple[int, int]]:
+    """
+    Compute the spectral-peak fingerprint of a waveform
+
+    Each peak (anchor) is paired with the next FAN_OUT peaks within
+    MAX_DELTA_FRAMES frames; the pair's two frequencies and time difference
+    are packed into a hash. Hashes are robust to re-encoding and volume
+    changes, and their anchor frames allow aligning clips that start at
+    different points.
+
+    Args:
+        waveform: 1-D waveform sampled at 16 kHz
+
+    Returns:
+        List of (hash, anchor frame) pairs
+    """
+    peaks = find_peaks(waveform).tolist()
+    fingerprint = []
+    for i, (anchor_frame, anchor_frequency) in enumerate(peaks):
+        paired = 0
+        for target_frame, target_frequency in peaks[i + 1:]:
+            delta = target_frame - anchor_frame
+            if delta > MAX_DELTA_FRAMES:
+                break
+            if delta == 0:
+                continue
+            fingerprint.append(((anchor_frequency << 16) | (target_frequency << 6) | delta, anchor_frame))
+            paired += 1
+            if paired == FAN_OUT:
+                break
+    return fingerprint
+
+
+class FingerprintIndex:
+    """Local SQLite index of audio fingerprints and their transcripts"""
+
+    def __init__(self, db_path: str = FINGERPRINT_INDEX_PATH):
+        """
+        Initialize fingerprint index
+
+        Args:
+            db_path: Path of the SQLite database (created if missing)
+        """
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS audio (
+                id INTEGER PRIMARY KEY,
+                source TEXT,
+                settings TEXT,
+                duration REAL NOT NULL,
+                num_hashes INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS hashes (
+                hash INTEGER NOT NULL,
+                audio_id INTEGER NOT NULL,
+                frame INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS hashes_hash ON hashes (hash);
+            CREATE INDEX IF NOT EXISTS audio_settings_duration ON audio (settings, duration);
+            -- Hashes of the fingerprint being matched, joined against the index
+            CREATE TEMP TABLE IF NOT EXISTS query_hashes (
+                hash INTEGER NOT NULL,
+                frame INTEGER NOT NULL
+            );
+            """
+        )
+        self._connection.commit()
+
+    def add(self, fingerprint: List[Tuple[int, int]], duration: float, result: Dict[str, Any],
+            source: Optional[str] = None, settings: str = "") -> int:
+        """
+        Store a fingerprint with its transcription result
+
+        Args:
+            fingerprint: (hash, anchor frame) pairs from compute_fingerprint
+            duration: Audio duration in seconds
+            result: JSON-serializable transcription result
+            source: Optional description of the audio (e.g. its path)
+            settings: Key of the transcriber settings that produced the result
+
+        Returns:
+            Id of the stored audio
+        """
+        fingerprint = set(fingerprint)
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO audio (source, settings, duration, num_hashes, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (source, settings, duration, len(fingerprint), json.dumps(result), time.time())
+            )
+            audio_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO hashes VALUES (?, ?, ?)",
+                ((hash_value, audio_id, frame) for hash_value, frame in fingerprint)
+            )
+            self._connection.commit()
+        return audio_id
+
+    def match(self, fingerprint: List[Tuple[int, int]], duration: float, min_score: float = 0.5,
+              duration_tolerance: float = 0.1, settings: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Find stored audio that is near-identical to a fingerprint
+
+        Candidates are scored by the largest number of hashes that agree on a
+        single time offset, relative to the number of distinct hashes of the
+        query, so audio that only shares an intro, outro or jingle with a
+        stored clip scores low.
+
+        The duration window, settings and hash lookups are applied in SQL, and
+        audio whose total number of shared hashes is already below min_score
+        is dropped there too, so only plausible candidates are scored.
+
+        Args:
+            fingerprint: (hash, anchor frame) pairs from compute_fingerprint
+            duration: Audio duration in seconds
+            min_score: Minimum fraction of aligned hashes to accept a match
+            duration_tolerance: Maximum relative duration difference of a match
+            settings: Key of the transcriber settings; only results produced with them match
+
+        Returns:
+            Dictionary with audio_id, source, score and result of the best match, or None
+        """
+        fingerprint = set(fingerprint)
+        num_hashes = len(fingerprint)
+        if not num_hashes:
+            return None
+
+        with self._lock:
+            self._connection.execute("DELETE FROM query_hashes")
+            self._connection.executemany("INSERT INTO query_hashes VALUES (?, ?)", fingerprint)
+            try:
+                # Shared hashes bound the aligned count, so candidates below min_score are skipped
+                candidates = [
+                    audio_id
+                    for audio_id, in self._connection.execute(
+                        "SELECT hashes.audio_id FROM query_hashes "
+                        "JOIN hashes ON hashes.hash = query_hashes.hash "
+                        "JOIN audio ON audio.id = hashes.audio_id "
+                        "WHERE audio.settings = ? AND audio.duration BETWEEN ? AND ? "
+                        "GROUP BY hashes.audio_id HAVING COUNT(*) >= ?",
+                        (settings, duration * (1 - duration_tolerance), duration * (1 + duration_tolerance),
+                         min_score * num_hashes)
+                    )
+                ]
+                if not candidates:
+                    return None
+
+                # Histogram of time offsets per candidate
+                placeholders = ",".join("?" * len(candidates))
+                offsets = {
+                    (audio_id, offset): count
+                    for audio_id, offset, count in self._connection.execute(
+                        "SELECT hashes.audio_id, hashes.frame - query_hashes.frame AS offset, COUNT(*) "
+                        "FROM query_hashes JOIN hashes ON hashes.hash = query_hashes.hash "
+                        f"WHERE hashes.audio_id IN ({placeholders}) GROUP BY hashes.audio_id, offset",
+                        candidates
+                    )
+                }
+            finally:
+                self._connection.execute("DELETE FROM query_hashes")
+                self._connection.commit()
+
+            # Peaks may move by one frame after re-encoding, so adjacent offsets are counted together
+            aligned: Dict[int, int] = {}
+            for (audio_id, offset), count in offsets.items():
+                aligned[audio_id] = max(aligned.get(audio_id, 0), count + offsets.get((audio_id, offset + 1), 0))
+            scores = {audio_id: count / num_hashes for audio_id, count in aligned.items()}
+            best = max(scores.items(), key=lambda item: item[1], default=None)
+            if best is None or best[1] < min_score:
+                return None
+
+            source, result = self._connection.execute(
+                "SELECT source, result FROM audio WHERE id = ?", (best[0],)
+            ).fetchone()
+
+        return {"audio_id": best[0], "source": source, "score": best[1], "result": json.loads(result)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM audio").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+
+class DeduplicatingTranscriber(BaseTranscriber):
+    """Transcriber that reuses the transcript of previously seen near-identical audio"""
+
+    def __init__(self, transcriber: BaseTranscriber, index: Optional[FingerprintIndex] = None,
+                 min_score: float = 0.5):
+        """
+        Initialize deduplicating transcriber
+
+        Args:
+            transcriber: Transcriber used for audio that is not in the index
+            index: Fingerprint index (defaults to one at FINGERPRINT_INDEX_PATH)
+            min_score: Minimum fraction of aligned fingerprint hashes to reuse a transcript
+        """
+        self.transcriber = transcriber
+        self.index = index if index is not None else FingerprintIndex()
+        self.min_score = min_score
+
+    def transcribe(self, audio_path: str | Path) -> str:
+        """
+        Transcribe audio file to text
+
+        Args:
+            audio_path: Path to audio file
+
+        Returns:
+            Transcribed text
+        """
+        return self.transcribe_with_metadata(audio_path)["text"]
+
+    def transcribe_with_metadata(self, audio_path: str | Path) -> Dict[str, Any]:
+        """
+        Transcribe audio file, reusing a cached transcript for duplicate audio
+
+        The audio is decoded once: the waveform used for the fingerprint is
+        handed to the wrapped transcriber when it accepts waveforms. Cached
+        transcripts are only reused for the same transcriber settings.
+
+        Args:
+            audio_path: Path to audio file
+
+        Returns:
+            Dictionary with the wrapped transcriber's result, plus:
+                - deduplicated: Whether the transcript came from the index
+                - fingerprint: Match source and score, and fingerprinting time
+        """
+        start_time = time.perf_counter()
+        waveform = load_audio(audio_path, SAMPLE_RATE)
+        duration = waveform.shape[-1] / SAMPLE_RATE
+        fingerprint = compute_fingerprint(waveform)
+        settings = json.dumps(self.transcriber.decoding_settings(), sort_keys=True)
+        match = self.index.match(fingerprint, duration, min_score=self.min_score, settings=settings)
+        fingerprint_seconds = time.perf_counter() - start_time
+
+        if match is not None:
+            logger.info("Reusing transcript of duplicate audio %s (score %.2f)", match["source"], match["score"])
+            result = dict(match["result"])
+            result.update({
+                "audio_seconds": duration,
+                "processing_seconds": fingerprint_seconds,
+                "real_time_factor": fingerprint_seconds / duration if duration else None,
+                "deduplicated": True,
+                "fingerprint": {"source": match["source"], "score": match["score"], "seconds": fingerprint_seconds}
+            })
+            return result
+
+        try:
+            result = self.transcriber.transcribe_waveform(waveform)
+        except NotImplementedError:
+            result = self.transcriber.transcribe_with_metadata(audio_path)
+        self.index.add(fingerprint, duration, result, source=str(audio_path), settings=settings)
+        return {
+            **result,
+            "deduplicated": False,
+            "fingerprint": {"source": None, "score": None, "seconds": fingerprint_seconds}
+        }
@@ -0,0 +1,66 @@
+from pathlib import Path
+import soundfile
+import torch
+import torchaudio
+from torchaudio.transforms import Resample
+
+SAMPLE_RATE = 16000
+
+
+def load_audio(audio_path: str | Path, sample_rate: int = SAMPLE_RATE) -> torch.Tensor:
+    """
+    Load an audio file as mono PCM at the given sample rate
+
+    Args:
+        audio_path: Path to audio file
+        sample_rate: Target sample rate
+
+    Returns:
+        1-D float tensor with the waveform
+
+    Raises:
+        FileNotFoundError: If audio file doesn't exist
+    """
+    audio_path = Path(audio_path)
+    if not audio_path.exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    waveform, original_sample_rate = torchaudio.load(audio_path)
+
+    # Convert stereo to mono if needed
+    if waveform.shape[0] > 1:
+        waveform = waveform.mean(dim=0, keepdim=True)
+
+    if original_sample_rate != sample_rate:
+        waveform = Resample(orig_freq=original_sample_rate, new_freq=sample_rate)(waveform)
+
+    return waveform.squeeze(0)
+
+
+def load_pcm(audio_path: str | Path, sample_rate: int = SAMPLE_RATE) -> torch.Tensor:
+    """
+    Load a mono PCM WAV file that is already at the given sample rate
+
+    Cheaper than load_audio for segments written by
+    AudioExtractor.extract_audio_segments, which need no resampling.
+
+    Args:
+        audio_path: Path to WAV file
+        sample_rate: Expected sample rate
+
+    Returns:
+        1-D float tensor with the waveform
+
+    Raises:
+        FileNotFoundError: If audio file doesn't exist
+        ValueError: If the file has a different sample rate
+    """
+    audio_path = Path(audio_path)
+    if not audio_path.exists():
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    samples, file_sample_rate = soundfile.read(audio_path, dtype="float32", always_2d=True)
+    if file_sample_rate != sample_rate:
+        raise ValueError(f"Expected {sample_rate} Hz audio, got {file_sample_rate} Hz: {audio_path}")
+
+    return torch.from_numpy(samples.mean(axis=1))
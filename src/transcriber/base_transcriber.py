@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+import torch
 
 class BaseTranscriber(ABC):
     """Abstract base class for audio transcription"""
@@ -34,4 +35,49 @@ class BaseTranscriber(ABC):
             Dictionary containing transcribed text and additional metadata
             (e.g., confidence scores, timestamps, etc.)
         """
-        pass 
\ No newline at end of file
+        pass
+    
+    def transcribe_waveform(self, waveform: torch.Tensor) -> Dict[str, Any]:
+        """
+        Transcribe audio that is already decoded
+        
+        Lets wrappers that decode the audio themselves (e.g. to fingerprint it)
+        pass the waveform on instead of having it decoded a second time.
+        
+        Args:
+            waveform: 1-D waveform sampled at 16 kHz
+            
+        Returns:
+            Dictionary in the format of transcribe_with_metadata
+        
+        Raises:
+            NotImplementedError: If the transcriber only accepts audio files
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} only transcribes audio files")
+    
+    def decoding_settings(self) -> Dict[str, Any]:
+        """
+        Get the settings that determine the transcripts of this transcriber
+        
+        Transcripts cached by wrappers are keyed on these settings, so changing
+        the model or decoding parameters does not reuse stale transcripts.
+        
+        Returns:
+            JSON-serializable dictionary of settings
+        """
+        return {"transcriber": self.__class__.__name__}
+    
+    def transcribe_batch(self, audio_paths: List[str | Path]) -> List[Dict[str, Any]]:
+        """
+        Transcribe multiple audio files
+        
+        Subclasses that can decode several files at once should override this;
+        the default transcribes the files one by one.
+        
+        Args:
+            audio_paths: Paths to audio files
+            
+        Returns:
+            List of transcribe_with_metadata results, in input order
+        """
+        return [self.transcribe_with_metadata(audio_path) for audio_path in audio_paths]
\ No newline at end of file
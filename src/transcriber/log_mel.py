@@ -0,0 +1,159 @@
+import queue
+import threading
+from typing import Iterable, Iterator, List, TypeVar
+import torch
+from transformers import BatchFeature, WhisperFeatureExtractor
+
+T = TypeVar("T")
+
+
+def prefetched(items: Iterator[T], prefetch: int) -> Iterator[T]:
+    """
+    Consume an iterator in a background thread, staying up to `prefetch` items ahead
+
+    Args:
+        items: Iterator whose items are expensive to produce
+        prefetch: Maximum number of produced items waiting to be consumed
+
+    Yields:
+        The items, in order; an exception raised by the producer is re-raised here
+    """
+    queued: queue.Queue = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        """Queue an item unless the consumer has stopped"""
+        while not stop.is_set():
+            try:
+                queued.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(done)
+        except Exception as e:
+            put(e)
+
+    def consume():
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = queued.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Let the producer exit if the consumer stops early
+            stop.set()
+            producer.join()
+
+    return consume()
+
+
+class LogMelFrontend:
+    """Whisper log-mel frontend running HF's torch feature extractor on the model's device"""
+
+    def __init__(self, feature_extractor: WhisperFeatureExtractor, device: str = "cpu",
+                 dtype: torch.dtype = torch.float32):
+        """
+        Initialize the frontend
+
+        Args:
+            feature_extractor: Whisper feature extractor of the model
+            device: Device the STFT and mel projection run on
+            dtype: Dtype of the returned features
+        """
+        self.feature_extractor = feature_extractor
+        self.sampling_rate = feature_extractor.sampling_rate
+        self.device = device
+        self.dtype = dtype
+
+    def __call__(self, segments: List[torch.Tensor]) -> torch.Tensor:
+        """
+        Compute log-mel features of a batch of segments
+
+        Each segment is zero-padded (or truncated) to the 30-second window,
+        so the whole batch goes through a single STFT.
+
+        Args:
+            segments: 16 kHz mono waveforms of at most 30 seconds
+
+        Returns:
+            Tensor of shape (batch, n_mels, frames) on the frontend's device
+        """
+        features = self.feature_extractor(
+            [segment.numpy() for segment in segments],
+            sampling_rate=self.sampling_rate,
+            return_tensors="pt",
+            device=self.device
+        ).input_features
+        return features.to(self.device, self.dtype)
+
+    def long_form(self, waveform: torch.Tensor) -> BatchFeature:
+        """
+        Compute features of a whole waveform for long-form generation
+
+        Args:
+            waveform: 16 kHz mono waveform of any length
+
+        Returns:
+            input_features and attention_mask on the frontend's device
+        """
+        inputs = self.feature_extractor(
+            waveform.numpy(),
+            sampling_rate=self.sampling_rate,
+            return_tensors="pt",
+            truncation=False,
+            padding="longest",
+            return_attention_mask=True,
+            device=self.device
+        )
+        return inputs.to(device=self.device, dtype=self.dtype)
+
+    def iter_long_form(self, waveforms: Iterable[torch.Tensor], prefetch: int = 1) -> Iterator[BatchFeature]:
+        """
+        Compute long-form features of several waveforms in a background thread
+
+        Features of the next waveform are computed while the current one is
+        decoded.
+
+        Args:
+            waveforms: 16 kHz mono waveforms
+            prefetch: Maximum number of computed waveforms waiting to be consumed
+
+        Yields:
+            Results of long_form, in input order
+        """
+        return prefetched((self.long_form(waveform) for waveform in waveforms), prefetch)
+
+    def iter_batches(self, segments: List[torch.Tensor], batch_size: int,
+                     prefetch: int = 2) -> Iterator[torch.Tensor]:
+        """
+        Compute features batch by batch in a background thread
+
+        The producer thread stays up to `prefetch` batches ahead of the
+        consumer, so feature extraction of the next batch overlaps with
+        decoding of the current one.
+
+        Args:
+            segments: 16 kHz mono waveforms of at most 30 seconds
+            batch_size: Number of segments per batch
+            prefetch: Maximum number of computed batches waiting to be consumed
+
+        Yields:
+            Feature tensors of shape (batch, n_mels, frames), in segment order
+        """
+        return prefetched(
+            (self(segments[start:start + batch_size]) for start in range(0, len(segments), batch_size)),
+            prefetch
+        )
@@ -0,0 +1,279 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+# magic, version, language, number of segments, number of token log-probabilities, text bytes
+HEADER = struct.Struct("<4sH2x8sIIQ")
+MAGIC = b"TXRZ"
+VERSION = 1
+
+
+def _column(typecode: str, values) -> bytes:
+    """Pack values as a little-endian column"""
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def artifact_segments(transcription_result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Get the timed segments of a transcription result
+
+    Results without segments (e.g. from transcribers that do not time their
+    output) become a single segment spanning the whole audio. token_logprobs
+    is optional: segments without it (e.g. from Whisper's long-form
+    generation) get an empty list.
+
+    Args:
+        transcription_result: Result of transcribe_with_metadata or transcribe_segment_files
+
+    Returns:
+        List of segments with start, end, text and token_logprobs
+    """
+    segments = transcription_result.get("segments")
+    if not segments:
+        segments = [{
+            "start": 0.0,
+            "end": transcription_result.get("audio_seconds") or 0.0,
+            "text": transcription_result["text"]
+        }]
+    return [
+        {
+            "start": float(segment["start"]),
+            "end": float(segment["end"]),
+            "text": segment["text"],
+            "token_logprobs": segment.get("token_logprobs") or []
+        }
+        for segment in segments
+    ]
+
+
+def write_transcript_artifact(path: str | Path, transcription_result: Dict[str, Any], language: str) -> Path:
+    """
+    Write a transcription result as a columnar binary artifact
+
+    The file holds a fixed header followed by little-endian columns: segment
+    start and end times (float32 seconds), text offsets and token offsets
+    (uint32, one more than the number of segments), token log-probabilities
+    (float32, none for segments that do not report them) and the UTF-8 text
+    of all segments back to back.
+
+    Args:
+        path: Output file path
+        transcription_result: Result of transcribe_with_metadata or transcribe_segment_files
+        language: Language code of the transcript (at most 8 ASCII characters)
+
+    Returns:
+        Path of the written file
+
+    Raises:
+        ValueError: If the language code is too long or segment starts or ends are not in
+                    time order (find() binary-searches both columns)
+    """
+    encoded_language = language.encode("ascii")
+    if len(encoded_language) > 8:
+        raise ValueError(f"Language code too long: {language}")
+
+    segments = artifact_segments(transcription_result)
+    for previous, current in zip(segments, segments[1:]):
+        if current["start"] < previous["start"] or current["end"] < previous["end"]:
+            raise ValueError("Segments must be in time order")
+
+    texts = [segment["text"].encode("utf-8") for segment in segments]
+    text_offsets = [0]
+    for text in texts:
+        text_offsets.append(text_offsets[-1] + len(text))
+    token_offsets = [0]
+    for segment in segments:
+        token_offsets.append(token_offsets[-1] + len(segment["token_logprobs"]))
+
+    path = Path(path)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, encoded_language, len(segments), token_offsets[-1], text_offsets[-1]))
+        f.write(_column("f", [segment["start"] for segment in segments]))
+        f.write(_column("f", [segment["end"] for segment in segments]))
+        f.write(_column("I", text_offsets))
+        f.write(_column("I", token_offsets))
+        f.write(_column("f", [logprob for segment in segments for logprob in segment["token_logprobs"]]))
+        f.write(b"".join(texts))
+    return path
+
+
+def _srt_timestamp(seconds: float) -> str:
+    """Format seconds as an SRT timestamp"""
+    milliseconds = round(seconds * 1000)
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+
+def format_srt(segments: Iterable[Dict[str, Any]]) -> str:
+    """
+    Format timed segments as SRT subtitles, one cue per segment
+
+    Args:
+        segments: Segments with start and end times in seconds and text
+
+    Returns:
+        SRT subtitles
+    """
+    return "\n".join(
+        f"{number}\n{_srt_timestamp(segment['start'])} --> {_srt_timestamp(segment['end'])}\n{segment['text']}\n"
+        for number, segment in enumerate(segments, 1)
+    )
+
+
+class TranscriptArtifact:
+    """Memory-mapped reader of a transcript artifact written by write_transcript_artifact"""
+
+    def __init__(self, path: str | Path):
+        """
+        Open a transcript artifact
+
+        Only the header is read; columns are views into the memory-mapped
+        file, so segment text is decoded only when it is accessed.
+
+        Args:
+            path: Path of the artifact
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            ValueError: If the file is not a transcript artifact
+        """
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Transcript artifact not found: {self.path}")
+
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(self.path) else None
+        if self._mmap is None or len(self._mmap) < HEADER.size:
+            self._file.close()
+            raise ValueError(f"Not a transcript artifact: {self.path}")
+
+        magic, version, language, num_segments, num_tokens, text_bytes = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a transcript artifact (or unsupported version): {self.path}")
+        self.language = language.rstrip(b"\0").decode("ascii")
+
+        self._views = []
+        offset = HEADER.size
+        self._starts, offset = self._view(offset, "f", num_segments)
+        self._ends, offset = self._view(offset, "f", num_segments)
+        self._text_offsets, offset = self._view(offset, "I", num_segments + 1)
+        self._token_offsets, offset = self._view(offset, "I", num_segments + 1)
+        self._logprobs, offset = self._view(offset, "f", num_tokens)
+        self._text, offset = self._view(offset, "B", text_bytes)
+
+    def _view(self, offset: int, typecode: str, length: int):
+        """Get a typed view of a column and the offset of the next one"""
+        size = struct.calcsize(typecode) * length
+        view = memoryview(self._mmap)[offset:offset + size]
+        if sys.byteorder == "big" and typecode != "B":
+            # Columns are little-endian; swap a copy on big-endian hosts
+            column = array(typecode, view.tobytes())
+            column.byteswap()
+            view.release()
+            view = memoryview(column)
+        else:
+            view = view.cast(typecode)
+        self._views.append(view)
+        return view, offset + size
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def text(self, index: int) -> str:
+        """Decode the text of one segment"""
+        return bytes(self._text[self._text_offsets[index]:self._text_offsets[index + 1]]).decode("utf-8")
+
+    def segment(self, index: int) -> Dict[str, Any]:
+        """
+        Get one segment
+
+        Args:
+            index: Segment index
+
+        Returns:
+            Dictionary with start, end, text, token_logprobs and avg_logprob
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f"Segment index out of range: {index}")
+        token_logprobs = self._logprobs[self._token_offsets[index]:self._token_offsets[index + 1]].tolist()
+        return {
+            "start": self._starts[index],
+            "end": self._ends[index],
+            "text": self.text(index),
+            "token_logprobs": token_logprobs,
+            "avg_logprob": sum(token_logprobs) / len(token_logprobs) if token_logprobs else None
+        }
+
+    def find(self, start: float, end: float) -> range:
+        """
+        Find the segments overlapping a time range with a binary search
+
+        Args:
+            start: Start of the range in seconds
+            end: End of the range in seconds
+
+        Returns:
+            Range of the indices of the overlapping segments
+        """
+        first = bisect_right(self._ends, start)
+        last = bisect_left(self._starts, end)
+        return range(first, max(first, last))
+
+    def segments_between(self, start: float, end: float) -> List[Dict[str, Any]]:
+        """
+        Get the segments overlapping a time range
+
+        Args:
+            start: Start of the range in seconds
+            end: End of the range in seconds
+
+        Returns:
+            List of segments as returned by segment()
+        """
+        return [self.segment(index) for index in self.find(start, end)]
+
+    def to_txt(self) -> str:
+        """Export the transcript as plain text"""
+        return " ".join(text for text in (self.text(index) for index in range(len(self))) if text)
+
+    def to_srt(self) -> str:
+        """Export the transcript as SRT subtitles, one cue per segment"""
+        return format_srt(
+            {"start": self._starts[index], "end": self._ends[index], "text": self.text(index)}
+            for index in range(len(self))
+        )
+
+    def to_json(self) -> str:
+        """Export the transcript with its language and segments as JSON"""
+        return json.dumps(
+            {"language": self.language, "segments": [self.segment(index) for index in range(len(self))]},
+            ensure_ascii=False,
+            indent=2
+        )
+
+    def close(self) -> None:
+        """Release the column views and unmap the file"""
+        for view in getattr(self, "_views", []):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "TranscriptArtifact":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
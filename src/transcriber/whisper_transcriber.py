@@ -1,35 +1,216 @@
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional
 import torch
-from transformers import WhisperProcessor, WhisperForConditionalGeneration
+from transformers import BatchFeature, WhisperProcessor, WhisperForConditionalGeneration
 
 from .base_transcriber import BaseTranscriber
-
-import torchaudio
-from torchaudio.transforms import Resample
+from .audio_utils import SAMPLE_RATE, load_audio, load_pcm
+from .log_mel import LogMelFrontend
+from .transcript_artifact import artifact_segments, format_srt
 
 class WhisperTranscriber(BaseTranscriber):
     """Transcriber using Whisper models from HuggingFace"""
     
-    def __init__(self, model_name: str = "openai/whisper-large-v3"):
+    def __init__(self, model_name: str = "openai/whisper-large-v3", decoding: str = "beam",
+                 num_beams: int = 2, draft_model_name: Optional[str] = None,
+                 cascade_model_name: Optional[str] = None, logprob_threshold: float = -1.0,
+                 compression_ratio_threshold: float = 2.4, batch_size: int = 8):
         """
         Initialize Whisper transcriber
         
         Args:
             model_name: Name of the Whisper model to use from HuggingFace
+            decoding: Decoding strategy, 'beam' (beam search) or 'greedy'
+            num_beams: Beam size used by beam decoding
+            draft_model_name: Optional smaller Whisper model (e.g. 'openai/whisper-tiny' for
+                              'openai/whisper-small', 'distil-whisper/distil-large-v3' for
+                              'openai/whisper-large-v3') used for assisted decoding: the draft
+                              proposes tokens that the main model verifies in a single forward
+                              pass. The output is the same as greedy decoding with the main
+                              model. Only supported with greedy decoding.
+            cascade_model_name: Optional larger Whisper model for cascade mode: the audio is
+                                transcribed in 30-second segments with model_name, and only
+                                low-confidence segments are transcribed again with this model,
+                                which is loaded the first time it is needed
+            logprob_threshold: Segments whose average token log-probability is below this
+                               value are escalated to the cascade model
+            compression_ratio_threshold: Segments whose text compresses better than this
+                                         (a sign of repetition loops) are escalated
+            batch_size: Number of 30-second segments decoded together in cascade mode
         """
+        if decoding not in ("beam", "greedy"):
+            raise ValueError(f"Unknown decoding strategy: {decoding}")
+        if draft_model_name and decoding != "greedy":
+            raise ValueError("Assisted decoding with a draft model only supports greedy decoding")
+        if draft_model_name and cascade_model_name:
+            raise ValueError("Assisted decoding cannot be combined with cascade mode")
+        
         self.torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
 
         self.model_name = model_name
+        self.decoding = decoding
+        self.num_beams = num_beams
+        self.draft_model_name = draft_model_name
+        self.cascade_model_name = cascade_model_name
+        self.logprob_threshold = logprob_threshold
+        self.compression_ratio_threshold = compression_ratio_threshold
+        self.batch_size = batch_size
+        # The cascade model may use other mel bins and another vocabulary, so it gets its own
+        # processor and frontend
+        self.cascade_model = None
+        self.cascade_processor = None
+        self.cascade_frontend = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         
         # Load model and processor
         self.processor = WhisperProcessor.from_pretrained(model_name)
-        self.model = WhisperForConditionalGeneration.from_pretrained(model_name,
-                                                                     torch_dtype=self.torch_dtype, 
-                                                                     low_cpu_mem_usage=True, 
-                                                                     use_safetensors=True)
-        self.model.to(self.device)
+        self.model = self._load_model(model_name)
+        self.frontend = LogMelFrontend(self.processor.feature_extractor, self.device, self.torch_dtype)
+        
+        self.draft_model = None
+        if draft_model_name:
+            self.draft_model = self._load_model(draft_model_name)
+            # The draft reads the same input features and proposes tokens from the same vocabulary
+            if (self.draft_model.config.num_mel_bins != self.model.config.num_mel_bins
+                    or self.draft_model.config.vocab_size != self.model.config.vocab_size):
+                raise ValueError(f"Draft model {draft_model_name} is not compatible with {model_name}")
+    
+    def _load_model(self, model_name: str) -> WhisperForConditionalGeneration:
+        """Load a Whisper model on the transcriber's device"""
+        model = WhisperForConditionalGeneration.from_pretrained(model_name,
+                                                                torch_dtype=self.torch_dtype, 
+                                                                low_cpu_mem_usage=True, 
+                                                                use_safetensors=True)
+        return model.to(self.device)
+    
+    def _generation_kwargs(self) -> Dict[str, Any]:
+        """Arguments passed to generate for the configured decoding strategy"""
+        if self.decoding == "greedy":
+            kwargs = {"do_sample": False, "num_beams": 1}
+            if self.draft_model is not None:
+                kwargs["assistant_model"] = self.draft_model
+            return kwargs
+        
+        return {
+            "do_sample": True,
+            "temperature": 0.0,
+            "num_beams": self.num_beams,
+            # length_penalty=1.0,
+            "top_p": 0.95
+        }
+    
+    def _transcribe_segments(self, model: WhisperForConditionalGeneration, segments: List[torch.Tensor],
+                             processor: Optional[WhisperProcessor] = None,
+                             frontend: Optional[LogMelFrontend] = None) -> List[Dict[str, Any]]:
+        """
+        Transcribe 30-second segments in batches and score each one
+        
+        Args:
+            model: Whisper model to decode with
+            segments: Waveforms of at most 30 seconds at 16 kHz
+            processor: Processor matching the model (defaults to the main model's)
+            frontend: Log-mel frontend matching the model (defaults to the main model's)
+        
+        Returns:
+            List with text, token log-probabilities, their average and compression ratio per segment
+        """
+        processor = processor or self.processor
+        frontend = frontend or self.frontend
+        generation_kwargs = self._generation_kwargs()
+        # Assisted decoding only supports one sequence at a time
+        batch_size = 1 if "assistant_model" in generation_kwargs else self.batch_size
+        results = []
+        # Features of the next batch are computed in the background while this one is decoded
+        for input_features in frontend.iter_batches(segments, batch_size):
+            with torch.inference_mode():
+                outputs = model.generate(
+                    input_features,
+                    no_repeat_ngram_size=3,
+                    return_dict_in_generate=True,
+                    output_scores=True,
+                    **generation_kwargs
+                )
+            
+            # Log-probability of every generated token; beam search scores are already normalized
+            # and Whisper may have gathered them per returned sequence
+            beam_indices = getattr(outputs, "beam_indices", None)
+            if beam_indices is not None and outputs.scores[0].shape[0] == outputs.sequences.shape[0]:
+                beam_indices = None
+            token_logprobs = model.compute_transition_scores(
+                outputs.sequences, outputs.scores, beam_indices, normalize_logits=self.decoding == "greedy"
+            ).float()
+            generated = outputs.sequences[:, -token_logprobs.shape[1]:]
+            mask = generated != model.generation_config.pad_token_id
+            
+            texts = processor.batch_decode(outputs.sequences, skip_special_tokens=True)
+            for text, logprobs, valid in zip(texts, token_logprobs, mask):
+                encoded = text.strip().encode("utf-8")
+                results.append({
+                    "text": text.strip(),
+                    "avg_logprob": logprobs[valid].mean().item() if valid.any() else 0.0,
+                    "token_logprobs": logprobs[valid].tolist(),
+                    "compression_ratio": len(encoded) / len(zlib.compress(encoded)) if encoded else 0.0
+                })
+        return results
+    
+    def _transcribe_cascade(self, waveform: torch.Tensor) -> List[Dict[str, Any]]:
+        """
+        Transcribe with the small model and re-transcribe low-confidence segments with the cascade model
+        
+        Args:
+            waveform: 16 kHz mono waveform
+        
+        Returns:
+            List of segments with start, end, text, confidence values and the model used
+        """
+        segment_samples = 30 * SAMPLE_RATE
+        segments = [waveform[start:start + segment_samples] for start in range(0, len(waveform), segment_samples)]
+        results = self._transcribe_segments(self.model, segments)
+        
+        for index, result in enumerate(results):
+            result["start"] = index * 30.0
+            result["end"] = min((index + 1) * 30.0, len(waveform) / SAMPLE_RATE)
+        
+        return self._escalate(segments, results)
+    
+    def _escalate(self, segments: List[torch.Tensor], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Re-transcribe segments below the confidence thresholds with the cascade model
+        
+        Args:
+            segments: Waveforms of at most 30 seconds at 16 kHz
+            results: Results of the small model for the segments, updated in place
+        
+        Returns:
+            The results, each with the name of the model that produced it
+        """
+        for result in results:
+            result["model"] = self.model_name
+        
+        escalated = [
+            index for index, result in enumerate(results)
+            if result["avg_logprob"] < self.logprob_threshold
+            or result["compression_ratio"] > self.compression_ratio_threshold
+        ]
+        if escalated:
+            if self.cascade_model is None:
+                self.cascade_processor = WhisperProcessor.from_pretrained(self.cascade_model_name)
+                self.cascade_frontend = LogMelFrontend(self.cascade_processor.feature_extractor, self.device,
+                                                       self.torch_dtype)
+                self.cascade_model = self._load_model(self.cascade_model_name)
+            retranscribed = self._transcribe_segments(
+                self.cascade_model,
+                [segments[index] for index in escalated],
+                self.cascade_processor,
+                self.cascade_frontend
+            )
+            for index, result in zip(escalated, retranscribed):
+                results[index].update(result, model=self.cascade_model_name)
+        
+        return results
     
     def transcribe(self, audio_path: str | Path) -> str:
         """
@@ -55,64 +236,247 @@ class WhisperTranscriber(BaseTranscriber):
             Dictionary containing:
                 - text: Transcribed text
                 - language: Detected language
-                - segments: List of segments with timestamps
+                - segments: List of segments with start, end and text as timed by Whisper (in
+                  cascade mode, 30-second segments with their token log-probabilities, average
+                  log-probability, compression ratio and the model used; long-form segments
+                  carry no token log-probabilities)
+                - audio_seconds: Duration of the audio
+                - processing_seconds: Time spent on feature extraction and decoding
+                - real_time_factor: processing_seconds / audio_seconds
         """
-        audio_path = Path(audio_path)
-        if not audio_path.exists():
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        # Load the audio file as 16 kHz mono
+        waveform = load_audio(audio_path, SAMPLE_RATE)
+        return self.transcribe_waveform(waveform)
+    
+    def decoding_settings(self) -> Dict[str, Any]:
+        """Get the model and decoding parameters that determine the transcripts"""
+        settings = {
+            "transcriber": self.__class__.__name__,
+            "model_name": self.model_name,
+            "decoding": self.decoding,
+            "num_beams": self.num_beams if self.decoding == "beam" else 1,
+        }
+        if self.cascade_model_name:
+            settings.update({
+                "cascade_model_name": self.cascade_model_name,
+                "logprob_threshold": self.logprob_threshold,
+                "compression_ratio_threshold": self.compression_ratio_threshold,
+            })
+        return settings
+    
+    def transcribe_waveform(self, waveform: torch.Tensor) -> Dict[str, Any]:
+        """Transcribe a 16 kHz mono waveform and return the metadata of transcribe_with_metadata"""
+        audio_seconds = waveform.shape[-1] / SAMPLE_RATE
         
-        # Load the audio file
-        waveform, original_sample_rate = torchaudio.load(audio_path)
+        start_time = time.perf_counter()
+        if self.cascade_model_name:
+            segments = self._transcribe_cascade(waveform)
+            processing_seconds = time.perf_counter() - start_time
+            return {
+                "text": " ".join(segment["text"] for segment in segments if segment["text"]),
+                "model_name": self.model_name,
+                "cascade_model_name": self.cascade_model_name,
+                "device": self.device,
+                "decoding": self.decoding,
+                "segments": segments,
+                "escalated_segments": sum(1 for segment in segments if segment["model"] != self.model_name),
+                "audio_seconds": audio_seconds,
+                "processing_seconds": processing_seconds,
+                "real_time_factor": processing_seconds / audio_seconds if audio_seconds else None
+            }
         
-        # Convert stereo to mono if needed
-        if waveform.shape[0] > 1:
-            waveform = waveform.mean(dim=0, keepdim=True)
-
-        # Define the resampling transform
-        resample_transform = Resample(orig_freq=original_sample_rate, new_freq=16000)
-
-        # Apply the resampling
-        resampled_waveform = resample_transform(waveform)
+        # HF's torch STFT runs on the model's device
+        return self._transcribe_long_form(self.frontend.long_form(waveform), audio_seconds, start_time)
+    
+    def _transcribe_long_form(self, inputs: BatchFeature, audio_seconds: float, start_time: float) -> Dict[str, Any]:
+        """
+        Transcribe long-form features with Whisper's sequential long-form generation
         
-        inputs = self.processor(resampled_waveform.squeeze(), 
-                                return_tensors="pt", 
-                                truncation=False, 
-                                padding="longest", 
-                                return_attention_mask=True, 
-                                sampling_rate=16_000)
+        Args:
+            inputs: Features and attention mask from LogMelFrontend.long_form
+            audio_seconds: Duration of the audio
+            start_time: perf_counter value processing_seconds is measured from
         
-        inputs = inputs.to(dtype=self.torch_dtype, device=self.device)
-
+        Returns:
+            The metadata of transcribe_with_metadata
+        """
         # Generate tokens with better parameters
-        predicted_ids = self.model.generate(
+        outputs = self.model.generate(
             **inputs,
-            do_sample=True,
-            temperature=0.0,
             no_repeat_ngram_size=3,
             return_timestamps=True,
-            num_beams=2,
-            # length_penalty=1.0,
-            top_p=0.95
+            return_segments=True,
+            **self._generation_kwargs()
         )
         
         # Decode tokens to text
         transcription = self.processor.batch_decode(
-            predicted_ids, 
+            outputs["sequences"], 
             skip_special_tokens=True
         )[0]
+        # Timed segments of the (only) waveform in the batch
+        segments = [
+            {
+                "start": float(segment["start"]),
+                "end": float(segment["end"]),
+                "text": self.processor.decode(segment["tokens"], skip_special_tokens=True).strip()
+            }
+            for segment in outputs["segments"][0]
+        ]
+        processing_seconds = time.perf_counter() - start_time
         
         # Get metadata from model outputs
         metadata = {
             "text": transcription,
             "model_name": self.model_name,
-            "device": self.device
+            "device": self.device,
+            "decoding": self.decoding,
+            "draft_model_name": self.draft_model_name,
+            "segments": segments,
+            "audio_seconds": audio_seconds,
+            "processing_seconds": processing_seconds,
+            "real_time_factor": processing_seconds / audio_seconds if audio_seconds else None
         }
         
         return metadata 
     
+    def transcribe_batch(self, audio_paths: List[str | Path]) -> List[Dict[str, Any]]:
+        """
+        Transcribe many audio files together
+        
+        Files are loaded in parallel and sorted by duration. Clips of at most
+        30 seconds are decoded in batches of batch_size, so neighbours in a
+        batch have similar lengths and finish decoding at similar steps.
+        Longer files are transcribed one by one, with the features of the
+        next file computed in the background while the current one is
+        decoded. In cascade mode, low-confidence clips are re-transcribed
+        with the cascade model.
+        
+        Args:
+            audio_paths: Paths to audio files
+        
+        Returns:
+            List of transcribe_with_metadata results, in input order. The time
+            of a batch is split between its clips in proportion to their duration.
+        """
+        with ThreadPoolExecutor(max_workers=min(8, len(audio_paths) or 1)) as executor:
+            waveforms = list(executor.map(lambda path: load_audio(path, SAMPLE_RATE), audio_paths))
+        
+        order = sorted(range(len(waveforms)), key=lambda index: waveforms[index].shape[-1])
+        short = [index for index in order if waveforms[index].shape[-1] <= 30 * SAMPLE_RATE]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(waveforms)
+        
+        if short:
+            clips = [waveforms[index] for index in short]
+            start_time = time.perf_counter()
+            segments = self._transcribe_segments(self.model, clips)
+            if self.cascade_model_name:
+                segments = self._escalate(clips, segments)
+            processing_seconds = time.perf_counter() - start_time
+            
+            total_seconds = sum(clip.shape[-1] for clip in clips) / SAMPLE_RATE
+            for index, segment in zip(short, segments):
+                audio_seconds = waveforms[index].shape[-1] / SAMPLE_RATE
+                share = processing_seconds * audio_seconds / total_seconds if total_seconds else 0.0
+                results[index] = {
+                    "text": segment["text"],
+                    "model_name": segment.get("model", self.model_name),
+                    "device": self.device,
+                    "decoding": self.decoding,
+                    "draft_model_name": self.draft_model_name,
+                    "segments": [{**segment, "start": 0.0, "end": audio_seconds}],
+                    "audio_seconds": audio_seconds,
+                    "processing_seconds": share,
+                    "real_time_factor": share / audio_seconds if audio_seconds else None,
+                    "batched": True
+                }
+        
+        long = [index for index in order if results[index] is None]
+        if self.cascade_model_name:
+            for index in long:
+                results[index] = {**self.transcribe_waveform(waveforms[index]), "batched": False}
+        else:
+            # Features of the next file are computed while the current one is decoded
+            features = self.frontend.iter_long_form(waveforms[index] for index in long)
+            for index, inputs in zip(long, features):
+                audio_seconds = waveforms[index].shape[-1] / SAMPLE_RATE
+                result = self._transcribe_long_form(inputs, audio_seconds, time.perf_counter())
+                results[index] = {**result, "batched": False}
+        
+        return results
+    
+    def transcribe_segment_files(self, segment_paths: Iterable[str | Path],
+                                 segment_seconds: float = 30.0) -> Dict[str, Any]:
+        """
+        Transcribe consecutive audio segments as they become available
+        
+        The paths are consumed lazily, batch_size at a time, so decoding of
+        the first segments starts while later ones are still being produced
+        (e.g. by AudioExtractor.extract_audio_segments). Each segment must be
+        a 16 kHz mono WAV file of at most 30 seconds.
+        
+        Args:
+            segment_paths: Paths to the segments, in time order
+            segment_seconds: Length of the segments; each one starts where the previous one ends
+        
+        Returns:
+            Dictionary with the joined text and the per-segment results, with
+            start and end times relative to the start of the first segment
+        """
+        if segment_seconds > 30.0:
+            raise ValueError("Segments must not be longer than the 30-second Whisper window")
+        
+        start_time = time.perf_counter()
+        segments: List[Dict[str, Any]] = []
+        audio_seconds = 0.0
+        
+        def decode(waveforms: List[torch.Tensor]) -> None:
+            nonlocal audio_seconds
+            results = self._transcribe_segments(self.model, waveforms)
+            if self.cascade_model_name:
+                results = self._escalate(waveforms, results)
+            for waveform, result in zip(waveforms, results):
+                # The last two segments may be shorter (see AudioExtractor.extract_audio_segments)
+                start = audio_seconds
+                result["start"] = start
+                result["end"] = start + waveform.shape[-1] / SAMPLE_RATE
+                result.setdefault("model", self.model_name)
+                segments.append(result)
+                audio_seconds = result["end"]
+        
+        pending: List[torch.Tensor] = []
+        for segment_path in segment_paths:
+            pending.append(load_pcm(segment_path, SAMPLE_RATE))
+            if len(pending) == self.batch_size:
+                decode(pending)
+                pending = []
+        if pending:
+            decode(pending)
+        
+        processing_seconds = time.perf_counter() - start_time
+        return {
+            "text": " ".join(segment["text"] for segment in segments if segment["text"]),
+            "model_name": self.model_name,
+            "cascade_model_name": self.cascade_model_name,
+            "device": self.device,
+            "decoding": self.decoding,
+            "draft_model_name": self.draft_model_name,
+            "segments": segments,
+            "escalated_segments": sum(1 for segment in segments if segment["model"] != self.model_name),
+            "audio_seconds": audio_seconds,
+            "processing_seconds": processing_seconds,
+            "real_time_factor": processing_seconds / audio_seconds if audio_seconds else None
+        }
+    
     def generate_subtitles(self, audio_path: str | Path) -> str:
         """
         Generate subtitles for an audio file
+        
+        Args:
+            audio_path: Path to audio file
+            
+        Returns:
+            SRT subtitles with one cue per timed segment of transcribe_with_metadata
         """
-        raise NotImplementedError("Subtitles generation is not implemented for Whisper")
+        return format_srt(artifact_segments(self.transcribe_with_metadata(audio_path)))
 
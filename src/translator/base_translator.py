@@ -1,17 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class BaseTranslator(ABC):
     """Base abstract class for text translation"""
     
     @abstractmethod
-    def translate(self, text: str, target_language: str) -> Dict[str, Any]:
+    def translate(self, text: str, target_language: str, source_language: Optional[str] = None) -> Dict[str, Any]:
         """
         Translate text to target language
         
         Args:
             text: Text to translate
             target_language: Target language code (e.g., 'en', 'es', 'fr')
+            source_language: Language code of the text, if known
             
         Returns:
             Dictionary containing:
@@ -0,0 +1,218 @@
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import torch
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+from .base_translator import BaseTranslator
+from .translation_memory import segment_sentences
+
+# Loaded (tokenizer, model) pairs shared by every translator instance in the process
+_MODEL_REGISTRY: Dict[Tuple[str, str, bool], Tuple[Any, Any]] = {}
+_registry_lock = threading.Lock()
+# Multilingual tokenizers read the source language from an attribute, so
+# setting it and encoding must not interleave between threads sharing one
+_tokenizer_lock = threading.Lock()
+
+
+def load_seq2seq_model(model_name: str, device: str = "cpu", quantize: bool = False) -> Tuple[Any, Any]:
+    """
+    Load a seq2seq translation model once per process
+
+    Args:
+        model_name: Name of the model on HuggingFace
+        device: Device to load the model on
+        quantize: Apply dynamic int8 quantization to the linear layers (CPU only)
+
+    Returns:
+        Tuple of (tokenizer, model)
+    """
+    quantize = quantize and device == "cpu"
+    key = (model_name, device, quantize)
+    with _registry_lock:
+        if key not in _MODEL_REGISTRY:
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            model = AutoModelForSeq2SeqLM.from_pretrained(model_name, low_cpu_mem_usage=True)
+            model.to(device).eval()
+            if quantize:
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            _MODEL_REGISTRY[key] = (tokenizer, model)
+        return _MODEL_REGISTRY[key]
+
+
+def clear_model_registry() -> None:
+    """Release all models loaded by load_seq2seq_model"""
+    with _registry_lock:
+        _MODEL_REGISTRY.clear()
+
+
+class HuggingFaceTranslator(BaseTranslator):
+    """Offline translator using local HuggingFace seq2seq models"""
+
+    def __init__(self, model_name: str = "facebook/m2m100_418M", source_language: str = "en",
+                 batch_size: int = 16, max_new_tokens: int = 256, num_beams: int = 1, quantize: bool = False):
+        """
+        Initialize HuggingFace translator
+
+        Args:
+            model_name: Multilingual model (e.g. 'facebook/m2m100_418M'), single language pair model,
+                        or a model name template containing '{source}' and '{target}'
+                        (e.g. 'Helsinki-NLP/opus-mt-{source}-{target}')
+            source_language: Default language code of the texts to translate
+            batch_size: Number of sentences generated together
+            max_new_tokens: Maximum number of tokens generated per sentence
+            num_beams: Beam size (1 means greedy decoding)
+            quantize: Apply dynamic int8 quantization on CPU
+        """
+        self.model_name = model_name
+        self.source_language = source_language
+        self.batch_size = batch_size
+        self.max_new_tokens = max_new_tokens
+        self.num_beams = num_beams
+        self.quantize = quantize
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    def _resolve(self, source_language: str, target_language: str) -> Tuple[Any, Any, Dict[str, Any], str]:
+        """Get tokenizer, model and language-specific generation arguments for a language pair"""
+        if "{target}" in self.model_name:
+            model_name = self.model_name.format(source=source_language, target=target_language)
+            tokenizer, model = load_seq2seq_model(model_name, self.device, self.quantize)
+            return tokenizer, model, {}, model_name
+
+        tokenizer, model = load_seq2seq_model(self.model_name, self.device, self.quantize)
+        if not hasattr(tokenizer, "get_lang_id"):
+            # Single language pair model
+            return tokenizer, model, {}, self.model_name
+        # Encoding sets the source language token, so an unknown source fails there too
+        self._lang_id(tokenizer, source_language)
+        return tokenizer, model, {"forced_bos_token_id": self._lang_id(tokenizer, target_language)}, self.model_name
+
+    def _lang_id(self, tokenizer: Any, language: str) -> int:
+        """Get the id of a language token on a multilingual model"""
+        try:
+            return tokenizer.get_lang_id(language)
+        except KeyError:
+            raise ValueError(f"Unsupported language code for {self.model_name}: {language}") from None
+
+    def _encode(self, tokenizer: Any, sentences: List[str], source_language: str) -> Any:
+        """Tokenize sentences, prefixed with the source language token on multilingual models"""
+        if not hasattr(tokenizer, "get_lang_id"):
+            return tokenizer(sentences, return_tensors="pt", padding=True, truncation=True)
+        with _tokenizer_lock:
+            tokenizer.src_lang = source_language
+            return tokenizer(sentences, return_tensors="pt", padding=True, truncation=True)
+
+    def _generate(self, sentences: List[str], source_language: str,
+                  target_language: str) -> Tuple[List[str], int, str]:
+        """
+        Translate sentences in length-sorted batches
+
+        Returns:
+            Tuple of the translations (in input order), the number of batches and the model name
+        """
+        tokenizer, model, generation_kwargs, model_name = self._resolve(source_language, target_language)
+
+        # Sorting by length keeps padding inside each batch small
+        order = sorted(range(len(sentences)), key=lambda i: len(sentences[i]))
+        translations: List[Optional[str]] = [None] * len(sentences)
+        batches = 0
+
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            inputs = self._encode(tokenizer, [sentences[i] for i in indices], source_language).to(self.device)
+
+            with torch.inference_mode():
+                output_ids = model.generate(
+                    **inputs,
+                    max_new_tokens=self.max_new_tokens,
+                    num_beams=self.num_beams,
+                    **generation_kwargs
+                )
+
+            for i, translation in zip(indices, tokenizer.batch_decode(output_ids, skip_special_tokens=True)):
+                translations[i] = translation
+            batches += 1
+
+        return translations, batches, model_name
+
+    def translate(self, text: str, target_language: str, source_language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Translate text to target language
+
+        Args:
+            text: Text to translate
+            target_language: Target language code (e.g., 'en', 'es', 'fr')
+            source_language: Language code of the text (defaults to the translator's source_language)
+
+        Returns:
+            Dictionary containing:
+                - translated_text: Translated text
+                - source_language: Source language
+                - target_language: Target language
+                - model: Model used for translation
+                - metadata: Number of sentences and batches, and generation time
+        """
+        if not text:
+            raise ValueError("Text to translate cannot be empty")
+
+        start_time = time.perf_counter()
+        source_language = source_language or self.source_language
+        segments = segment_sentences(text)
+        translations, batches, model_name = self._generate(
+            [sentence for sentence, _ in segments], source_language, target_language
+        )
+
+        return {
+            "translated_text": "".join(
+                translation + separator for translation, (_, separator) in zip(translations, segments)
+            ),
+            "source_language": source_language,
+            "target_language": target_language,
+            "model": model_name,
+            "metadata": {
+                "segments": len(segments),
+                "batches": batches,
+                "seconds": time.perf_counter() - start_time,
+                "quantized": self.quantize and self.device == "cpu"
+            }
+        }
+
+    def batch_translate(self, texts: List[str], target_language: str,
+                        source_language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Translate multiple texts, batching sentences across all of them
+
+        Args:
+            texts: List of texts to translate
+            target_language: Target language code
+            source_language: Language code of the texts (defaults to the translator's source_language)
+
+        Returns:
+            List of translation results, each containing metadata
+        """
+        start_time = time.perf_counter()
+        source_language = source_language or self.source_language
+        segmented = [segment_sentences(text) for text in texts]
+        sentences = [sentence for segments in segmented for sentence, _ in segments]
+        translations, batches, model_name = self._generate(sentences, source_language, target_language)
+        seconds = time.perf_counter() - start_time
+
+        results = []
+        position = 0
+        for segments in segmented:
+            translated = translations[position:position + len(segments)]
+            position += len(segments)
+            results.append({
+                "translated_text": "".join(
+                    translation + separator for translation, (_, separator) in zip(translated, segments)
+                ),
+                "source_language": source_language,
+                "target_language": target_language,
+                "model": model_name,
+                "metadata": {
+                    "segments": len(segments),
+                    "batches": batches,
+                    "seconds": seconds,
+                    "quantized": self.quantize and self.device == "cpu"
+                }
+            })
+        return results
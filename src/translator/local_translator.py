@@ -0,0 +1,30 @@
+from typing import Optional
+from src.llm.usage import UsageTracker
+from .openai_translator import OpenAITranslator
+
+class LocalTranslator(OpenAITranslator):
+    """Translator using a local OpenAI-compatible server (e.g. llama.cpp, vLLM, Ollama)"""
+    
+    def __init__(self, model: str = "local-model", base_url: str = "http://localhost:8080/v1",
+                 api_key: str = "sk-no-key-required", temperature: float = 0.1,
+                 fallback_model: Optional[str] = None, usage_tracker: Optional[UsageTracker] = None):
+        """
+        Initialize local translator
+        
+        Args:
+            model: Model name served by the local endpoint
+            base_url: Base URL of the OpenAI-compatible API
+            api_key: API key expected by the server (most local servers ignore it)
+            temperature: Temperature for the model
+            fallback_model: Optional cheaper model on the same server used once the usage
+                            tracker's budget runs low
+            usage_tracker: Optional tracker aggregating token usage and enforcing the job's budget
+        """
+        super().__init__(
+            model=model,
+            temperature=temperature,
+            fallback_model=fallback_model,
+            usage_tracker=usage_tracker
+        )
+        self.base_url = base_url
+        self.client_options = {"base_url": base_url, "api_key": api_key}
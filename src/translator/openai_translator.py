@@ -1,63 +1,187 @@
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, Field
+from src.llm.tokens import count_tokens
+from src.llm.usage import (BudgetExceededError, BudgetedLLMComponent, UsageTracker, combine_usage,
+                           invoke_with_usage)
 from .base_translator import BaseTranslator
 
-class OpenAITranslator(BaseTranslator):
+class NumberedTranslation(BaseModel):
+    """Translation of one numbered text of a batch request"""
+    
+    index: int = Field(description="Number of the text in the request")
+    translation: str = Field(description="Translation of that text")
+
+class BatchTranslation(BaseModel):
+    """Structured result of a batch translation request"""
+    
+    translations: List[NumberedTranslation] = Field(description="One translation per numbered text")
+
+class OpenAITranslator(BudgetedLLMComponent, BaseTranslator):
     """Translator using OpenAI's GPT models"""
     
-    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.1):
+    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.1,
+                 fallback_model: Optional[str] = None, usage_tracker: Optional[UsageTracker] = None,
+                 client: Optional[ChatOpenAI] = None, batch_tokens: int = 2000, max_concurrency: int = 4):
         """
         Initialize OpenAI translator
         
         Args:
             model: OpenAI model to use
             temperature: Temperature for the model
+            fallback_model: Optional cheaper model used once the usage tracker's budget runs low
+            usage_tracker: Optional tracker aggregating token usage and enforcing the job's budget
+            client: Optional pre-built chat client (defaults to the shared pooled client for the model)
+            batch_tokens: Largest amount of source text (in tokens) packed into one batch_translate request
+            max_concurrency: Maximum number of batch_translate requests in flight at once
         """
-        self.client = ChatOpenAI(
-            model_name=model, 
-            temperature=temperature,
-        )
+        self.client = client
         self.model = model
+        self.temperature = temperature
+        self.fallback_model = fallback_model
+        self.usage_tracker = usage_tracker
+        self.batch_tokens = batch_tokens
+        self.max_concurrency = max_concurrency
     
-    def translate(self, text: str, target_language: str) -> Dict[str, Any]:
+    def _system_message(self, target_language: str, source_language: Optional[str]) -> str:
+        """Instructions shared by single and batch translation requests"""
+        source = f" from {source_language}" if source_language else ""
+        return (
+            f"You are a professional translator. Translate the following text{source} to {target_language}. "
+            "Maintain the original meaning, tone, and style as much as possible."
+        )
+    
+    def translate(self, text: str, target_language: str, source_language: Optional[str] = None) -> Dict[str, Any]:
         """
         Translate text to target language
         
         Args:
             text: Text to translate
             target_language: Target language code (e.g., 'en', 'es', 'fr')
+            source_language: Optional language code of the text (the model detects it otherwise)
             
         Returns:
             Dictionary containing:
                 - translated_text: Translated text
                 - target_language: Target language
                 - model: Model used for translation
-                - usage: Token usage statistics
+                - usage: Token counts and latency of the LLM call
         """
-        system_message = (
-            f"You are a professional translator. Translate the following text to {target_language}. "
-            "Maintain the original meaning, tone, and style as much as possible."
-        )
+        client, model = self._select_client()
+        prompt = self._system_message(target_language, source_language) + "\n\nText to translate: " + text
         
-        response = self.client.predict(
-            system_message + "\n\nText to translate: " + text
-        )
+        # A translation cannot be shortened, so the whole call must fit in the budget
+        if self.usage_tracker and not self.usage_tracker.fits(count_tokens(prompt, model), count_tokens(text, model)):
+            raise BudgetExceededError("Translating the text needs more tokens than remain in the budget")
+        
+        response, usage = invoke_with_usage(client, prompt)
+        self._record_usage(model, usage)
         
         return {
-            "translated_text": response,
+            "translated_text": response.content,
             "target_language": target_language,
-            "model": self.model,
+            "model": model,
+            "usage": usage,
         }
     
-    def batch_translate(self, texts: List[str], target_language: str) -> List[Dict[str, Any]]:
+    def _pack(self, texts: List[str], model: str) -> List[List[int]]:
+        """Group consecutive texts into requests of at most batch_tokens tokens of source text"""
+        batches: List[List[int]] = []
+        batch_tokens = 0
+        for index, text in enumerate(texts):
+            tokens = count_tokens(text, model)
+            if not batches or batch_tokens + tokens > self.batch_tokens:
+                batches.append([])
+                batch_tokens = 0
+            batches[-1].append(index)
+            batch_tokens += tokens
+        return batches
+    
+    def _translate_numbered(self, texts: List[str], target_language: str, source_language: Optional[str],
+                            reserved_tokens: Optional[int]) -> List[Dict[str, Any]]:
+        """
+        Translate several texts in one structured request
+        
+        Texts are numbered in the prompt and their translations are mapped
+        back by number. Texts the response leaves out are translated one by one.
+        
+        Returns:
+            Translation results in input order; the usage of the request is
+            reported on the first one
+        """
+        client, model = self._select_client()
+        prompt = (
+            self._system_message(target_language, source_language)
+            + " Each numbered line is a separate text: translate every one of them on its own and return "
+            "each translation with the number of its text.\n\nTexts to translate:\n"
+            + "\n".join(f"[{number}] {text}" for number, text in enumerate(texts, 1))
+        )
+        
+        try:
+            # A translation cannot be shortened, so the whole call must fit in the budget
+            if self.usage_tracker:
+                completion_tokens = sum(count_tokens(text, model) for text in texts)
+                if not self.usage_tracker.fits(count_tokens(prompt, model), completion_tokens, reserved_tokens):
+                    raise BudgetExceededError(
+                        f"Translating {len(texts)} texts needs more tokens than remain in the budget"
+                    )
+            
+            structured_client = client.with_structured_output(BatchTranslation, include_raw=True)
+            response, usage = invoke_with_usage(structured_client, prompt)
+            self._record_usage(model, usage)
+        finally:
+            if reserved_tokens is not None:
+                self.usage_tracker.release(reserved_tokens)
+        
+        parsed = response.get("parsed")
+        by_number = {item.index: item.translation for item in parsed.translations} if parsed is not None else {}
+        results = []
+        for number, text in enumerate(texts, 1):
+            if number in by_number:
+                results.append({
+                    "translated_text": by_number[number],
+                    "target_language": target_language,
+                    "model": model,
+                    "usage": None,
+                })
+            else:
+                results.append(self.translate(text, target_language, source_language))
+        first = results[0]
+        first["usage"] = usage if first["usage"] is None else combine_usage([usage, first["usage"]])
+        return results
+    
+    def batch_translate(self, texts: List[str], target_language: str,
+                        source_language: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Translate multiple texts
         
+        Texts are packed into numbered requests of at most batch_tokens tokens
+        of source text, so many short texts (e.g. the sentences of a
+        transcript) cost a few requests instead of one each. The requests run
+        concurrently and every translation is mapped back to its own text.
+        
         Args:
             texts: List of texts to translate
             target_language: Target language code
+            source_language: Optional language code of the texts
             
         Returns:
-            List of translation results, each containing metadata
+            List of translation results, in input order. The usage of each
+            request is reported on the first result it produced; the other
+            results of the request have usage None.
         """
-        return [self.translate(text, target_language) for text in texts] 
\ No newline at end of file
+        if len(texts) <= 1:
+            return [self.translate(text, target_language, source_language) for text in texts]
+        
+        _, model = self._select_client()
+        batches = self._pack(texts, model)
+        # Concurrent requests must not each be checked against the whole remaining budget
+        share = self.usage_tracker.split_remaining(len(batches)) if self.usage_tracker else None
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            translated = list(executor.map(
+                lambda batch: self._translate_numbered([texts[index] for index in batch], target_language,
+                                                       source_language, share),
+                batches
+            ))
+        return [result for batch_results in translated for result in batch_results]
@@ -0,0 +1,301 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from config.config import TRANSLATION_MEMORY_PATH
+from src.llm.usage import combine_usage
+from .base_translator import BaseTranslator
+
+# CJK full stops are usually not followed by a space
+_SEGMENT_BOUNDARY = re.compile(r"((?<=[.!?…])\s+|(?<=[。！？])\s*|\n+)")
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_TERMINAL_PUNCTUATION = re.compile(r"[.!?…。！？]+$")
+
+
+def segment_sentences(text: str) -> List[Tuple[str, str]]:
+    """
+    Split a text into sentences, keeping the whitespace that follows each one
+
+    Args:
+        text: Text to segment
+
+    Returns:
+        List of (sentence, separator) pairs; joining them gives back the text
+    """
+    parts = _SEGMENT_BOUNDARY.split(text)
+    segments = []
+    for i in range(0, len(parts), 2):
+        sentence = parts[i]
+        separator = parts[i + 1] if i + 1 < len(parts) else ""
+        if sentence:
+            segments.append((sentence, separator))
+        elif segments:
+            # Consecutive separators: attach to the previous sentence
+            segments[-1] = (segments[-1][0], segments[-1][1] + separator)
+    return segments
+
+
+def normalize_segment(sentence: str) -> str:
+    """
+    Normalize a sentence for fuzzy lookup
+
+    Case, whitespace and inner punctuation are ignored; the end-of-sentence
+    punctuation is kept, since a question and a statement translate differently.
+    """
+    terminal = _TERMINAL_PUNCTUATION.search(sentence.strip())
+    words = " ".join(_PUNCTUATION.sub(" ", sentence.lower()).split())
+    return words + (terminal.group() if terminal else "")
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """
+    Sentence-level translation store backed by a local SQLite index
+
+    Translations are keyed on the source and target language and on the model
+    that produced them, so output of different translators (e.g. a local MT
+    model and an LLM) and of the same sentence in different source languages
+    is never mixed. An unknown source language is stored as an empty code.
+    """
+
+    def __init__(self, db_path: str = TRANSLATION_MEMORY_PATH):
+        """
+        Initialize translation memory
+
+        Args:
+            db_path: Path of the SQLite database (created if missing)
+        """
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS segments (
+                source_language TEXT NOT NULL,
+                target_language TEXT NOT NULL,
+                model TEXT NOT NULL,
+                source_hash TEXT NOT NULL,
+                normalized_hash TEXT NOT NULL,
+                source TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (source_language, target_language, model, source_hash)
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS segments_normalized "
+            "ON segments (source_language, target_language, model, normalized_hash)"
+        )
+        self._connection.commit()
+
+    def lookup(self, sentences: List[str], target_language: str, source_language: Optional[str] = None,
+               model: Optional[str] = None) -> Dict[str, str]:
+        """
+        Find stored translations for sentences
+
+        Exact matches are preferred; sentences without one are matched on
+        their normalized form.
+
+        Args:
+            sentences: Source sentences
+            target_language: Target language code
+            source_language: Language code of the sentences, if known
+            model: Model whose translations may be reused
+
+        Returns:
+            Dictionary mapping each found source sentence to its translation
+        """
+        if not sentences:
+            return {}
+
+        key = (source_language or "", target_language, model or "")
+        exact = {_hash(sentence): sentence for sentence in sentences}
+        found: Dict[str, str] = {}
+        with self._lock:
+            for source_hash, translation in self._select("source_hash", list(exact), key):
+                found[exact[source_hash]] = translation
+
+            missing = [sentence for sentence in sentences if sentence not in found]
+            normalized: Dict[str, List[str]] = {}
+            for sentence in missing:
+                normalized.setdefault(_hash(normalize_segment(sentence)), []).append(sentence)
+            for normalized_hash, translation in self._select("normalized_hash", list(normalized), key):
+                for sentence in normalized[normalized_hash]:
+                    found.setdefault(sentence, translation)
+
+        return found
+
+    def _select(self, column: str, hashes: List[str], key: Tuple[str, str, str]) -> List[Tuple[str, str]]:
+        """Query translations of one language pair and model by hash in batches below SQLite's parameter limit"""
+        rows = []
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows += self._connection.execute(
+                f"SELECT {column}, translation FROM segments "
+                f"WHERE source_language = ? AND target_language = ? AND model = ? AND {column} IN ({placeholders})",
+                [*key, *batch]
+            ).fetchall()
+        return rows
+
+    def store(self, pairs: List[Tuple[str, str]], target_language: str, source_language: Optional[str] = None,
+              model: Optional[str] = None, replace: bool = False) -> None:
+        """
+        Store translated sentences
+
+        A sentence that is already stored keeps its first translation, so one
+        bad response cannot overwrite a good translation, unless replace is set.
+
+        Args:
+            pairs: List of (source sentence, translation) pairs
+            target_language: Target language code
+            source_language: Language code of the sentences, if known
+            model: Model that produced the translations
+            replace: Overwrite translations that are already stored
+        """
+        now = time.time()
+        rows = [
+            (source_language or "", target_language, model or "", _hash(source), _hash(normalize_segment(source)),
+             source, translation, now)
+            for source, translation in pairs
+        ]
+        with self._lock:
+            self._connection.executemany(
+                f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO segments VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+
+class MemoryTranslator(BaseTranslator):
+    """Translator that reuses previously translated sentences and only sends unseen ones to the wrapped translator"""
+
+    def __init__(self, translator: BaseTranslator, memory: Optional[TranslationMemory] = None,
+                 refresh: bool = False):
+        """
+        Initialize memory-backed translator
+
+        Args:
+            translator: Translator used for sentences not found in the memory
+            memory: Translation memory (defaults to one at TRANSLATION_MEMORY_PATH)
+            refresh: Translate every sentence again and replace the stored translations
+        """
+        self.translator = translator
+        self.memory = memory if memory is not None else TranslationMemory()
+        self.refresh = refresh
+
+    @property
+    def model(self) -> Optional[str]:
+        """
+        Configured model of the wrapped translator, which keys its stored translations
+
+        Sentences its budget fallback model translated are stored under the
+        configured model too, since they come from the same translator setup.
+        """
+        return getattr(self.translator, "model", None) or getattr(self.translator, "model_name", None)
+
+    @property
+    def usage_tracker(self):
+        """Usage tracker of the wrapped translator"""
+        return getattr(self.translator, "usage_tracker", None)
+
+    @usage_tracker.setter
+    def usage_tracker(self, tracker) -> None:
+        self.translator.usage_tracker = tracker
+
+    @property
+    def max_concurrency(self) -> Optional[int]:
+        """Request concurrency of the wrapped translator, or None if it sends no concurrent requests"""
+        return getattr(self.translator, "max_concurrency", None)
+
+    @max_concurrency.setter
+    def max_concurrency(self, concurrency: int) -> None:
+        if hasattr(self.translator, "max_concurrency"):
+            self.translator.max_concurrency = concurrency
+
+    def translate(self, text: str, target_language: str, source_language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Translate text to target language, reusing stored sentence translations
+
+        Unseen sentences are sent in one batch_translate call, which packs
+        them into as few requests as the wrapped translator allows and maps
+        each translation back to its own sentence, so every stored
+        translation belongs to exactly one source sentence and can be reused
+        in any other text.
+
+        Args:
+            text: Text to translate
+            target_language: Target language code (e.g., 'en', 'es', 'fr')
+            source_language: Language code of the text, passed to the wrapped translator
+
+        Returns:
+            Dictionary containing:
+                - translated_text: Translated text
+                - target_language: Target language
+                - model: Model used for the newly translated sentences
+                - usage: Token counts and latency of the LLM calls
+                - metadata: Number of segments, memory hits and requests made
+        """
+        segments = segment_sentences(text)
+        sentences = [sentence for sentence, _ in segments]
+        translations = {} if self.refresh else self.memory.lookup(sentences, target_language, source_language,
+                                                                   self.model)
+        memory_hits = sum(1 for sentence in sentences if sentence in translations)
+
+        # Repeated sentences are translated once
+        unseen = list(dict.fromkeys(sentence for sentence in sentences if sentence not in translations))
+        results = self.translator.batch_translate(unseen, target_language, source_language) if unseen else []
+        pairs = [(sentence, result["translated_text"].strip()) for sentence, result in zip(unseen, results)]
+        if pairs:
+            self.memory.store(pairs, target_language, source_language, self.model, replace=self.refresh)
+            translations.update(pairs)
+
+        translated_text = "".join(translations[sentence] + separator for sentence, separator in segments)
+        usages = [result["usage"] for result in results if result.get("usage")]
+        usage = combine_usage(usages) if usages else None
+
+        return {
+            "translated_text": translated_text,
+            "target_language": target_language,
+            "model": results[0].get("model") if results else None,
+            "usage": usage,
+            "metadata": {
+                "segments": len(segments),
+                "memory_hits": memory_hits,
+                # Translators that report no usage count as one request per batch_translate call
+                "requests": usage["calls"] if usage else int(bool(unseen))
+            }
+        }
+
+    def batch_translate(self, texts: List[str], target_language: str,
+                        source_language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Translate multiple texts
+
+        Args:
+            texts: List of texts to translate
+            target_language: Target language code
+            source_language: Language code of the texts, passed to the wrapped translator
+
+        Returns:
+            List of translation results, each containing metadata
+        """
+        return [self.translate(text, target_language, source_language) for text in texts]
@@ -1,10 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterator, Optional
+import logging
 import youtube_dl
 import os
 from pathlib import Path
 from config.config import VIDEO_DOWNLOAD_PATH, AUDIO_DOWNLOAD_PATH  
 
+logger = logging.getLogger(__name__)
+
+# The id keeps videos that share a title from overwriting each other
+DEFAULT_OUTPUT_TEMPLATE = "%(title)s [%(id)s].%(ext)s"
+
 class VideoDownloader(ABC):
     """Abstract base class for video downloading functionality."""
     
@@ -58,14 +65,139 @@ class YouTubeDLDownloader(VideoDownloader):
         except youtube_dl.utils.DownloadError as e:
             raise ValueError(f"Error getting video info: {str(e)}")
 
-    def download(self, url: str, output_path: str = VIDEO_DOWNLOAD_PATH, filename: Optional[str] = None) -> str:
+    def iter_playlist_entries(self, url: str) -> Iterator[str]:
+        """
+        Lazily enumerate the video URLs behind a playlist or channel URL.
+        
+        Entries are resolved one at a time as the extractor pages through the
+        playlist, so downloads can start before the whole listing is known.
+        A plain video URL yields itself. Redirects (e.g. a youtu.be link
+        carrying a playlist id) are followed before the URL is classified.
+        
+        Args:
+            url: Playlist, channel or video URL
+            
+        Yields:
+            str: URL of each video entry
+            
+        Raises:
+            ValueError: If the URL cannot be resolved
+        """
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': 'in_playlist',
+        }
+        
+        try:
+            with youtube_dl.YoutubeDL(ydl_opts) as ydl:
+                # process=False keeps 'entries' as the extractor's lazy generator
+                info = ydl.extract_info(url, download=False, process=False)
+                while info.get('_type') in ('url', 'url_transparent'):
+                    info = ydl.extract_info(info['url'], download=False, ie_key=info.get('ie_key'), process=False)
+                if info.get('_type') not in ('playlist', 'multi_video'):
+                    yield info.get('webpage_url') or url
+                    return
+                
+                for entry in info.get('entries') or []:
+                    if not entry:
+                        continue
+                    entry_url = entry.get('webpage_url') or entry.get('url') or entry.get('id')
+                    if not entry_url:
+                        continue
+                    # Channels expose their uploads as nested playlists
+                    if entry.get('_type') == 'playlist' or entry.get('ie_key') in ('YoutubePlaylist', 'YoutubeTab'):
+                        yield from self.iter_playlist_entries(entry_url)
+                    else:
+                        yield entry_url
+        except youtube_dl.utils.DownloadError as e:
+            raise ValueError(f"Error getting playlist entries: {str(e)}")
+
+    def download_playlist(self, url: str, output_path: str = VIDEO_DOWNLOAD_PATH, max_workers: int = 4,
+                          rate_limit: Optional[float] = None, ignore_errors: bool = False) -> Iterator[str]:
+        """
+        Download every video of a playlist or channel with bounded concurrency.
+        
+        At most ``max_workers`` downloads are in flight at once and entries are
+        pulled from the playlist only when a worker slot frees up. Paths are
+        yielded as soon as each download completes (completion order, not
+        playlist order), so the caller can process them while the rest download.
+        
+        With ignore_errors, failed entries are skipped, but if no entry could be
+        downloaded (e.g. a single video URL that fails) the last error is raised,
+        so a run never ends successfully with nothing to process.
+        
+        Args:
+            url: Playlist, channel or video URL
+            output_path: Path where the videos should be saved (defaults to VIDEO_DOWNLOAD_PATH from config)
+            max_workers: Maximum number of concurrent downloads
+            rate_limit: Optional total bandwidth cap in bytes per second, split evenly between workers
+            ignore_errors: Skip entries that fail to download instead of raising
+            
+        Yields:
+            str: Path to each downloaded video file
+            
+        Raises:
+            ValueError: If max_workers is not positive, a download fails (unless
+                        ignore_errors is set) or no video could be downloaded
+        """
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        
+        per_download_rate = rate_limit / max_workers if rate_limit else None
+        downloaded = 0
+        last_error: Optional[ValueError] = None
+        
+        def collect(done):
+            nonlocal downloaded, last_error
+            for future in done:
+                try:
+                    path = future.result()
+                except ValueError as e:
+                    if not ignore_errors:
+                        raise
+                    last_error = e
+                    logger.warning("Skipping playlist entry: %s", e)
+                    continue
+                downloaded += 1
+                yield path
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for entry_url in self.iter_playlist_entries(url):
+                if len(pending) >= max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from collect(done)
+                pending.add(executor.submit(self.download, entry_url, output_path, rate_limit=per_download_rate))
+            
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from collect(done)
+        
+        if not downloaded:
+            if last_error is not None:
+                raise ValueError(f"No video could be downloaded from {url}: {str(last_error)}") from last_error
+            raise ValueError(f"No videos found at {url}")
+
+    def _output_template(self, output_path: str, filename: Optional[str]) -> str:
+        """youtube-dl output template for a custom filename, or for the title and id of the video"""
+        if not filename:
+            return str(Path(output_path) / DEFAULT_OUTPUT_TEMPLATE)
+        # Clean filename of invalid characters
+        filename = "".join(c for c in filename if c.isalnum() or c in (' ', '-', '_'))
+        return str(Path(output_path) / f"{filename}.%(ext)s")
+
+    def download(self, url: str, output_path: str = VIDEO_DOWNLOAD_PATH, filename: Optional[str] = None,
+                 rate_limit: Optional[float] = None) -> str:
         """
         Download video using youtube-dl.
         
         Args:
             url: Video URL
             output_path: Path where the video should be saved (defaults to VIDEO_DOWNLOAD_PATH from config)
-            filename: Optional custom filename (without extension)
+            filename: Optional custom filename (without extension); defaults to
+                      the title followed by the video id
+            rate_limit: Optional download bandwidth cap in bytes per second
             
         Returns:
             str: Path to the downloaded video file
@@ -76,27 +208,20 @@ class YouTubeDLDownloader(VideoDownloader):
         try:
             # Create output directory if it doesn't exist
             os.makedirs(output_path, exist_ok=True)
-            
-            # Get video info to determine the title if filename is not provided
-            if not filename:
-                video_info = self._get_video_info(url)
-                filename = video_info.get('title', 'video')
-                
-            # Clean filename of invalid characters
-            filename = "".join(c for c in filename if c.isalnum() or c in (' ', '-', '_'))
-            output_template = str(Path(output_path) / f"{filename}.%(ext)s")
+            output_template = self._output_template(output_path, filename)
             
             ydl_opts = {
                 'format': 'best',  # Best quality
                 'outtmpl': output_template,
                 'noplaylist': True,  # Don't download playlists
             }
+            if rate_limit:
+                ydl_opts['ratelimit'] = rate_limit
             
             # Download the video
             with youtube_dl.YoutubeDL(ydl_opts) as ydl:
                 video_info = ydl.extract_info(url, download=True)
-                ext = video_info['ext']
-                final_path = str(Path(output_path) / f"{filename}.{ext}")
+                final_path = ydl.prepare_filename(video_info)
                 
                 if not os.path.exists(final_path):
                     raise FileNotFoundError("Downloaded file not found")
@@ -108,14 +233,17 @@ class YouTubeDLDownloader(VideoDownloader):
         except Exception as e:
             raise ValueError(f"Unexpected error: {str(e)}")
 
-    def download_audio(self, url: str, output_path: str = AUDIO_DOWNLOAD_PATH, filename: Optional[str] = None) -> str:
+    def download_audio(self, url: str, output_path: str = AUDIO_DOWNLOAD_PATH, filename: Optional[str] = None,
+                       rate_limit: Optional[float] = None) -> str:
         """
         Download only the audio from a video.
         
         Args:
             url: Video URL
             output_path: Path where the audio should be saved (defaults to AUDIO_DOWNLOAD_PATH from config)
-            filename: Optional custom filename (without extension)
+            filename: Optional custom filename (without extension); defaults to
+                      the title followed by the video id
+            rate_limit: Optional download bandwidth cap in bytes per second
             
         Returns:
             str: Path to the downloaded audio file
@@ -123,15 +251,7 @@ class YouTubeDLDownloader(VideoDownloader):
         try:
             # Create output directory if it doesn't exist
             os.makedirs(output_path, exist_ok=True)
-            
-            # Get video info to determine the title if filename is not provided
-            if not filename:
-                video_info = self._get_video_info(url)
-                filename = video_info.get('title', 'audio')
-                
-            # Clean filename of invalid characters
-            filename = "".join(c for c in filename if c.isalnum() or c in (' ', '-', '_'))
-            output_template = str(Path(output_path) / f"{filename}.%(ext)s")
+            output_template = self._output_template(output_path, filename)
             
             ydl_opts = {
                 'format': 'bestaudio/best',
@@ -143,13 +263,16 @@ class YouTubeDLDownloader(VideoDownloader):
                 'outtmpl': output_template,
                 'noplaylist': True,
             }
+            if rate_limit:
+                ydl_opts['ratelimit'] = rate_limit
             
             # Download and extract audio
             with youtube_dl.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
+                video_info = ydl.extract_info(url, download=True)
+                # The audio extractor replaces the downloaded file with an mp3
+                audio_path = str(Path(ydl.prepare_filename(video_info)).with_suffix('.mp3'))
                 
             # Check for the output file
-            audio_path = str(Path(output_path) / f"{filename}.mp3")
             if not os.path.exists(audio_path):
                 raise FileNotFoundError("Downloaded audio file not found")
                 
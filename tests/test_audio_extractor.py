@@ -1,6 +1,7 @@
 import pytest
 import os
-from src.audio_extractor import AudioExtractor
+import soundfile
+from src.audio_extractor import AudioExtractor, plan_segments
 from config.config import VIDEO_DOWNLOAD_TEST_PATH
 
 class TestAudioExtractor:
@@ -56,3 +57,41 @@ class TestAudioExtractor:
         
         # Clean up the created audio file
         os.remove(output_file)
+    
+    def test_extract_audio_segments_file_not_found(self, audio_extractor):
+        """Test extract_audio_segments with non-existent file"""
+        with pytest.raises(FileNotFoundError):
+            next(audio_extractor.extract_audio_segments("nonexistent_video.mp4"))
+    
+    def test_extract_audio_segments(self, audio_extractor, sample_video_path, tmp_path):
+        """Test that segments are 16 kHz mono, in order and cover the whole audio"""
+        segment_paths = list(audio_extractor.extract_audio_segments(
+            sample_video_path,
+            segment_seconds=10.0,
+            max_workers=2,
+            output_path=str(tmp_path)
+        ))
+        
+        assert segment_paths == sorted(segment_paths)
+        durations = []
+        for segment_path in segment_paths:
+            info = soundfile.info(segment_path)
+            assert info.samplerate == 16000
+            assert info.channels == 1
+            durations.append(info.duration)
+        # The last two segments may share a short remainder
+        assert all(duration == pytest.approx(10.0, abs=0.05) for duration in durations[:-2])
+        assert all(duration <= 10.05 for duration in durations[-2:])
+        assert len(durations) == 1 or durations[-1] >= 1.0 - 0.05
+    
+    def test_plan_segments_merges_short_remainder(self):
+        """Test that a duration just over a multiple of the segment length leaves no near-empty last segment"""
+        assert plan_segments(60.0, 30.0) == [(0.0, 30.0), (30.0, 30.0)]
+        assert plan_segments(75.0, 30.0) == [(0.0, 30.0), (30.0, 30.0), (60.0, 30.0)]
+        
+        segments = plan_segments(60.4, 30.0)
+        assert segments == [(0.0, 30.0), (30.0, pytest.approx(15.2)), (pytest.approx(45.2), pytest.approx(15.2))]
+        assert all(length <= 30.0 for _, length in segments)
+        assert sum(length for _, length in segments) == pytest.approx(60.4)
+        
+        assert plan_segments(0.4, 30.0) == [(0.0, 30.0)]
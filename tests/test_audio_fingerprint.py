@@ -0,0 +1,152 @@
+import pytest
+import soundfile as sf
+import torch
+import torchaudio
+from src.transcriber.base_transcriber import BaseTranscriber
+from src.transcriber.audio_fingerprint import (
+    DeduplicatingTranscriber,
+    FingerprintIndex,
+    compute_fingerprint,
+)
+
+SAMPLE_RATE = 16000
+
+def make_audio(seed, seconds=20):
+    """Random sequence of decaying tones, so different seeds give different audio"""
+    generator = torch.Generator().manual_seed(seed)
+    t = torch.arange(SAMPLE_RATE // 4) / SAMPLE_RATE
+    notes = []
+    for _ in range(seconds * 4):
+        frequency = 200 + torch.rand(1, generator=generator).item() * 3000
+        notes.append(torch.sin(2 * torch.pi * frequency * t) * torch.exp(-12 * t))
+    return 0.5 * torch.cat(notes)
+
+class FakeTranscriber(BaseTranscriber):
+    """Transcriber that counts its calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio_path):
+        return self.transcribe_with_metadata(audio_path)["text"]
+
+    def transcribe_with_metadata(self, audio_path):
+        self.calls += 1
+        return {"text": f"transcript {self.calls}", "model_name": "fake"}
+
+class FakeWaveformTranscriber(FakeTranscriber):
+    """Transcriber that accepts decoded waveforms and refuses to decode files itself"""
+
+    def __init__(self, model_name="fake"):
+        super().__init__()
+        self.model_name = model_name
+
+    def transcribe_with_metadata(self, audio_path):
+        raise AssertionError("audio decoded a second time")
+
+    def transcribe_waveform(self, waveform):
+        self.calls += 1
+        return {"text": f"transcript {self.calls}", "model_name": self.model_name}
+
+    def decoding_settings(self):
+        return {"model_name": self.model_name}
+
+class TestFingerprintIndex:
+    @pytest.fixture
+    def index(self):
+        index = FingerprintIndex(":memory:")
+        yield index
+        index.close()
+
+    def test_match_identical_audio(self, index):
+        """Test that the same audio matches itself"""
+        fingerprint = compute_fingerprint(make_audio(0))
+        index.add(fingerprint, 20.0, {"text": "hello"}, source="a.mp3")
+
+        match = index.match(fingerprint, 20.0)
+        assert match is not None
+        assert match["source"] == "a.mp3"
+        assert match["result"] == {"text": "hello"}
+        assert match["score"] == pytest.approx(1.0)
+
+    def test_match_shifted_noisy_audio(self, index):
+        """Test that a re-encoded copy with extra leading silence and noise still matches"""
+        audio = make_audio(1)
+        index.add(compute_fingerprint(audio), 20.0, {"text": "hello"})
+
+        generator = torch.Generator().manual_seed(42)
+        copy = torch.cat([torch.zeros(3000), 0.8 * audio]) + 0.01 * torch.randn(len(audio) + 3000, generator=generator)
+        assert index.match(compute_fingerprint(copy), 20.2) is not None
+
+    def test_no_match_for_different_audio(self, index):
+        """Test that unrelated audio is not matched"""
+        index.add(compute_fingerprint(make_audio(2)), 20.0, {"text": "hello"})
+        assert index.match(compute_fingerprint(make_audio(3)), 20.0) is None
+
+    def test_no_match_for_shared_jingle(self, index):
+        """Test that two clips sharing only a jingle are not duplicates"""
+        jingle = make_audio(8, seconds=4)
+        first = torch.cat([jingle, make_audio(9, seconds=16)])
+        second = torch.cat([jingle, make_audio(10, seconds=16)])
+        index.add(compute_fingerprint(first), 20.0, {"text": "hello"})
+        
+        assert index.match(compute_fingerprint(second), 20.0) is None
+        # The jingle alone is fully contained in the stored clip but is most of neither
+        assert index.match(compute_fingerprint(second), 20.0, min_score=0.1) is not None
+
+    def test_no_match_for_different_duration(self, index):
+        """Test that candidates with a very different duration are skipped"""
+        fingerprint = compute_fingerprint(make_audio(4))
+        index.add(fingerprint, 20.0, {"text": "hello"})
+        assert index.match(fingerprint, 60.0) is None
+
+class TestDeduplicatingTranscriber:
+    def test_duplicate_audio_reuses_transcript(self, tmp_path):
+        """Test that a second copy of the same audio is not transcribed again"""
+        audio = make_audio(5)
+        first, second = tmp_path / "first.wav", tmp_path / "second.wav"
+        torchaudio.save(str(first), audio[None], SAMPLE_RATE)
+        torchaudio.save(str(second), 0.7 * audio[None], SAMPLE_RATE)
+
+        fake = FakeTranscriber()
+        transcriber = DeduplicatingTranscriber(fake, FingerprintIndex(":memory:"))
+
+        first_result = transcriber.transcribe_with_metadata(first)
+        second_result = transcriber.transcribe_with_metadata(second)
+
+        assert fake.calls == 1
+        assert first_result["deduplicated"] is False
+        assert second_result["deduplicated"] is True
+        assert second_result["text"] == first_result["text"]
+        assert second_result["fingerprint"]["source"] == str(first)
+
+    def test_waveform_decoded_once(self, tmp_path):
+        """Test that the fingerprinted waveform is handed to the wrapped transcriber"""
+        path = tmp_path / "audio.wav"
+        sf.write(str(path), make_audio(6).numpy(), SAMPLE_RATE)
+
+        fake = FakeWaveformTranscriber()
+        result = DeduplicatingTranscriber(fake, FingerprintIndex(":memory:")).transcribe_with_metadata(path)
+        assert fake.calls == 1
+        assert result["deduplicated"] is False
+
+    def test_settings_in_cache_key(self, tmp_path):
+        """Test that a transcript is not reused by a transcriber with other settings"""
+        path = tmp_path / "audio.wav"
+        sf.write(str(path), make_audio(7).numpy(), SAMPLE_RATE)
+        index = FingerprintIndex(":memory:")
+
+        DeduplicatingTranscriber(FakeWaveformTranscriber("small"), index).transcribe_with_metadata(path)
+        other = FakeWaveformTranscriber("large")
+        result = DeduplicatingTranscriber(other, index).transcribe_with_metadata(path)
+        assert other.calls == 1
+        assert result["deduplicated"] is False
+
+        again = DeduplicatingTranscriber(FakeWaveformTranscriber("small"), index).transcribe_with_metadata(path)
+        assert again["deduplicated"] is True
+
+    def test_file_not_found(self):
+        """Test transcription with non-existent file"""
+        transcriber = DeduplicatingTranscriber(FakeTranscriber(), FingerprintIndex(":memory:"))
+        with pytest.raises(FileNotFoundError):
+            transcriber.transcribe("nonexistent_audio.mp3")
@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from benchmarks.fixtures import build_tiny_m2m100
+from src.translator.huggingface_translator import HuggingFaceTranslator, load_seq2seq_model
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """Tiny randomly initialized M2M100 model saved locally: fast to load, output is not meaningful"""
+    return build_tiny_m2m100(tmp_path_factory.mktemp("tiny-m2m100"))
+
+class TestHuggingFaceTranslator:
+    @pytest.fixture
+    def translator(self, tiny_model):
+        return HuggingFaceTranslator(model_name=tiny_model, batch_size=2, max_new_tokens=8)
+
+    def test_init_default(self):
+        """Test default initialization"""
+        translator = HuggingFaceTranslator()
+        assert translator.model_name == "facebook/m2m100_418M"
+        assert translator.source_language == "en"
+        assert translator.device in ["cuda", "cpu"]
+
+    def test_translate_empty_text(self, translator):
+        """Test translation of empty text"""
+        with pytest.raises(ValueError):
+            translator.translate("", "de")
+
+    def test_translate_structure(self, translator, tiny_model):
+        """Test that sentences are generated in batches and stitched back together"""
+        result = translator.translate("Hello there. How are you?\nFine, thanks!", "de")
+
+        assert isinstance(result["translated_text"], str)
+        assert result["target_language"] == "de"
+        assert result["model"] == tiny_model
+        assert result["metadata"]["segments"] == 3
+        assert result["metadata"]["batches"] == 2
+        assert "\n" in result["translated_text"]
+
+    def test_batch_translate_keeps_order(self, translator):
+        """Test that batching across texts returns one result per text in input order"""
+        texts = ["Good morning.", "This is a much longer sentence. It has two parts.", "Bye."]
+        results = translator.batch_translate(texts, "de")
+
+        assert len(results) == 3
+        assert [r["metadata"]["segments"] for r in results] == [1, 2, 1]
+        assert results[0]["translated_text"] == translator.translate("Good morning.", "de")["translated_text"]
+
+    def test_source_language_per_call(self, translator):
+        """Test that the source language is passed per call without changing the translator"""
+        result = translator.translate("Hello there.", "de", source_language="fr")
+        assert result["source_language"] == "fr"
+        assert translator.source_language == "en"
+        assert translator.translate("Hello there.", "de")["source_language"] == "en"
+
+    def test_unsupported_language(self, translator):
+        """Test that language codes unknown to the model raise ValueError"""
+        with pytest.raises(ValueError, match="xx"):
+            translator.translate("Hello there.", "xx")
+        with pytest.raises(ValueError, match="yy"):
+            translator.translate("Hello there.", "de", source_language="yy")
+
+    def test_source_language_concurrent(self, translator):
+        """Test that concurrent calls sharing one tokenizer each encode their own source language"""
+        tokenizer, _ = load_seq2seq_model(translator.model_name)
+        languages = ["fr", "es"] * 20
+
+        def first_token(language):
+            return translator._encode(tokenizer, ["Hello there."], language)["input_ids"][0, 0].item()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            tokens = list(executor.map(first_token, languages))
+        assert tokens == [tokenizer.get_lang_id(language) for language in languages]
+
+    def test_model_registry_shares_models(self, tiny_model):
+        """Test that a model is loaded only once per process"""
+        assert load_seq2seq_model(tiny_model) is load_seq2seq_model(tiny_model)
+
+    def test_quantized_model(self, tiny_model):
+        """Test int8 quantization on CPU"""
+        translator = HuggingFaceTranslator(model_name=tiny_model, max_new_tokens=8, quantize=True)
+        translator.device = "cpu"
+        result = translator.translate("Hello there.", "de")
+        assert result["metadata"]["quantized"] is True
@@ -0,0 +1,68 @@
+import json
+import threading
+from src.instrumentation import Instrumentation, render_prometheus
+
+class TestInstrumentation:
+    def test_stage_records_timings(self):
+        """Test that a stage records wall and CPU time plus caller supplied values"""
+        metrics = Instrumentation(job_id="video")
+        with metrics.stage("transcription") as stage:
+            stage["audio_seconds"] = 10.0
+        
+        record = metrics.stages[0]
+        assert record["name"] == "transcription"
+        assert record["wall_seconds"] >= 0
+        assert record["cpu_seconds"] >= 0
+        assert record["audio_seconds"] == 10.0
+    
+    def test_stage_peak_rss_is_per_stage(self):
+        """Test that a stage after a memory-heavy one reports its own, lower peak"""
+        metrics = Instrumentation(job_id="video", rss_interval=0.01)
+        with metrics.stage("heavy"):
+            buffer = bytearray(256 * 1024 * 1024)
+            buffer[::4096] = b"x" * len(buffer[::4096])
+        del buffer
+        with metrics.stage("light"):
+            pass
+        
+        heavy, light = metrics.stages
+        assert heavy["peak_rss_mb"] - light["peak_rss_mb"] > 128
+    
+    def test_stage_recorded_on_error(self):
+        """Test that a failing stage is still recorded and stops its RSS sampler"""
+        metrics = Instrumentation(job_id="video")
+        threads = threading.active_count()
+        try:
+            with metrics.stage("summarization"):
+                raise RuntimeError("API Error")
+        except RuntimeError:
+            pass
+        
+        assert [stage["name"] for stage in metrics.stages] == ["summarization"]
+        assert threading.active_count() == threads
+    
+    def test_record_llm_call(self):
+        """Test that token counts are aggregated in the JSON output"""
+        metrics = Instrumentation(job_id="video")
+        usage = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120, "latency_seconds": 0.5}
+        metrics.record_llm_call("summarization", {"model": "gpt-4o-mini", "usage": usage})
+        metrics.record_llm_call("translation", {"model": "gpt-4o-mini", "usage": usage})
+        
+        data = json.loads(metrics.to_json())
+        assert data["job_id"] == "video"
+        assert data["totals"]["prompt_tokens"] == 200
+        assert data["totals"]["completion_tokens"] == 40
+    
+    def test_prometheus_format(self):
+        """Test that metrics of several jobs render with a single HELP/TYPE header per metric"""
+        jobs = []
+        for job_id in ("first", "second"):
+            metrics = Instrumentation(job_id=job_id)
+            with metrics.stage("transcription"):
+                pass
+            jobs.append(metrics)
+        
+        text = render_prometheus(jobs)
+        assert text.count("# TYPE textrizer_stage_wall_seconds gauge") == 1
+        assert 'textrizer_stage_wall_seconds{job="first",stage="transcription"}' in text
+        assert 'textrizer_stage_wall_seconds{job="second",stage="transcription"}' in text
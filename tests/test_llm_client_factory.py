@@ -0,0 +1,77 @@
+import pytest
+from src.llm.client_factory import close_clients, configure_pool, get_chat_client, get_http_client
+from src.summarizer.openai_summarizer import OpenAISummarizer
+from src.translator.openai_translator import OpenAITranslator
+
+class TestClientFactory:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        """Use a placeholder key and start every test with an empty client cache"""
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        close_clients()
+        yield
+        close_clients()
+    
+    def test_reuse_per_model(self):
+        """Test that clients are reused per model and share one HTTP pool"""
+        first = get_chat_client("gpt-4o-mini", 0.1)
+        assert get_chat_client("gpt-4o-mini", 0.1) is first
+        
+        other = get_chat_client("gpt-4o", 0.1)
+        assert other is not first
+        assert first.http_client is get_http_client()
+        assert other.http_client is get_http_client()
+    
+    def test_components_share_client(self):
+        """Test that components built with the same model share their client"""
+        summarizer = OpenAISummarizer(model="gpt-4o-mini", temperature=0.1)
+        translator = OpenAITranslator(model="gpt-4o-mini", temperature=0.1)
+        assert summarizer.client is translator.client
+    
+    def test_injected_client(self):
+        """Test that an explicitly provided client is used as is"""
+        client = get_chat_client("gpt-4o", 0.5)
+        translator = OpenAITranslator(client=client)
+        assert translator.client is client
+    
+    def test_configure_pool(self):
+        """Test that pool settings apply to a newly created pool"""
+        configure_pool(max_connections=5, timeout=12.0)
+        try:
+            http_client = get_http_client()
+            assert http_client.timeout.read == 12.0
+        finally:
+            configure_pool(max_connections=20, timeout=60.0)
+    
+    def test_reconfigure_rebuilds_pool(self):
+        """Test that changing the settings after a client exists rebuilds the pool"""
+        translator = OpenAITranslator(model="gpt-4o-mini", temperature=0.1)
+        first = translator.client
+        try:
+            configure_pool(max_connections=3)
+            assert first.http_client.is_closed
+            client = translator.client
+            assert client is not first
+            assert client.http_client is get_http_client()
+            assert get_http_client()._transport._pool._max_connections == 3
+            
+            # Unchanged settings keep the pool
+            configure_pool(max_connections=3)
+            assert translator.client is client
+            assert not client.http_client.is_closed
+        finally:
+            configure_pool(max_connections=20)
+    
+    def test_close_clients(self):
+        """Test that closing forgets cached clients"""
+        first = get_chat_client("gpt-4o-mini", 0.1)
+        close_clients()
+        assert get_chat_client("gpt-4o-mini", 0.1) is not first
+    
+    def test_component_after_close(self):
+        """Test that components get a fresh client after the pool is closed"""
+        summarizer = OpenAISummarizer(model="gpt-4o-mini", temperature=0.1)
+        old_http_client = summarizer.client.http_client
+        close_clients()
+        assert old_http_client.is_closed
+        assert not summarizer.client.http_client.is_closed
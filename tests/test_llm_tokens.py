@@ -0,0 +1,41 @@
+import pytest
+from src.llm.tokens import count_tokens, context_window, preflight, split_into_chunks, trim_filler
+
+class TestTokens:
+    def test_count_tokens(self):
+        """Test local token counting"""
+        assert count_tokens("", "gpt-4o-mini") == 0
+        assert count_tokens("Hello world", "gpt-4o-mini") == 2
+    
+    def test_context_window(self):
+        """Test context window lookup, including dated snapshots and unknown models"""
+        assert context_window("gpt-4o-mini") == 128_000
+        assert context_window("gpt-4o-mini-2024-07-18") == 128_000
+        assert context_window("some-local-model") == 128_000
+    
+    def test_preflight(self):
+        """Test pre-flight estimate structure"""
+        estimate = preflight("Hello world", "gpt-4o-mini", completion_tokens=100)
+        assert estimate["prompt_tokens"] == 2
+        assert estimate["fits"]
+        assert estimate["estimated_cost_usd"] > 0
+        assert estimate["estimated_latency_seconds"] > 0
+    
+    def test_trim_filler(self):
+        """Test that timestamps and repetition loops are removed"""
+        text = "[00:01:02] We start. thank you thank you thank you thank you 00:00:01,000 --> 00:00:02,000 <|1.20|> end"
+        assert trim_filler(text) == "We start. thank you thank you end"
+    
+    def test_split_into_chunks(self):
+        """Test that chunks respect the token limit and keep all text"""
+        text = " ".join(f"Sentence number {i} is here." for i in range(200))
+        chunks = split_into_chunks(text, "gpt-4o-mini", chunk_tokens=50)
+        
+        assert len(chunks) > 1
+        assert all(count_tokens(chunk, "gpt-4o-mini") <= 50 for chunk in chunks)
+        assert " ".join(chunks) == text
+    
+    def test_split_into_chunks_invalid(self):
+        """Test chunk size validation"""
+        with pytest.raises(ValueError, match="chunk_tokens must be positive"):
+            split_into_chunks("text", "gpt-4o-mini", chunk_tokens=0)
@@ -0,0 +1,101 @@
+import pytest
+from types import SimpleNamespace
+from src.llm.usage import (
+    BudgetExceededError,
+    UsageTracker,
+    estimate_cost,
+    extract_usage,
+    invoke_with_usage,
+)
+from src.llm.tokens import count_tokens
+
+def _response(prompt_tokens, completion_tokens, content="ok"):
+    return SimpleNamespace(
+        content=content,
+        response_metadata={"token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}}
+    )
+
+class TestUsage:
+    def test_extract_usage(self):
+        """Test token counts are read from response metadata"""
+        usage = extract_usage(_response(10, 5))
+        assert usage == {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    
+    def test_extract_usage_missing(self):
+        """Test responses without usage report zero tokens"""
+        assert extract_usage(SimpleNamespace(content="ok"))["total_tokens"] == 0
+    
+    def test_invoke_with_usage(self):
+        """Test that invoke_with_usage returns the response and measures latency"""
+        client = SimpleNamespace(invoke=lambda prompt: _response(3, 2, content=prompt))
+        response, usage = invoke_with_usage(client, "hello")
+        assert response.content == "hello"
+        assert usage["total_tokens"] == 5
+        assert usage["latency_seconds"] >= 0
+    
+    def test_estimate_cost(self):
+        """Test cost estimation, including dated model snapshots"""
+        assert estimate_cost("gpt-4o-mini", 1_000_000, 0) == pytest.approx(0.15)
+        assert estimate_cost("gpt-4o-mini-2024-07-18", 0, 1_000_000) == pytest.approx(0.60)
+        assert estimate_cost("unknown-model", 10, 10) is None
+
+class TestUsageTracker:
+    def test_aggregation(self):
+        """Test that calls are aggregated across components"""
+        tracker = UsageTracker()
+        tracker.record("OpenAISummarizer", "gpt-4o-mini", extract_usage(_response(100, 10)) | {"latency_seconds": 1.0})
+        tracker.record("OpenAITranslator", "gpt-4o-mini", extract_usage(_response(50, 40)) | {"latency_seconds": 0.5})
+        
+        summary = tracker.summary()
+        assert summary["prompt_tokens"] == 150
+        assert summary["completion_tokens"] == 50
+        assert summary["latency_seconds"] == pytest.approx(1.5)
+        assert summary["cost_usd"] > 0
+        assert summary["remaining_tokens"] is None
+    
+    def test_invalid_budget(self):
+        """Test budget validation"""
+        with pytest.raises(ValueError, match="Token budget must be positive"):
+            UsageTracker(token_budget=0)
+    
+    def test_budget_enforcement(self):
+        """Test downgrade threshold, text fitting and budget errors"""
+        tracker = UsageTracker(token_budget=1000, downgrade_ratio=0.2)
+        assert not tracker.should_downgrade()
+        
+        tracker.record("OpenAISummarizer", "gpt-4o-mini", extract_usage(_response(700, 150)) | {"latency_seconds": 0.1})
+        assert tracker.remaining_tokens == 150
+        assert tracker.should_downgrade()
+        
+        # Text is shortened to what the remaining budget allows, measured with the model's tokenizer
+        with pytest.warns(UserWarning, match="truncated"):
+            fitted = tracker.fit_text(" word" * 1000, overhead_tokens=20, completion_tokens=30, model="gpt-4o-mini")
+        assert count_tokens(fitted, "gpt-4o-mini") == 100
+        assert tracker.fits(100, 50)
+        assert not tracker.fits(100, 51)
+        
+        tracker.check(100, 50)
+        with pytest.raises(BudgetExceededError):
+            tracker.check(100, 51)
+        with pytest.raises(BudgetExceededError):
+            tracker.fit_text("text", overhead_tokens=100, completion_tokens=50, model="gpt-4o-mini")
+    
+    def test_split_remaining_reserves_shares(self):
+        """Test that concurrent calls get equal shares and cannot spend reserved tokens"""
+        tracker = UsageTracker(token_budget=1000)
+        tracker.record("OpenAISummarizer", "gpt-4o-mini", extract_usage(_response(100, 0)) | {"latency_seconds": 0.1})
+        
+        share = tracker.split_remaining(3)
+        assert share == 300
+        assert tracker.remaining_tokens == 0
+        # Reserved shares are not spent, so they do not trigger the fallback model
+        assert not tracker.should_downgrade()
+        with pytest.raises(BudgetExceededError):
+            tracker.fit_text("text", overhead_tokens=10, completion_tokens=10, model="gpt-4o-mini")
+        with pytest.warns(UserWarning):
+            fitted = tracker.fit_text(" word" * 1000, overhead_tokens=50, completion_tokens=50, model="gpt-4o-mini",
+                                      reserved_tokens=share)
+        assert count_tokens(fitted, "gpt-4o-mini") == 200
+        
+        tracker.release(share * 3)
+        assert tracker.remaining_tokens == 900
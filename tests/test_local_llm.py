@@ -0,0 +1,65 @@
+import pytest
+from src.llm.client_factory import close_clients
+from src.llm.stub_server import StubLLMServer
+from src.llm.usage import BudgetExceededError, UsageTracker
+from src.language.local_language_detector import LocalLanguageDetector
+from src.summarizer.local_summarizer import LocalSummarizer
+from src.translator.local_translator import LocalTranslator
+
+@pytest.fixture(scope="module")
+def server():
+    with StubLLMServer() as server:
+        yield server
+    close_clients()
+
+class TestLocalBackends:
+    def test_summarize(self, server):
+        """Test summarization against the local stub endpoint"""
+        summarizer = LocalSummarizer(base_url=server.base_url)
+        result = summarizer.summarize("The method is simple. It works well.", focus_points="methodology")
+        
+        assert result["summary"].startswith("The method is simple.")
+        assert result["usage"]["prompt_tokens"] > 0
+        assert server.requests[-1]["model"] == "local-model"
+    
+    def test_analyze(self, server):
+        """Test structured single-pass analysis against the local stub endpoint"""
+        result = LocalSummarizer(base_url=server.base_url).analyze("First point. Second point.")
+        
+        assert result["language_code"] == "en"
+        assert len(result["bullet_points"]) == 2
+    
+    def test_translate(self, server):
+        """Test translation against the local stub endpoint"""
+        result = LocalTranslator(base_url=server.base_url).translate("Hello world", "es")
+        assert result["translated_text"] == "Hello world"
+        assert result["target_language"] == "es"
+    
+    def test_fallback_model(self, server):
+        """Test that the fallback model is requested from the local server once the budget runs low"""
+        tracker = UsageTracker(token_budget=1000)
+        tracker.record("earlier", "local-model", {"prompt_tokens": 900, "completion_tokens": 0, "latency_seconds": 0.0})
+        translator = LocalTranslator(base_url=server.base_url, fallback_model="small-model", usage_tracker=tracker)
+        result = translator.translate("Hello world", "es")
+        
+        assert result["model"] == "small-model"
+        assert server.requests[-1]["model"] == "small-model"
+    
+    def test_detect_language(self, server):
+        """Test language detection against the local stub endpoint"""
+        result = LocalLanguageDetector(base_url=server.base_url).detect_language("Hello world")
+        assert result["language_code"] == "en"
+    
+    def test_budget_counted_with_tokenizer(self, server):
+        """Test that translation and detection check the budget with the tokenizer before sending"""
+        tracker = UsageTracker(token_budget=60)
+        requests = len(server.requests)
+        with pytest.raises(BudgetExceededError):
+            LocalTranslator(base_url=server.base_url, usage_tracker=tracker).translate("Hello world " * 50, "es")
+        assert len(server.requests) == requests
+        
+        # The detection sample is shortened to the budget instead
+        detector = LocalLanguageDetector(base_url=server.base_url, usage_tracker=tracker)
+        with pytest.warns(UserWarning, match="truncated"):
+            detector.detect_language("Hello world " * 50)
+        assert server.requests[-1]["messages"][-1]["content"].count("Hello") < 50
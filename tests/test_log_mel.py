@@ -0,0 +1,60 @@
+import pytest
+import torch
+from transformers import WhisperFeatureExtractor
+from src.transcriber.log_mel import LogMelFrontend
+
+@pytest.fixture
+def segments():
+    generator = torch.Generator().manual_seed(0)
+    return [0.1 * torch.randn(16000 * seconds, generator=generator) for seconds in (30, 12, 30, 5, 1)]
+
+@pytest.mark.parametrize("n_mels", [80, 128])
+def test_matches_whisper_feature_extractor(segments, n_mels):
+    """Test that batched features equal the ones of WhisperFeatureExtractor's default CPU path"""
+    feature_extractor = WhisperFeatureExtractor(feature_size=n_mels)
+    expected = feature_extractor(
+        [segment.numpy() for segment in segments], sampling_rate=16000, return_tensors="pt"
+    ).input_features
+
+    features = LogMelFrontend(feature_extractor)(segments)
+    assert features.shape == expected.shape
+    assert torch.allclose(features, expected, atol=1e-4)
+
+def test_long_form_matches_processor_features(segments):
+    """Test that long-form features cover the whole waveform with an attention mask"""
+    feature_extractor = WhisperFeatureExtractor()
+    waveform = torch.cat(segments)
+    expected = feature_extractor(
+        waveform.numpy(), sampling_rate=16000, return_tensors="pt", truncation=False, padding="longest",
+        return_attention_mask=True
+    )
+
+    inputs = LogMelFrontend(feature_extractor).long_form(waveform)
+    assert inputs.input_features.shape == expected.input_features.shape
+    assert inputs.input_features.shape[-1] > feature_extractor.nb_max_frames
+    assert torch.allclose(inputs.input_features, expected.input_features, atol=1e-4)
+    assert torch.equal(inputs.attention_mask, expected.attention_mask)
+
+def test_iter_long_form_keeps_order(segments):
+    """Test that prefetched long-form features come out in input order"""
+    frontend = LogMelFrontend(WhisperFeatureExtractor())
+    features = list(frontend.iter_long_form(segments))
+
+    assert len(features) == len(segments)
+    for inputs, segment in zip(features, segments):
+        assert torch.equal(inputs.input_features, frontend.long_form(segment).input_features)
+
+def test_iter_batches_keeps_order(segments):
+    """Test that prefetched batches come out in segment order with the requested sizes"""
+    frontend = LogMelFrontend(WhisperFeatureExtractor())
+    batches = list(frontend.iter_batches(segments, batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert torch.equal(torch.cat(batches), frontend(segments))
+
+def test_iter_batches_stops_early(segments):
+    """Test that closing the iterator early does not leave the producer blocked"""
+    frontend = LogMelFrontend(WhisperFeatureExtractor())
+    iterator = frontend.iter_batches(segments, batch_size=1, prefetch=1)
+    next(iterator)
+    iterator.close()
@@ -36,4 +36,216 @@ class TestOpenAISummarizer:
         
         assert summarizer.model == "gpt-4o-mini"
         assert summarizer.max_length == 1000
-        assert summarizer.client is not None 
\ No newline at end of file
+        assert summarizer.client is not None
+
+def test_summarize_chunked_strategy():
+    """Test that texts larger than max_input_tokens are summarized in chunks"""
+    with patch('src.llm.usage.get_chat_client') as mock:
+        instance = Mock()
+        instance.invoke.return_value = Mock(content="Short summary.", response_metadata={})
+        mock.return_value = instance
+        
+        summarizer = OpenAISummarizer(max_input_tokens=500, chunk_tokens=200)
+        text = " ".join(f"Sentence number {i} explains the method." for i in range(300))
+        result = summarizer.summarize(text, focus_points="methodology")
+        
+        assert result["summary"] == "Short summary."
+        assert result["metadata"]["preflight"]["strategy"] == "chunked"
+        assert result["metadata"]["preflight"]["num_chunks"] > 1
+        # One call per chunk plus the final reduce call
+        assert instance.invoke.call_count == result["metadata"]["preflight"]["num_chunks"] + 1
+        assert result["usage"]["calls"] == instance.invoke.call_count
+
+def test_summarize_single_strategy():
+    """Test that short texts are sent in a single request"""
+    with patch('src.llm.usage.get_chat_client') as mock:
+        instance = Mock()
+        instance.invoke.return_value = Mock(content="Summary.", response_metadata={})
+        mock.return_value = instance
+        
+        result = OpenAISummarizer().summarize("A short transcript.")
+        
+        assert result["metadata"]["preflight"]["strategy"] == "single"
+        assert instance.invoke.call_count == 1
+
+def test_summarize_reuses_cached_notes():
+    """Test that changing the focus points only re-runs the reduce step over cached chunk notes"""
+    from src.summarizer.notes_cache import NotesCache
+    
+    with patch('src.llm.usage.get_chat_client') as mock:
+        instance = Mock()
+        instance.invoke.return_value = Mock(content="Short summary.", response_metadata={})
+        mock.return_value = instance
+        
+        summarizer = OpenAISummarizer(max_input_tokens=500, chunk_tokens=200,
+                                      notes_cache=NotesCache(":memory:"), notes_min_tokens=100)
+        text = " ".join(f"Sentence number {i} explains the method." for i in range(300))
+        
+        first = summarizer.summarize(text, focus_points="methodology")
+        num_chunks = first["metadata"]["preflight"]["num_chunks"]
+        assert first["metadata"]["preflight"]["strategy"] == "notes"
+        assert first["metadata"]["preflight"]["notes"]["cache_hits"] == 0
+        assert instance.invoke.call_count == num_chunks + 1
+        # Chunk notes must not depend on the focus points
+        assert "methodology" not in instance.invoke.call_args_list[0].args[0]
+        
+        instance.invoke.reset_mock()
+        second = summarizer.summarize(text, focus_points="results")
+        assert second["metadata"]["preflight"]["notes"]["cache_hits"] == num_chunks
+        assert instance.invoke.call_count == 1
+        assert "results" in instance.invoke.call_args.args[0]
+
+def test_analyze_single_request():
+    """Test that analyze returns summary, bullet points and language from one structured request"""
+    from src.summarizer.openai_summarizer import TranscriptAnalysis
+    
+    with patch('src.llm.usage.get_chat_client') as mock:
+        instance = Mock()
+        structured = Mock()
+        structured.invoke.return_value = {
+            "raw": Mock(response_metadata={"token_usage": {"prompt_tokens": 120, "completion_tokens": 30}}),
+            "parsed": TranscriptAnalysis(summary="Summary.", bullet_points=["One", "Two"], language_code="EN"),
+            "parsing_error": None
+        }
+        instance.with_structured_output.return_value = structured
+        mock.return_value = instance
+        
+        result = OpenAISummarizer().analyze("Some transcript text.", focus_points="methodology", num_points=2)
+        
+        assert structured.invoke.call_count == 1
+        assert instance.invoke.call_count == 0
+        assert result["summary"] == "Summary."
+        assert result["bullet_points"] == ["One", "Two"]
+        assert result["language_code"] == "en"
+        assert result["usage"]["prompt_tokens"] == 120
+
+def test_analyze_parsing_error():
+    """Test that an unparseable structured response raises ValueError"""
+    with patch('src.llm.usage.get_chat_client') as mock:
+        instance = Mock()
+        structured = Mock()
+        structured.invoke.return_value = {"raw": Mock(), "parsed": None, "parsing_error": "invalid json"}
+        instance.with_structured_output.return_value = structured
+        mock.return_value = instance
+        
+        with pytest.raises(ValueError, match="Failed to parse structured response"):
+            OpenAISummarizer().analyze("Some transcript text.")
+
+def test_concurrent_chunks_share_budget():
+    """Test that chunks summarized concurrently together stay within the token budget"""
+    import time
+    from src.llm.usage import UsageTracker
+    prompts = []
+    
+    def invoke(prompt):
+        prompts.append(prompt)
+        time.sleep(0.05)
+        tokens = len(prompt) // 4
+        return Mock(content="Short summary.", response_metadata={"token_usage": {"prompt_tokens": tokens, "completion_tokens": 5}})
+    
+    with patch('src.llm.usage.get_chat_client') as mock:
+        instance = Mock()
+        instance.invoke.side_effect = invoke
+        mock.return_value = instance
+        
+        tracker = UsageTracker(token_budget=4000)
+        summarizer = OpenAISummarizer(max_input_tokens=500, chunk_tokens=200, max_concurrency=4, usage_tracker=tracker)
+        chunks = [" ".join(f"Sentence {i} of chunk {c}." for i in range(300)) for c in range(4)]
+        with pytest.warns(UserWarning):
+            summarizer._map_chunks(chunks, None)
+        
+        assert len(prompts) == 4
+        assert sum(len(prompt) // 4 + 1 for prompt in prompts) <= 4000
+        assert tracker.reserved_tokens == 0
+
+def test_large_budget_keeps_primary_model_for_chunks():
+    """Test that reserving budget shares for chunk calls does not switch them to the fallback model"""
+    from src.llm.usage import UsageTracker
+    clients = {}
+    
+    def client_for(model, *args, **kwargs):
+        if model not in clients:
+            clients[model] = Mock()
+            clients[model].invoke.return_value = Mock(content="Short summary.", response_metadata={})
+        return clients[model]
+    
+    with patch('src.llm.usage.get_chat_client', side_effect=client_for):
+        tracker = UsageTracker(token_budget=1_000_000)
+        summarizer = OpenAISummarizer(model="gpt-4o", fallback_model="gpt-4o-mini", usage_tracker=tracker,
+                                      max_input_tokens=500, chunk_tokens=200)
+        text = " ".join(f"Sentence number {i} explains the method." for i in range(300))
+        result = summarizer.summarize(text)
+        
+        assert result["metadata"]["preflight"]["strategy"] == "chunked"
+        assert result["model"] == "gpt-4o"
+        assert clients["gpt-4o"].invoke.call_count == result["metadata"]["preflight"]["num_chunks"] + 1
+        assert "gpt-4o-mini" not in clients
+        assert {call["model"] for call in tracker.calls} == {"gpt-4o"}
+
+def test_prepare_sizes_for_fallback_model():
+    """Test that requests are sized for the fallback model once the budget switches to it"""
+    from src.llm.usage import UsageTracker
+    with patch('src.llm.usage.get_chat_client'):
+        tracker = UsageTracker(token_budget=10_000_000, downgrade_ratio=1.0)
+        tracker.record("OpenAISummarizer", "gpt-4o-mini", {"prompt_tokens": 1, "completion_tokens": 0, "latency_seconds": 0.0})
+        summarizer = OpenAISummarizer(model="gpt-4o-mini", fallback_model="gpt-3.5-turbo", usage_tracker=tracker)
+        text = " ".join(f"word{i}" for i in range(20_000))
+        
+        _, model = summarizer._select_client()
+        _, estimate = summarizer._prepare("Summarize: ", text, 500, model)
+        assert model == "gpt-3.5-turbo"
+        assert estimate["strategy"] == "chunked"
+
+def test_budget_prefers_fallback_before_truncating():
+    """Test that an over-budget text is trimmed and sent to the fallback model before it is truncated"""
+    from src.llm.tokens import count_tokens
+    from src.llm.usage import UsageTracker
+    clients = {}
+    
+    def client_for(model, *args, **kwargs):
+        if model not in clients:
+            clients[model] = Mock()
+            clients[model].invoke.return_value = Mock(content="Summary.", response_metadata={})
+        return clients[model]
+    
+    with patch('src.llm.usage.get_chat_client', side_effect=client_for):
+        tracker = UsageTracker(token_budget=300, downgrade_ratio=0.0)
+        summarizer = OpenAISummarizer(model="gpt-4o-mini", fallback_model="gpt-3.5-turbo", usage_tracker=tracker)
+        
+        # Fits once the repetition loop is removed, so nothing is truncated
+        text = "[00:01] " + "thank you " * 200 + "The method works."
+        _, _, model, _ = summarizer._invoke("Summarize: ", text, 50)
+        assert model == "gpt-3.5-turbo"
+        assert clients["gpt-3.5-turbo"].invoke.call_args[0][0] == "Summarize: thank you thank you The method works."
+        
+        # Still too long after trimming: cut to the budget with the fallback model's tokenizer
+        text = " ".join(f"Sentence {i}." for i in range(1000))
+        with pytest.warns(UserWarning, match="truncated"):
+            _, _, model, truncated = summarizer._invoke("Summarize: ", text, 50)
+        assert model == "gpt-3.5-turbo" and truncated
+        sent = clients["gpt-3.5-turbo"].invoke.call_args[0][0]
+        assert count_tokens(sent, "gpt-3.5-turbo") + 50 <= 300
+        assert "gpt-4o-mini" not in clients or not clients["gpt-4o-mini"].invoke.called
+
+def test_cached_notes_keyed_on_serving_model():
+    """Test that notes produced by the fallback model are cached under the fallback model"""
+    from src.llm.tokens import split_into_chunks, trim_filler
+    from src.llm.usage import UsageTracker
+    from src.summarizer.notes_cache import NotesCache
+    
+    with patch('src.llm.usage.get_chat_client') as mock:
+        instance = Mock()
+        instance.invoke.return_value = Mock(content="Short summary.", response_metadata={})
+        mock.return_value = instance
+        
+        tracker = UsageTracker(token_budget=10_000_000, downgrade_ratio=1.0)
+        tracker.record("OpenAISummarizer", "gpt-4o-mini", {"prompt_tokens": 1, "completion_tokens": 0, "latency_seconds": 0.0})
+        cache = NotesCache(":memory:")
+        summarizer = OpenAISummarizer(model="gpt-4o-mini", fallback_model="gpt-3.5-turbo", usage_tracker=tracker,
+                                      max_input_tokens=500, chunk_tokens=200, notes_cache=cache, notes_min_tokens=100)
+        text = " ".join(f"Sentence number {i} explains the method." for i in range(300))
+        _, stats, _ = summarizer._cached_notes(text, "gpt-3.5-turbo")
+        
+        chunks = split_into_chunks(trim_filler(text), "gpt-3.5-turbo", 200)
+        assert len(cache.lookup(chunks, "gpt-3.5-turbo")) == stats["chunks"]
+        assert cache.lookup(chunks, "gpt-4o-mini") == {}
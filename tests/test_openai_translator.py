@@ -51,23 +51,25 @@ class TestOpenAITranslator:
 
 def test_translate_with_different_model():
     """Test translation with a different model"""
-    with patch('src.translator.openai_translator.ChatOpenAI') as mock:
+    with patch('src.llm.usage.get_chat_client') as mock:
         instance = Mock()
-        instance.predict.return_value = "Translated text"
+        instance.invoke.return_value = Mock(content="Translated text")
         mock.return_value = instance
         
         translator = OpenAITranslator(model="gpt-3.5-turbo", temperature=0.2)
         result = translator.translate("Hello world", "de")
         
         # Verify the model was initialized correctly
-        mock.assert_called_once_with(model_name="gpt-3.5-turbo", temperature=0.2)
+        mock.assert_called_once_with("gpt-3.5-turbo", 0.2)
         assert result["model"] == "gpt-3.5-turbo"
+        assert result["translated_text"] == "Translated text"
+        assert "latency_seconds" in result["usage"]
 
 def test_translate_error_handling():
     """Test error handling during translation"""
-    with patch('src.translator.openai_translator.ChatOpenAI') as mock:
+    with patch('src.llm.usage.get_chat_client') as mock:
         instance = Mock()
-        instance.predict.side_effect = Exception("API Error")
+        instance.invoke.side_effect = Exception("API Error")
         mock.return_value = instance
         
         translator = OpenAITranslator()
@@ -0,0 +1,90 @@
+import os
+import pytest
+from src import scheduler as scheduler_module
+from src.instrumentation import Instrumentation
+from src.scheduler import ResourceScheduler
+
+def _job_metrics(transcription_seconds, llm_seconds):
+    metrics = Instrumentation(job_id="video")
+    metrics.stages = [
+        {"name": "transcription", "wall_seconds": transcription_seconds, "real_time_factor": 0.5},
+        {"name": "analysis", "wall_seconds": llm_seconds}
+    ]
+    return metrics
+
+def _record_threads_job(item, plan):
+    """Job run in a worker process by test_run_processes_every_item"""
+    metrics = Instrumentation(job_id=str(item))
+    with metrics.stage("transcription") as stage:
+        stage["threads"] = plan["threads_per_process"]
+    return metrics, 100.0, os.getpid()
+
+def _failing_job(item, plan):
+    """Job run in a worker process by test_run_skips_failed_jobs; fails for item 2"""
+    if item == 2:
+        raise ValueError("video could not be processed")
+    return _record_threads_job(item, plan)
+
+@pytest.fixture
+def machine(monkeypatch):
+    """An idle machine with 8 cores and 16 GB of available memory"""
+    resources = {"cores": 8, "memory": 16384.0, "load": 0.0}
+    monkeypatch.setattr(scheduler_module, "available_cores", lambda: resources["cores"])
+    monkeypatch.setattr(scheduler_module, "available_memory_mb", lambda: resources["memory"])
+    monkeypatch.setattr(scheduler_module, "system_load", lambda: resources["load"])
+    return resources
+
+def test_plan_is_bounded_by_cores(machine):
+    """Test that an idle machine is split into workers with the minimum thread count"""
+    plan = ResourceScheduler(max_llm_concurrency=20).plan(pending_jobs=10)
+    assert plan["processes"] == 4
+    assert plan["threads_per_process"] == 2
+    assert plan["llm_concurrency"] == 5
+
+def test_plan_is_bounded_by_memory(machine):
+    """Test that the measured worker footprint limits the number of workers"""
+    scheduler = ResourceScheduler(memory_reserve_mb=1024.0)
+    scheduler.observe(_job_metrics(10.0, 0.0), peak_memory_mb=6000.0)
+    plan = scheduler.plan(pending_jobs=10)
+    assert plan["processes"] == 2
+    assert plan["threads_per_process"] == 4
+
+def test_plan_adapts_to_load(machine):
+    """Test that cores busy with other work are left alone"""
+    scheduler = ResourceScheduler()
+    machine["load"] = 4.0
+    plan = scheduler.plan(pending_jobs=10)
+    assert plan["processes"] == 2
+    assert plan["available_cores"] == 4
+
+def test_plan_overlaps_llm_waits(machine):
+    """Test that more jobs run at once when half of each job waits on the LLM"""
+    scheduler = ResourceScheduler()
+    scheduler.observe(_job_metrics(10.0, 10.0), peak_memory_mb=1000.0)
+    plan = scheduler.plan(pending_jobs=10)
+    assert plan["processes"] == 8
+    assert plan["threads_per_process"] == 2
+    assert scheduler.real_time_factor == 0.5
+
+def test_plan_never_exceeds_pending_jobs(machine):
+    """Test that a single job gets all the cores"""
+    plan = ResourceScheduler().plan(pending_jobs=1)
+    assert plan["processes"] == 1
+    assert plan["threads_per_process"] == 8
+
+def test_run_processes_every_item():
+    """Test that every item is processed once in a worker process"""
+    scheduler = ResourceScheduler(max_processes=2)
+    jobs = list(scheduler.run(iter(range(5)), _record_threads_job))
+    assert sorted(int(job.job_id) for job in jobs) == list(range(5))
+    assert scheduler.completed_jobs == 5
+    assert scheduler.memory_per_process_mb == 100.0
+    assert all(job.stages[0]["threads"] >= 1 for job in jobs)
+
+def test_run_skips_failed_jobs():
+    """Test that a failing job is reported without aborting the other jobs"""
+    scheduler = ResourceScheduler(max_processes=2)
+    jobs = list(scheduler.run(iter(range(5)), _failing_job))
+    assert sorted(int(job.job_id) for job in jobs) == [0, 1, 3, 4]
+    assert scheduler.failed_jobs == 1
+    assert scheduler.completed_jobs == 4
@@ -0,0 +1,51 @@
+import json
+import pytest
+from config.settings import DEFAULT_DATA_DIR, load_settings
+
+def test_defaults():
+    """Test that directories default to absolute subdirectories of the data directory"""
+    settings = load_settings(environ={})
+    assert settings.data_dir == DEFAULT_DATA_DIR.resolve()
+    assert settings.cache_dir == settings.data_dir / "cache"
+    assert settings.video_dir.is_absolute()
+    assert settings.torch_threads is None
+
+def test_settings_file(tmp_path):
+    """Test that a settings file is read and its relative directories resolved against it"""
+    path = tmp_path / "textrizer.toml"
+    path.write_text('data_dir = "data"\ncache_dir = "/mnt/ssd/cache"\nwhisper_batch_size = 16\n')
+    settings = load_settings(path, environ={})
+    assert settings.data_dir == tmp_path / "data"
+    assert settings.audio_dir == tmp_path / "data" / "audio"
+    assert str(settings.cache_dir) == "/mnt/ssd/cache"
+    assert settings.whisper_batch_size == 16
+
+def test_environment_overrides_file(tmp_path):
+    """Test that environment variables take precedence over the settings file"""
+    path = tmp_path / "textrizer.json"
+    path.write_text(json.dumps({"llm_backend": "local", "torch_threads": 2}))
+    settings = load_settings(environ={
+        "TEXTRIZER_SETTINGS_FILE": str(path),
+        "TEXTRIZER_TORCH_THREADS": "8",
+        "TEXTRIZER_CACHE_DIR": str(tmp_path / "cache")
+    })
+    assert settings.llm_backend == "local"
+    assert settings.torch_threads == 8
+    assert settings.cache_dir == tmp_path / "cache"
+
+@pytest.mark.parametrize("values", [
+    {"TEXTRIZER_WHISPER_BATCH_SIZE": "0"},
+    {"TEXTRIZER_LLM_BACKEND": "anthropic"},
+    {"TEXTRIZER_TORCH_THREADS": "many"}
+])
+def test_invalid_settings(values):
+    """Test that invalid settings are rejected"""
+    with pytest.raises(ValueError):
+        load_settings(environ=values)
+
+def test_unknown_setting_in_file(tmp_path):
+    """Test that misspelled settings in the file are rejected"""
+    path = tmp_path / "textrizer.toml"
+    path.write_text("whisper_batchsize = 16\n")
+    with pytest.raises(ValueError):
+        load_settings(path, environ={})
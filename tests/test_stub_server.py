@@ -0,0 +1,63 @@
+import json
+import urllib.request
+import pytest
+from src.llm.stub_server import StubLLMServer
+
+@pytest.fixture(scope="module")
+def server():
+    with StubLLMServer() as server:
+        yield server
+
+class TestStubLLMServer:
+    def _post(self, server, body):
+        request = urllib.request.Request(
+            server.base_url + "/chat/completions",
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    
+    def test_language_detection(self, server):
+        """Test that language detection prompts are answered with a language code"""
+        body = {"model": "stub", "messages": [{"role": "user", "content": "You are a language detection expert.\n\nText to analyze: Hola"}]}
+        response = self._post(server, body)
+        assert response["choices"][0]["message"]["content"] == "en"
+        assert response["usage"]["total_tokens"] > 0
+    
+    def test_deterministic(self, server):
+        """Test that identical requests get identical responses"""
+        body = {"model": "stub", "messages": [{"role": "user", "content": "Summarize.\n\nText to summarize: One. Two. Three."}]}
+        assert self._post(server, body) == self._post(server, body)
+    
+    def test_translation_echo(self, server):
+        """Test that translation prompts echo the text"""
+        body = {"model": "stub", "messages": [{"role": "user", "content": "Translate to es.\n\nText to translate: Hello world"}]}
+        assert self._post(server, body)["choices"][0]["message"]["content"] == "Hello world"
+    
+    def test_json_schema(self, server):
+        """Test that JSON schema response formats get conforming content"""
+        schema = {
+            "type": "object",
+            "properties": {
+                "summary": {"type": "string"},
+                "bullet_points": {"type": "array", "items": {"type": "string"}},
+                "language_code": {"type": "string"}
+            }
+        }
+        body = {
+            "model": "stub",
+            "messages": [{"role": "user", "content": "Analyze.\n\nText to analyze: First point. Second point."}],
+            "response_format": {"type": "json_schema", "json_schema": {"name": "analysis", "schema": schema}}
+        }
+        content = json.loads(self._post(server, body)["choices"][0]["message"]["content"])
+        assert content["language_code"] == "en"
+        assert content["bullet_points"] == ["First point.", "Second point."]
+        assert isinstance(content["summary"], str)
+    
+    def test_requests_recorded(self, server):
+        """Test that received requests are kept for inspection"""
+        server.requests.clear()
+        body = {"model": "stub", "messages": [{"role": "user", "content": "Translate to es.\n\nText to translate: Hi"}]}
+        self._post(server, body)
+        assert server.requests == [body]
@@ -0,0 +1,85 @@
+import json
+import pytest
+from src.transcriber.transcript_artifact import TranscriptArtifact, format_srt, write_transcript_artifact
+
+@pytest.fixture
+def transcription_result():
+    return {
+        "text": "Hello world. Ça va ? Goodbye.",
+        "audio_seconds": 75.5,
+        "segments": [
+            {"start": 0.0, "end": 30.0, "text": "Hello world.", "token_logprobs": [-0.5, -0.25]},
+            {"start": 30.0, "end": 60.0, "text": "Ça va ?", "token_logprobs": [-1.0]},
+            {"start": 60.0, "end": 75.5, "text": "Goodbye.", "token_logprobs": []}
+        ]
+    }
+
+@pytest.fixture
+def artifact(transcription_result, tmp_path):
+    path = write_transcript_artifact(tmp_path / "transcription.bin", transcription_result, "fr")
+    with TranscriptArtifact(path) as artifact:
+        yield artifact
+
+def test_round_trip(artifact, transcription_result):
+    """Test that segments, log-probabilities and language survive the round trip"""
+    assert artifact.language == "fr"
+    assert len(artifact) == 3
+    for index, expected in enumerate(transcription_result["segments"]):
+        segment = artifact.segment(index)
+        assert segment["start"] == expected["start"]
+        assert segment["end"] == expected["end"]
+        assert segment["text"] == expected["text"]
+        assert segment["token_logprobs"] == expected["token_logprobs"]
+    assert artifact.segment(0)["avg_logprob"] == pytest.approx(-0.375)
+    assert artifact.segment(2)["avg_logprob"] is None
+
+def test_time_range_query(artifact):
+    """Test that range queries return exactly the overlapping segments"""
+    assert [segment["text"] for segment in artifact.segments_between(25.0, 35.0)] == ["Hello world.", "Ça va ?"]
+    assert list(artifact.find(30.0, 60.0)) == [1]
+    assert list(artifact.find(70.0, 100.0)) == [2]
+    assert list(artifact.find(80.0, 90.0)) == []
+
+def test_exporters(artifact, transcription_result):
+    """Test the txt, SRT and JSON exports"""
+    assert artifact.to_txt() == transcription_result["text"]
+    assert artifact.to_srt().splitlines()[:3] == ["1", "00:00:00,000 --> 00:00:30,000", "Hello world."]
+    assert "00:01:00,000 --> 00:01:15,500" in artifact.to_srt()
+    exported = json.loads(artifact.to_json())
+    assert exported["language"] == "fr"
+    assert [segment["text"] for segment in exported["segments"]] == ["Hello world.", "Ça va ?", "Goodbye."]
+
+def test_result_without_segments(tmp_path):
+    """Test that results without timed segments are stored as one segment spanning the audio"""
+    path = write_transcript_artifact(tmp_path / "transcription.bin", {"text": "Hello", "audio_seconds": 12.0}, "en")
+    with TranscriptArtifact(path) as artifact:
+        assert artifact.segments_between(0.0, 1.0)[0] == {
+            "start": 0.0, "end": 12.0, "text": "Hello", "token_logprobs": [], "avg_logprob": None
+        }
+
+def test_segments_without_token_logprobs(tmp_path):
+    """Test that long-form segments, which report no token log-probabilities, are stored with none"""
+    result = {"text": "A B", "segments": [{"start": 0.0, "end": 4.0, "text": "A"}, {"start": 4.0, "end": 9.0, "text": "B"}]}
+    with TranscriptArtifact(write_transcript_artifact(tmp_path / "long_form.bin", result, "en")) as artifact:
+        assert [segment["token_logprobs"] for segment in artifact.segments_between(0.0, 9.0)] == [[], []]
+        assert artifact.to_srt() == format_srt(result["segments"])
+
+def test_segments_out_of_order(tmp_path):
+    """Test that segments whose starts or ends go back in time are rejected, since find() bisects both"""
+    nested = {"text": "", "segments": [
+        {"start": 0.0, "end": 30.0, "text": "Long"},
+        {"start": 10.0, "end": 20.0, "text": "Nested"}
+    ]}
+    with pytest.raises(ValueError):
+        write_transcript_artifact(tmp_path / "nested.bin", nested, "en")
+    
+    backwards = {"text": "", "segments": [{"start": 5.0, "end": 6.0, "text": "B"}, {"start": 0.0, "end": 7.0, "text": "A"}]}
+    with pytest.raises(ValueError):
+        write_transcript_artifact(tmp_path / "backwards.bin", backwards, "en")
+
+def test_invalid_file(tmp_path):
+    """Test that files that are not artifacts are rejected"""
+    path = tmp_path / "transcription.txt"
+    path.write_text("Hello world, this is not a transcript artifact")
+    with pytest.raises(ValueError):
+        TranscriptArtifact(path)
@@ -0,0 +1,193 @@
+import re
+import pytest
+from unittest.mock import Mock, patch
+from src.translator.base_translator import BaseTranslator
+from src.translator.openai_translator import BatchTranslation, NumberedTranslation, OpenAITranslator
+from src.translator.translation_memory import (
+    MemoryTranslator,
+    TranslationMemory,
+    normalize_segment,
+    segment_sentences,
+)
+
+class FakeTranslator(BaseTranslator):
+    """Translator that upper-cases text and records every request"""
+    
+    def __init__(self):
+        self.requests = []
+    
+    def translate(self, text, target_language, source_language=None):
+        self.requests.append(text)
+        return {
+            "translated_text": text.upper(),
+            "target_language": target_language,
+            "model": "fake",
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2, "latency_seconds": 0.0}
+        }
+    
+    def batch_translate(self, texts, target_language, source_language=None):
+        return [self.translate(text, target_language, source_language) for text in texts]
+
+class TestSegmentation:
+    def test_segment_sentences_roundtrip(self):
+        """Test that segments and separators rebuild the original text"""
+        text = "Hello there. How are you?\n\nFine!  Thanks"
+        segments = segment_sentences(text)
+        assert [sentence for sentence, _ in segments] == ["Hello there.", "How are you?", "Fine!", "Thanks"]
+        assert "".join(sentence + separator for sentence, separator in segments) == text
+    
+    def test_segment_cjk_without_spaces(self):
+        """Test that CJK full stops end a sentence even without a following space"""
+        text = "你好。今天天气很好！你呢？"
+        segments = segment_sentences(text)
+        assert [sentence for sentence, _ in segments] == ["你好。", "今天天气很好！", "你呢？"]
+        assert "".join(sentence + separator for sentence, separator in segments) == text
+    
+    def test_normalize_segment(self):
+        """Test case, punctuation and whitespace insensitive normalization"""
+        assert normalize_segment("Welcome  back, everyone!") == normalize_segment("welcome back everyone!")
+    
+    def test_normalize_keeps_sentence_end(self):
+        """Test that questions and statements do not share a key"""
+        assert normalize_segment("You are ready?") != normalize_segment("You are ready.")
+
+class TestMemoryTranslator:
+    @pytest.fixture
+    def memory(self, tmp_path):
+        memory = TranslationMemory(str(tmp_path / "memory.sqlite3"))
+        yield memory
+        memory.close()
+    
+    def test_only_unseen_segments_sent(self, memory):
+        """Test that stored sentences are reused and only new ones are translated"""
+        fake = FakeTranslator()
+        translator = MemoryTranslator(fake, memory)
+        
+        first = translator.translate("Welcome back. Today we talk about bees.", "es")
+        assert first["translated_text"] == "WELCOME BACK. TODAY WE TALK ABOUT BEES."
+        assert first["metadata"]["memory_hits"] == 0
+        assert len(memory) == 2
+        
+        fake.requests.clear()
+        second = translator.translate("Welcome back. Today we talk about ants.", "es")
+        assert fake.requests == ["Today we talk about ants."]
+        assert second["translated_text"] == "WELCOME BACK. TODAY WE TALK ABOUT ANTS."
+        assert second["metadata"]["memory_hits"] == 1
+    
+    def test_normalized_lookup(self, memory):
+        """Test that sentences differing only in case and punctuation are reused"""
+        fake = FakeTranslator()
+        translator = MemoryTranslator(fake, memory)
+        translator.translate("Welcome back, everyone!", "es")
+        
+        fake.requests.clear()
+        result = translator.translate("welcome back everyone!", "es")
+        assert fake.requests == []
+        assert result["translated_text"] == "WELCOME BACK, EVERYONE!"
+    
+    def test_languages_are_separate(self, memory):
+        """Test that translations are stored per target language"""
+        fake = FakeTranslator()
+        translator = MemoryTranslator(fake, memory)
+        translator.translate("Hello.", "es")
+        
+        fake.requests.clear()
+        translator.translate("Hello.", "fr")
+        assert fake.requests == ["Hello."]
+    
+    def test_source_languages_and_models_are_separate(self, memory):
+        """Test that translations are only reused for the same source language and model"""
+        memory.store([("Gift.", "GESCHENK.")], "es", source_language="en", model="gpt-4o-mini")
+        
+        assert memory.lookup(["Gift."], "es", source_language="en", model="gpt-4o-mini") == {"Gift.": "GESCHENK."}
+        assert memory.lookup(["Gift."], "es", source_language="de", model="gpt-4o-mini") == {}
+        assert memory.lookup(["Gift."], "es", source_language="en", model="facebook/m2m100_418M") == {}
+    
+    def test_first_translation_kept(self, memory):
+        """Test that storing a sentence again keeps its first translation unless a refresh is requested"""
+        memory.store([("Hello.", "Hola.")], "es")
+        memory.store([("Hello.", "Garbage.")], "es")
+        assert memory.lookup(["Hello."], "es") == {"Hello.": "Hola."}
+        
+        fake = FakeTranslator()
+        result = MemoryTranslator(fake, memory, refresh=True).translate("Hello.", "es")
+        assert fake.requests == ["Hello."]
+        assert result["translated_text"] == "HELLO."
+        assert memory.lookup(["Hello."], "es") == {"Hello.": "HELLO."}
+    
+    def test_runs_keep_order(self, memory):
+        """Test that cached and new segments are stitched back in order"""
+        memory.store([("Middle sentence.", "MIDDLE!")], "es")
+        fake = FakeTranslator()
+        
+        result = MemoryTranslator(fake, memory).translate("First one. Middle sentence. Last one.", "es")
+        assert fake.requests == ["First one.", "Last one."]
+        assert result["translated_text"] == "FIRST ONE. MIDDLE! LAST ONE."
+    
+    def test_sentences_translated_individually(self, memory):
+        """Test that stored pairs come from per-sentence translations, never from splitting a joint one"""
+        fake = FakeTranslator()
+        MemoryTranslator(fake, memory).translate("One. Two. One.", "es")
+        
+        assert fake.requests == ["One.", "Two."]
+        assert memory.lookup(["One.", "Two."], "es") == {"One.": "ONE.", "Two.": "TWO."}
+    
+    def test_cold_translation_request_count(self, memory):
+        """Test that unseen sentences are packed into a few numbered requests instead of one request each"""
+        structured = Mock()
+        
+        def invoke(prompt):
+            numbered = re.findall(r"^\[(\d+)\] (.*)$", prompt, re.MULTILINE)
+            translations = [NumberedTranslation(index=int(number), translation=text.upper()) for number, text in numbered]
+            raw = Mock(response_metadata={"token_usage": {"prompt_tokens": 10, "completion_tokens": 10}})
+            return {"raw": raw, "parsed": BatchTranslation(translations=translations), "parsing_error": None}
+        
+        structured.invoke.side_effect = invoke
+        with patch('src.llm.usage.get_chat_client') as mock:
+            mock.return_value.with_structured_output.return_value = structured
+            translator = MemoryTranslator(OpenAITranslator(batch_tokens=200), memory)
+            sentences = [f"Sentence number {i} is about bees." for i in range(300)]
+            result = translator.translate(" ".join(sentences), "es")
+        
+        # 300 sentences of ~8 tokens fit in 12 requests of at most 200 tokens
+        assert structured.invoke.call_count == 12
+        assert mock.return_value.invoke.call_count == 0
+        assert result["metadata"]["requests"] == 12
+        assert result["usage"]["calls"] == 12
+        assert result["translated_text"] == " ".join(sentences).upper()
+        assert memory.lookup(sentences[:1], "es", model="gpt-4o-mini") == {sentences[0]: sentences[0].upper()}
+    
+    def test_missing_numbers_translated_individually(self, memory):
+        """Test that sentences left out of a batch response are translated on their own"""
+        structured = Mock()
+        translations = [NumberedTranslation(index=1, translation="UNO."), NumberedTranslation(index=3, translation="TRES.")]
+        structured.invoke.return_value = {"raw": Mock(), "parsed": BatchTranslation(translations=translations),
+                                          "parsing_error": None}
+        with patch('src.llm.usage.get_chat_client') as mock:
+            mock.return_value.with_structured_output.return_value = structured
+            mock.return_value.invoke.return_value = Mock(content="DOS.")
+            result = MemoryTranslator(OpenAITranslator(), memory).translate("One. Two. Three.", "es")
+        
+        assert result["translated_text"] == "UNO. DOS. TRES."
+        assert mock.return_value.invoke.call_count == 1
+        assert result["metadata"]["requests"] == 2
+    
+    def test_max_concurrency_reaches_wrapped_translator(self, memory):
+        """Test that the request concurrency is read from and applied to the wrapped translator"""
+        wrapped = OpenAITranslator(max_concurrency=4)
+        translator = MemoryTranslator(wrapped, memory)
+        translator.max_concurrency = 2
+        assert wrapped.max_concurrency == 2
+        assert translator.max_concurrency == 2
+        assert MemoryTranslator(FakeTranslator(), memory).max_concurrency is None
+    
+    def test_persistence(self, tmp_path):
+        """Test that the memory survives reopening the database"""
+        path = str(tmp_path / "memory.sqlite3")
+        memory = TranslationMemory(path)
+        memory.store([("Hello.", "Hola.")], "es")
+        memory.close()
+        
+        reopened = TranslationMemory(path)
+        assert reopened.lookup(["Hello."], "es") == {"Hello.": "Hola."}
+        reopened.close()
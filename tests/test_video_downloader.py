@@ -3,6 +3,8 @@ import os
 from pathlib import Path
 from src.video_downloader import VideoDownloader, YouTubeDLDownloader
 import subprocess
+import threading
+from unittest.mock import patch, MagicMock
 
 class TestYouTubeDLDownloader:
     @pytest.fixture
@@ -142,4 +144,113 @@ class TestYouTubeDLDownloader:
         finally:
             # Cleanup only the test file, not the directory
             if os.path.exists(audio_path):
-                os.remove(audio_path)
\ No newline at end of file
+                os.remove(audio_path)
+
+
+def _mock_youtube_dl(info):
+    """Patch youtube_dl.YoutubeDL so extract_info returns the given info dict"""
+    ydl = MagicMock()
+    ydl.__enter__.return_value = ydl
+    ydl.extract_info.return_value = info
+    return patch('src.video_downloader.youtube_dl.YoutubeDL', return_value=ydl)
+
+def test_iter_playlist_entries_single_video():
+    """A plain video URL yields itself"""
+    with _mock_youtube_dl({'_type': 'video', 'webpage_url': 'https://youtu.be/abc'}):
+        entries = list(YouTubeDLDownloader().iter_playlist_entries('https://youtu.be/abc'))
+    assert entries == ['https://youtu.be/abc']
+
+def test_iter_playlist_entries_follows_redirects():
+    """A redirect URL is resolved before it is classified, so a playlist behind it is expanded"""
+    with _mock_youtube_dl(None) as youtube_dl_class:
+        ydl = youtube_dl_class.return_value
+        ydl.extract_info.side_effect = [
+            {'_type': 'url', 'url': 'https://www.youtube.com/playlist?list=x', 'ie_key': 'YoutubePlaylist'},
+            {'_type': 'playlist', 'entries': iter([{'url': 'video0'}, {'url': 'video1'}])},
+        ]
+        entries = list(YouTubeDLDownloader().iter_playlist_entries('https://youtu.be/abc?list=x'))
+    
+    assert entries == ['video0', 'video1']
+    assert ydl.extract_info.call_args.args[0] == 'https://www.youtube.com/playlist?list=x'
+    assert ydl.extract_info.call_args.kwargs['ie_key'] == 'YoutubePlaylist'
+
+def test_download_names_files_by_title_and_id(tmp_path):
+    """Videos sharing a title get distinct files because the id is part of the name"""
+    with _mock_youtube_dl({'title': 'Talk', 'id': 'abc', 'ext': 'mp4'}) as youtube_dl_class:
+        ydl = youtube_dl_class.return_value
+        ydl.prepare_filename.return_value = str(tmp_path / 'Talk [abc].mp4')
+        (tmp_path / 'Talk [abc].mp4').write_bytes(b'video')
+        path = YouTubeDLDownloader().download('https://youtu.be/abc', output_path=str(tmp_path))
+    
+    assert path == str(tmp_path / 'Talk [abc].mp4')
+    assert youtube_dl_class.call_args.args[0]['outtmpl'] == str(tmp_path / '%(title)s [%(id)s].%(ext)s')
+
+def test_iter_playlist_entries_is_lazy():
+    """Playlist entries are consumed from the extractor generator one at a time"""
+    consumed = []
+    
+    def entries():
+        for i in range(3):
+            consumed.append(i)
+            yield {'_type': 'url', 'url': f'video{i}', 'ie_key': 'Youtube'}
+    
+    with _mock_youtube_dl({'_type': 'playlist', 'entries': entries()}):
+        iterator = YouTubeDLDownloader().iter_playlist_entries('https://youtube.com/playlist?list=x')
+        assert next(iterator) == 'video0'
+        assert consumed == [0]
+        assert list(iterator) == ['video1', 'video2']
+
+def test_download_playlist_bounded_concurrency():
+    """No more than max_workers downloads run at once and every entry is yielded"""
+    downloader = YouTubeDLDownloader()
+    lock = threading.Lock()
+    state = {'active': 0, 'peak': 0}
+    
+    def fake_download(url, output_path, rate_limit=None):
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        threading.Event().wait(0.01)
+        with lock:
+            state['active'] -= 1
+        assert rate_limit == 500
+        return f'{output_path}/{url}.mp4'
+    
+    urls = [f'video{i}' for i in range(8)]
+    with patch.object(downloader, 'iter_playlist_entries', return_value=iter(urls)), \
+         patch.object(downloader, 'download', side_effect=fake_download):
+        paths = list(downloader.download_playlist('playlist', output_path='out', max_workers=2, rate_limit=1000))
+    
+    assert sorted(paths) == sorted(f'out/{url}.mp4' for url in urls)
+    assert state['peak'] <= 2
+
+def test_download_playlist_ignore_errors():
+    """Failed entries are skipped when ignore_errors is set"""
+    downloader = YouTubeDLDownloader()
+    
+    def fake_download(url, output_path, rate_limit=None):
+        if url == 'bad':
+            raise ValueError("Error downloading video")
+        return url
+    
+    with patch.object(downloader, 'iter_playlist_entries', return_value=iter(['good', 'bad'])), \
+         patch.object(downloader, 'download', side_effect=fake_download):
+        assert list(downloader.download_playlist('playlist', ignore_errors=True)) == ['good']
+        
+    with patch.object(downloader, 'iter_playlist_entries', return_value=iter(['bad'])), \
+         patch.object(downloader, 'download', side_effect=fake_download):
+        with pytest.raises(ValueError):
+            list(downloader.download_playlist('playlist'))
+
+def test_download_playlist_nothing_downloaded():
+    """A single failing video raises even with ignore_errors, and so does an empty playlist"""
+    downloader = YouTubeDLDownloader()
+    
+    with patch.object(downloader, 'iter_playlist_entries', return_value=iter(['https://youtu.be/abc'])), \
+         patch.object(downloader, 'download', side_effect=ValueError("Error downloading video")):
+        with pytest.raises(ValueError, match="No video could be downloaded"):
+            list(downloader.download_playlist('https://youtu.be/abc', ignore_errors=True))
+    
+    with patch.object(downloader, 'iter_playlist_entries', return_value=iter([])):
+        with pytest.raises(ValueError, match="No videos found"):
+            list(downloader.download_playlist('playlist'))
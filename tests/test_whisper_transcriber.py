@@ -1,13 +1,32 @@
 import pytest
+import soundfile as sf
+import torch
 from pathlib import Path
+from benchmarks.fixtures import make_synthetic_audio, save_tiny_whisper
+from src.audio_extractor import plan_segments
+from src.transcriber.audio_utils import load_audio
 from src.transcriber.whisper_transcriber import WhisperTranscriber
 from config.config import AUDIO_DOWNLOAD_TEST_PATH
 
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """Tiny randomly initialized Whisper model saved locally: fast to load, transcripts are not meaningful"""
+    return save_tiny_whisper(tmp_path_factory.mktemp("tiny-whisper"))
+
+def write_synthetic_audio(path, seconds, seed=0):
+    """Write a 16 kHz speech-like test signal and return its path"""
+    sf.write(str(path), make_synthetic_audio(seconds, sample_rate=16000, seed=seed), 16000)
+    return path
+
 class TestWhisperTranscriber:
     @pytest.fixture
     def transcriber(self):
         return WhisperTranscriber(model_name="openai/whisper-small")
     
+    @pytest.fixture
+    def tiny_transcriber(self, tiny_model):
+        return WhisperTranscriber(model_name=tiny_model, decoding="greedy")
+    
     def test_init_default(self, transcriber):
         """Test default initialization"""
         assert transcriber.model_name == "openai/whisper-small"
@@ -36,4 +55,126 @@ class TestWhisperTranscriber:
 
         assert isinstance(result, dict)
         assert "text" in result
-        assert "model_name" in result 
\ No newline at end of file
+        assert "model_name" in result 
+    
+    def test_invalid_decoding(self):
+        """Test that unknown strategies and beam search with a draft model are rejected"""
+        with pytest.raises(ValueError):
+            WhisperTranscriber(model_name="openai/whisper-small", decoding="sampling")
+        
+        with pytest.raises(ValueError):
+            WhisperTranscriber(model_name="openai/whisper-small", decoding="beam",
+                               draft_model_name="openai/whisper-tiny")
+    
+    def test_transcribe_batch_keeps_input_order(self, transcriber, tmp_path):
+        """Test that batched transcription returns one result per file, in input order"""
+        import torchaudio
+        audio_path = Path(AUDIO_DOWNLOAD_TEST_PATH) / "sample_audio.mp3"
+        waveform, sample_rate = torchaudio.load(audio_path)
+        short_path = tmp_path / "short.wav"
+        torchaudio.save(str(short_path), waveform[:, :5 * sample_rate], sample_rate)
+        
+        results = transcriber.transcribe_batch([audio_path, short_path, audio_path])
+        
+        assert len(results) == 3
+        assert results[1]["audio_seconds"] == pytest.approx(5.0, abs=0.01)
+        assert results[0]["audio_seconds"] == results[2]["audio_seconds"]
+        assert results[0]["text"] == results[2]["text"]
+    
+    def test_assisted_decoding_matches_greedy(self, transcriber):
+        """Test that draft-assisted decoding gives the same text as greedy decoding with the main model"""
+        audio_path = Path(AUDIO_DOWNLOAD_TEST_PATH) / "sample_audio.mp3"
+        
+        greedy = WhisperTranscriber(model_name="openai/whisper-small", decoding="greedy")
+        assisted = WhisperTranscriber(model_name="openai/whisper-small", decoding="greedy",
+                                      draft_model_name="openai/whisper-tiny")
+        
+        result = assisted.transcribe_with_metadata(audio_path)
+        assert result["draft_model_name"] == "openai/whisper-tiny"
+        assert result["text"] == greedy.transcribe(audio_path)
+    
+    def test_cascade_escalates_low_confidence_segments(self):
+        """Test that only segments below the confidence thresholds are re-transcribed with the larger model"""
+        audio_path = Path(AUDIO_DOWNLOAD_TEST_PATH) / "sample_audio.mp3"
+        transcriber = WhisperTranscriber(model_name="openai/whisper-tiny", cascade_model_name="openai/whisper-small",
+                                         logprob_threshold=float("-inf"), compression_ratio_threshold=float("inf"))
+        
+        result = transcriber.transcribe_with_metadata(audio_path)
+        assert result["escalated_segments"] == 0
+        assert transcriber.cascade_model is None
+        assert all("avg_logprob" in segment and "compression_ratio" in segment for segment in result["segments"])
+        
+        # Every segment is below a log-probability threshold of zero
+        transcriber.logprob_threshold = 0.0
+        result = transcriber.transcribe_with_metadata(audio_path)
+        assert result["escalated_segments"] == len(result["segments"])
+        assert all(segment["model"] == "openai/whisper-small" for segment in result["segments"])
+    
+    def test_transcribe_segment_files_offsets(self, tmp_path):
+        """Test that consecutive segment files are transcribed with their offsets in the whole audio"""
+        waveform = load_audio(Path(AUDIO_DOWNLOAD_TEST_PATH) / "sample_audio.mp3").numpy()
+        segment_paths = []
+        for index, start in enumerate(range(0, len(waveform), 30 * 16000)):
+            segment_paths.append(tmp_path / f"segment_{index}.wav")
+            sf.write(segment_paths[-1], waveform[start:start + 30 * 16000], 16000, subtype="PCM_16")
+        
+        transcriber = WhisperTranscriber(model_name="openai/whisper-tiny", batch_size=2)
+        result = transcriber.transcribe_segment_files(iter(segment_paths))
+        
+        assert len(result["segments"]) == len(segment_paths)
+        assert [segment["start"] for segment in result["segments"]] == [30.0 * i for i in range(len(segment_paths))]
+        assert result["audio_seconds"] == pytest.approx(len(waveform) / 16000, abs=0.01)
+    
+    def test_transcribe_segment_files_uneven_last_segments(self, tiny_transcriber, tmp_path):
+        """Test that segment starts follow the actual segment lengths when the last two share a short remainder"""
+        audio = make_synthetic_audio(60.5, sample_rate=16000)
+        segment_paths = []
+        for index, (start, length) in enumerate(plan_segments(60.5, 30.0)):
+            segment_paths.append(tmp_path / f"segment_{index}.wav")
+            sf.write(str(segment_paths[-1]), audio[int(start * 16000):int((start + length) * 16000)], 16000)
+        
+        result = tiny_transcriber.transcribe_segment_files(iter(segment_paths))
+        
+        assert [segment["start"] for segment in result["segments"]] == pytest.approx([0.0, 30.0, 45.25])
+        assert result["audio_seconds"] == pytest.approx(60.5)
+    
+    def test_cascade_model_with_other_mel_bins(self, tiny_model, tmp_path):
+        """Test that a cascade model with another feature size gets features from its own processor"""
+        large = save_tiny_whisper(tmp_path / "large", num_mel_bins=128, seed=1)
+        transcriber = WhisperTranscriber(model_name=tiny_model, decoding="greedy", cascade_model_name=large,
+                                         logprob_threshold=0.0)
+        
+        result = transcriber.transcribe_waveform(torch.from_numpy(make_synthetic_audio(35, sample_rate=16000)))
+        assert result["escalated_segments"] == len(result["segments"]) == 2
+        assert all(segment["model"] == large for segment in result["segments"])
+        assert transcriber.cascade_processor.feature_extractor.feature_size == 128
+    
+    def test_long_form_segments(self, tiny_transcriber):
+        """Test that long-form transcription returns the timed segments of the whole audio"""
+        result = tiny_transcriber.transcribe_waveform(torch.from_numpy(make_synthetic_audio(65, sample_rate=16000)))
+        
+        segments = result["segments"]
+        assert len(segments) > 1
+        assert segments[0]["start"] == 0.0
+        assert segments[-1]["end"] == pytest.approx(65.0)
+        assert all(previous["end"] <= current["start"] for previous, current in zip(segments, segments[1:]))
+    
+    def test_generate_subtitles(self, tiny_transcriber, tmp_path):
+        """Test that subtitles have one cue per timed long-form segment"""
+        path = write_synthetic_audio(tmp_path / "audio.wav", 65)
+        
+        subtitles = tiny_transcriber.generate_subtitles(path)
+        assert subtitles.startswith("1\n00:00:00,000 --> ")
+        assert subtitles.count(" --> ") == len(tiny_transcriber.transcribe_with_metadata(path)["segments"])
+    
+    def test_transcribe_batch_prefetches_long_files(self, tiny_transcriber, tmp_path):
+        """Test that long files in a batch are transcribed from prefetched features like single files"""
+        paths = [
+            write_synthetic_audio(tmp_path / f"{seconds}.wav", seconds, seed=seed)
+            for seconds, seed in ((45, 0), (10, 1), (65, 2))
+        ]
+        
+        results = tiny_transcriber.transcribe_batch(paths)
+        assert [result["batched"] for result in results] == [False, True, False]
+        assert [result["audio_seconds"] for result in results] == pytest.approx([45.0, 10.0, 65.0])
+        assert results[2]["text"] == tiny_transcriber.transcribe_with_metadata(paths[2])["text"]